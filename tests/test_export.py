@@ -0,0 +1,79 @@
+"""Tests for the HTML dashboard export."""
+
+import json
+import re
+
+from umbra.export import HTML_TEMPLATE, export_html
+
+PAYLOAD = '</script><img src=x onerror="alert(1)">'
+
+ARCHITECTURE = f"""# Live Architecture
+
+## Project Summary
+Summary with {PAYLOAD} inside.
+
+## System Overview
+```mermaid
+graph LR
+    A[main.py] --> B[db.py]
+```
+"""
+
+
+def _export(tmp_path) -> str:
+    """Export a dashboard whose dynamic values all carry PAYLOAD."""
+    input_file = tmp_path / "LIVE_ARCHITECTURE.md"
+    input_file.write_text(ARCHITECTURE, encoding="utf-8")
+    output_file = tmp_path / "dashboard.html"
+
+    analysis = {
+        "metrics": {"total_files": 1, "total_lines": 10, "largest_files": [(f"src/{PAYLOAD}.py", 10)]},
+        "insights": [],
+        "health": {"score": 90, "grade": "A", "status": "Good"},
+        "recent_changes": [{
+            "time": "12:00",
+            "file": f"{PAYLOAD}.py",
+            "type": "modified",
+            "description": PAYLOAD,
+            "diff_lines": [{"type": "add", "line": PAYLOAD}],
+            "stats": {"added": 1, "removed": 0},
+        }],
+    }
+    export_html(str(input_file), str(output_file), PAYLOAD, analysis)
+    return output_file.read_text(encoding="utf-8")
+
+
+class TestExportEscaping:
+    """Dynamic values must not be able to inject markup or break scripts."""
+
+    def test_no_injected_markup(self, tmp_path):
+        """The payload never appears unescaped."""
+        html = _export(tmp_path)
+
+        assert "<img src=x" not in html
+        # Only the template's own script tags are closed
+        assert html.count("</script>") == HTML_TEMPLATE.count("</script>")
+
+    def test_html_contexts_are_escaped(self, tmp_path):
+        """Project name, summary, activity and diff lines are HTML-escaped."""
+        html = _export(tmp_path)
+
+        escaped = "&lt;/script&gt;&lt;img src=x onerror="
+        assert f"<title>{escaped}" in html
+        assert f"Summary with {escaped}" in html
+        assert f'<div class="activity-desc">{escaped}' in html
+        assert f'<div class="diff-line diff-add">+ {escaped}' in html
+
+    def test_file_index_is_valid_json(self, tmp_path):
+        """The embedded file index parses back to the original paths."""
+        html = _export(tmp_path)
+
+        match = re.search(r"const fileIndex = (.*);\n", html)
+        assert json.loads(match.group(1)) == [{"path": f"src/{PAYLOAD}.py", "lines": 10}]
+
+    def test_download_name_is_a_js_string(self, tmp_path):
+        """The SVG download name is a JSON string literal of the raw project name."""
+        html = _export(tmp_path)
+
+        match = re.search(r"a\.download = (\".*?(?<!\\)\") \+ '-architecture\.svg';", html)
+        assert json.loads(match.group(1)) == PAYLOAD
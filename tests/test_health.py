@@ -0,0 +1,87 @@
+"""Tests for the health monitor's circular dependency detection."""
+
+from umbra.agents.health import (
+    HealthMonitor,
+    IssueType,
+    _shortest_cycle,
+    _strongly_connected_components,
+)
+
+# A self-loop (s), a 2-cycle (x <-> y), a 3-cycle (a -> b -> c -> a)
+# and a module (solo) that imports into a cycle without being part of one
+GRAPH = {
+    "s": ["s"],
+    "x": ["y"],
+    "y": ["x"],
+    "a": ["b"],
+    "b": ["c"],
+    "c": ["a"],
+    "solo": ["a"],
+}
+
+
+def _is_cycle(path: list, graph: dict) -> bool:
+    """Check that path (without the repeated start) follows real edges back to its start."""
+    return all(b in graph[a] for a, b in zip(path, path[1:] + path[:1]))
+
+
+class TestStronglyConnectedComponents:
+    """Test cases for _strongly_connected_components."""
+
+    def test_components(self):
+        """Every node is in exactly one component; cycles group together."""
+        components = {frozenset(c) for c in _strongly_connected_components(GRAPH)}
+
+        assert components == {
+            frozenset({"s"}),
+            frozenset({"x", "y"}),
+            frozenset({"a", "b", "c"}),
+            frozenset({"solo"}),
+        }
+
+
+class TestShortestCycle:
+    """Test cases for _shortest_cycle."""
+
+    def test_self_loop(self):
+        """A module importing itself is a cycle of one."""
+        assert _shortest_cycle(GRAPH, "s", {"s"}) == ["s"]
+
+    def test_three_cycle(self):
+        """The cycle follows the import edges from the start module."""
+        assert _shortest_cycle(GRAPH, "a", {"a", "b", "c"}) == ["a", "b", "c"]
+        assert _shortest_cycle(GRAPH, "b", {"a", "b", "c"}) == ["b", "c", "a"]
+
+    def test_shortest_cycle_in_larger_component(self):
+        """Only real edges are used, and the shortest way back is taken."""
+        graph = {"a": ["b"], "b": ["c", "d"], "c": ["a"], "d": ["b"]}
+
+        cycle = _shortest_cycle(graph, "d", {"a", "b", "c", "d"})
+
+        assert cycle == ["d", "b"]
+        assert _is_cycle(cycle, graph)
+
+
+class TestCircularDependencies:
+    """Test cases for HealthMonitor._check_circular_dependencies."""
+
+    def test_reported_cycles(self, tmp_path):
+        """One issue per cycle set, each describing a real import cycle."""
+        monitor = HealthMonitor(str(tmp_path))
+        for module, imports in GRAPH.items():
+            file_path = str(tmp_path / f"{module}.py")
+            monitor.file_contents[file_path] = ""
+            monitor.import_graph[file_path] = set(imports)
+
+        monitor._check_circular_dependencies()
+
+        issues = [i for i in monitor.issues if i.issue_type == IssueType.CIRCULAR_DEPENDENCY]
+        cycles = [i.message.removeprefix("Circular dependency: ").split(" -> ") for i in issues]
+
+        assert all(cycle[0] == cycle[-1] for cycle in cycles)
+        assert {frozenset(cycle) for cycle in cycles} == {
+            frozenset({"s"}),
+            frozenset({"x", "y"}),
+            frozenset({"a", "b", "c"}),
+        }
+        assert all(_is_cycle(cycle[:-1], GRAPH) for cycle in cycles)
@@ -0,0 +1,73 @@
+"""Tests for the deterministic Mermaid template edits."""
+
+from umbra.agents._mermaid_template import add_file_node
+from umbra.validators.mermaid import validate_mermaid
+
+DIAGRAM = """graph LR
+    subgraph Entry["Entry Points"]
+        main[main.py]
+    end
+    subgraph Utils["Utils & Services"]
+        helpers[helpers.py]
+    end
+    subgraph Core["Core Logic"]
+        engine["engine.py"]
+    end
+    main --> engine"""
+
+
+def _subgraph_body(mermaid: str, subgraph_id: str) -> str:
+    """Return the lines between a subgraph's opening line and its end."""
+    start = mermaid.index(f"subgraph {subgraph_id}")
+    return mermaid[start:mermaid.index("end", start)]
+
+
+class TestAddFileNode:
+    """Test cases for add_file_node."""
+
+    def test_entry_file_goes_to_entry_subgraph(self):
+        """Entry point names are placed in the Entry subgraph."""
+        result = add_file_node(DIAGRAM, "/project/app.py")
+
+        assert 'app["app.py"]' in _subgraph_body(result, "Entry")
+
+    def test_utility_file_goes_to_utils_subgraph(self):
+        """Supporting module names are placed in the Utils subgraph."""
+        result = add_file_node(DIAGRAM, "/project/string_utils.py")
+
+        assert 'string_utils["string_utils.py"]' in _subgraph_body(result, "Utils")
+
+    def test_other_files_go_to_core_subgraph(self):
+        """Anything else is placed in the Core subgraph."""
+        result = add_file_node(DIAGRAM, "/project/billing.py")
+
+        assert 'billing["billing.py"]' in _subgraph_body(result, "Core")
+
+    def test_no_matching_subgraph_returns_none(self):
+        """Without a layer subgraph the LLM has to place the file."""
+        assert add_file_node("graph LR\n    A --> B", "/project/billing.py") is None
+
+    def test_label_is_quoted(self):
+        """Names with brackets or parentheses still produce valid Mermaid."""
+        result = add_file_node(DIAGRAM, "/project/utils (copy).py")
+
+        assert 'utils__copy_["utils (copy).py"]' in result
+        assert validate_mermaid(result).is_valid is True
+
+    def test_double_quotes_are_escaped(self):
+        """Double quotes in a name are written as a Mermaid entity."""
+        result = add_file_node(DIAGRAM, '/project/odd"name.py')
+
+        assert '["odd#quot;name.py"]' in result
+
+    def test_already_shown_file_is_unchanged(self):
+        """A file shown with a plain or a quoted label is not added again."""
+        assert add_file_node(DIAGRAM, "/project/main.py") == DIAGRAM
+        assert add_file_node(DIAGRAM, "/project/engine.py") == DIAGRAM
+
+    def test_node_id_does_not_collide(self):
+        """A new node never reuses an id already in the diagram."""
+        diagram = DIAGRAM.replace("helpers[helpers.py]", "billing[other.py]")
+        result = add_file_node(diagram, "/project/billing.py")
+
+        assert 'billing_2["billing.py"]' in result
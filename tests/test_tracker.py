@@ -0,0 +1,69 @@
+"""Tests for the change tracker's dependency graph."""
+
+from umbra.agents.tracker import DependencyGraph
+
+
+class TestDependencyGraph:
+    """Test cases for DependencyGraph."""
+
+    def test_add_file_records_both_directions(self):
+        """Imports are mirrored in imported_by."""
+        graph = DependencyGraph()
+        graph.add_file("a", "import b\nfrom c import x\n")
+
+        assert graph.imports["a"] == {"b", "c"}
+        assert graph.imported_by["b"] == {"a"}
+        assert graph.imported_by["c"] == {"a"}
+
+    def test_readding_file_drops_removed_import(self):
+        """An import dropped on re-add no longer makes the file a dependent."""
+        graph = DependencyGraph()
+        graph.add_file("a", "import b\nimport c\n")
+        graph.add_file("a", "import c\n")
+
+        assert graph.imports["a"] == {"c"}
+        assert "a" not in graph.imported_by["b"]
+        assert graph.get_dependents("b") == set()
+        assert graph.get_dependents("c") == {"a"}
+
+    def test_remove_file_keeps_its_importers(self):
+        """Files importing a removed file stay its dependents."""
+        graph = DependencyGraph()
+        graph.add_file("b", "import c\n")
+        graph.add_file("a", "import b\n")
+        graph.remove_file("b")
+
+        assert "b" not in graph.imports
+        assert graph.get_dependents("b") == {"a"}
+        # The removed file's own imports are gone
+        assert graph.get_dependents("c") == set()
+
+    def test_get_dependents_is_transitive(self):
+        """Indirect importers are dependents too."""
+        graph = DependencyGraph()
+        graph.add_file("b", "import c\n")
+        graph.add_file("a", "import b\n")
+
+        assert graph.get_dependents("c") == {"a", "b"}
+
+    def test_dependents_cache_cleared_when_edges_change(self):
+        """Cached dependents are recomputed after an edge is added or removed."""
+        graph = DependencyGraph()
+        graph.add_file("a", "import c\n")
+        assert graph.get_dependents("c") == {"a"}
+
+        graph.add_file("b", "import c\n")
+        assert graph.get_dependents("c") == {"a", "b"}
+
+        graph.remove_file("a")
+        assert graph.get_dependents("c") == {"b"}
+
+    def test_dependents_cache_kept_when_edges_unchanged(self):
+        """Re-adding a file with the same imports keeps the cache."""
+        graph = DependencyGraph()
+        graph.add_file("a", "import c\n")
+        graph.get_dependents("c")
+
+        graph.add_file("a", "import c\nx = 1\n")
+
+        assert "c" in graph._dependents_cache
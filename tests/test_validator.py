@@ -97,3 +97,15 @@ class TestMermaidValidator:
         assert result.is_valid is False
         assert any("dangerous" in e.lower() for e in result.errors)
 
+
+    def test_dangerous_content_reported_once_per_pattern(self):
+        """Each dangerous pattern is reported once, case-insensitively."""
+        mermaid = """graph TD
+    A[<IFRAME src=x>] --> B[<iframe>]
+    B --> C[JavaScript:alert]"""
+        result = validate_mermaid(mermaid)
+        assert result.is_valid is False
+        dangerous = [e for e in result.errors if "dangerous" in e.lower()]
+        assert len(dangerous) == 2
+        assert any("<iframe" in e for e in dangerous)
+        assert any("javascript:" in e for e in dangerous)
@@ -58,6 +58,14 @@ class TestDebouncedHandler:
 
         assert handler._should_ignore(".git/hooks/pre-commit.py") is True
 
+    def test_matches_whole_directory_names_only(self):
+        """Directories merely containing an ignored name should be watched."""
+        handler = DebouncedHandler(callback=MagicMock())
+
+        assert handler._should_ignore("myvenv/app.py") is False
+        assert handler._should_ignore("/path/git_tools/sync.py") is False
+        assert handler._should_ignore("/path/.venv") is True
+
 
 class TestUmbraWatcher:
     """Test cases for the UmbraWatcher."""
@@ -115,6 +123,25 @@ class TestUmbraWatcher:
             # but the debouncing should consolidate rapid changes
             assert callback.call_count >= 1
 
+    def test_batch_deduplicates_events_per_file(self):
+        """A burst of events should be delivered as one batch, one entry per file."""
+        callback = MagicMock()
+        handler = DebouncedHandler(callback=callback, debounce_seconds=0.2)
+
+        handler._handle_event("created", "/tmp/umbra_new.py")
+        handler._handle_event("modified", "/tmp/umbra_new.py")
+        handler._handle_event("modified", "/tmp/umbra_other.py")
+        handler._handle_event("deleted", "/tmp/umbra_other.py")
+
+        time.sleep(0.5)
+
+        callback.assert_called_once()
+        events = {str(e.file_path): e.event_type for e in callback.call_args[0][0]}
+        assert events == {
+            str(Path("/tmp/umbra_new.py")): "created",
+            str(Path("/tmp/umbra_other.py")): "deleted",
+        }
+
 
 class TestFileChangeEvent:
     """Test cases for FileChangeEvent dataclass."""
@@ -4,5 +4,10 @@
 A living architecture diagram that updates in real-time.
 """
 
+import logging
+
 __version__ = "0.7.0"
 
+# Library modules log through "umbra.*"; the CLI decides where output goes
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
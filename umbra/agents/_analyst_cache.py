@@ -0,0 +1,63 @@
+"""
+On-disk memoization for Analyst LLM results.
+
+Results are keyed by a hash of the model, prompts and the analysed file
+path, content and diff, so re-saving an unchanged buffer never triggers a
+second LLM call. Set UMBRA_ANALYST_CACHE=0 to disable.
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+CACHE_DIR = Path.home() / ".cache" / "umbra" / "analyst"
+
+# Entries older than this are regenerated (and removed when next looked up)
+TTL_SECONDS = 7 * 24 * 3600
+
+
+def is_enabled() -> bool:
+    """Check if the analyst cache is enabled."""
+    return os.getenv("UMBRA_ANALYST_CACHE", "1") != "0"
+
+
+def make_key(model: str, prompts: str, file_path: str, content: str, diff: str | None) -> str:
+    """Build a cache key from everything that determines the analysis.
+
+    prompts is the system prompt and prompt template text, so editing
+    either invalidates earlier results.
+    """
+    h = hashlib.blake2b(f"{model}\0".encode(), digest_size=16)
+    h.update(prompts.encode("utf-8", "surrogatepass"))
+    h.update(b"\0")
+    h.update(file_path.encode("utf-8", "surrogatepass"))
+    h.update(b"\0")
+    h.update(content.encode("utf-8", "surrogatepass"))
+    h.update(b"\0")
+    h.update((diff or "").encode("utf-8", "surrogatepass"))
+    return h.hexdigest()
+
+
+def get(key: str) -> dict | None:
+    """Return the cached result for a key, or None on a miss or expiry."""
+    path = CACHE_DIR / f"{key}.json"
+    try:
+        if time.time() - path.stat().st_mtime > TTL_SECONDS:
+            path.unlink(missing_ok=True)
+            return None
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def put(key: str, result: dict) -> None:
+    """Store a result (best effort, errors are ignored)."""
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = CACHE_DIR / f"{key}.tmp"
+        tmp.write_text(json.dumps(result), encoding="utf-8")
+        os.replace(tmp, CACHE_DIR / f"{key}.json")
+    except (OSError, TypeError, ValueError):
+        pass
@@ -0,0 +1,69 @@
+"""
+On-disk memoization for documentation and security LLM responses.
+
+Responses are keyed by a SHA-256 of the model, generation settings and
+rendered prompt (which embeds the file path and code), so unchanged files
+never trigger a second Gemini call across runs.
+Set UMBRA_DOC_CACHE=0 to disable.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from pathlib import Path
+
+CACHE_DIR = Path.home() / ".cache" / "umbra" / "docs"
+
+# Entries older than this are regenerated
+TTL_SECONDS = 30 * 24 * 3600
+
+_stats = {"hits": 0, "misses": 0}
+_stats_lock = threading.Lock()
+
+
+def is_enabled() -> bool:
+    """Check if the doc cache is enabled."""
+    return os.getenv("UMBRA_DOC_CACHE", "1") != "0"
+
+
+def make_key(model: str, temperature: float, max_tokens: int, prompt: str) -> str:
+    """Build a cache key from everything that determines the response."""
+    h = hashlib.sha256(f"{model}|{temperature}|{max_tokens}|".encode())
+    h.update(prompt.encode("utf-8", "surrogatepass"))
+    return h.hexdigest()
+
+
+def get(key: str) -> str | None:
+    """Return the cached response for a key, or None on a miss or expiry."""
+    path = CACHE_DIR / f"{key}.txt"
+    try:
+        if time.time() - path.stat().st_mtime > TTL_SECONDS:
+            text = None
+        else:
+            text = path.read_text(encoding="utf-8")
+    except OSError:
+        text = None
+
+    with _stats_lock:
+        _stats["hits" if text is not None else "misses"] += 1
+    return text
+
+
+def put(key: str, text: str) -> None:
+    """Store a response (best effort, errors are ignored)."""
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = CACHE_DIR / f"{key}.{threading.get_ident()}.tmp"
+        tmp.write_text(text, encoding="utf-8")
+        os.replace(tmp, CACHE_DIR / f"{key}.txt")
+    except OSError:
+        pass
+
+
+def cache_stats() -> dict:
+    """Return hit/miss counts and the hit rate for this process."""
+    with _stats_lock:
+        hits, misses = _stats["hits"], _stats["misses"]
+    total = hits + misses
+    return {"hits": hits, "misses": misses, "hit_rate": hits / total if total else 0.0}
@@ -0,0 +1,76 @@
+"""
+Deterministic Mermaid edits that need no LLM.
+
+Adding a newly created file to the diagram only means placing one node in
+the right layer subgraph, so it is done here directly. The Surgeon LLM is
+still used for changes whose connections have to be inferred.
+"""
+
+import re
+from pathlib import Path
+
+# Subgraph opening line: indentation, id and optional ["label"]
+_SUBGRAPH_RE = re.compile(r'^([^\S\n]*)subgraph[^\S\n]+([\w-]+)(?:\[([^\]\n]*)\])?[^\n]*$', re.MULTILINE)
+# Any identifier-like word (a superset of the node ids in use)
+_WORD_RE = re.compile(r'\w+')
+
+# File names (without extension) that are entry points
+ENTRY_NAMES = frozenset({'main', 'app', 'index', 'server', 'cli', '__main__', 'manage', 'wsgi', 'asgi'})
+# Name fragments of supporting modules
+UTILITY_HINTS = ('util', 'helper', 'valid', 'export', 'format', 'common')
+
+# Subgraph id/label keywords for each layer, in order of preference
+_LAYER_KEYWORDS = {
+    'entry': ('entry',),
+    'utils': ('util', 'service', 'helper'),
+    'core': ('core', 'logic', 'backend'),
+}
+
+
+def add_file_node(mermaid: str, file_path: str) -> str | None:
+    """Add a node for a new file to the subgraph of its layer.
+
+    Returns the diagram unchanged if the file is already shown, or None
+    when no suitable subgraph exists (the LLM should place it instead).
+    """
+    name = Path(file_path).name
+    # Quoted so names with brackets or parentheses stay valid Mermaid
+    label = '"' + name.replace('"', '#quot;') + '"'
+    if f"[{name}]" in mermaid or f"[{label}]" in mermaid:
+        return mermaid
+
+    stem = Path(file_path).stem.lower()
+    if stem in ENTRY_NAMES:
+        layers = ('entry', 'core')
+    elif any(hint in stem for hint in UTILITY_HINTS):
+        layers = ('utils', 'core')
+    else:
+        layers = ('core',)
+
+    subgraphs = list(_SUBGRAPH_RE.finditer(mermaid))
+    target = None
+    for layer in layers:
+        keywords = _LAYER_KEYWORDS[layer]
+        target = next(
+            (m for m in subgraphs if any(k in f"{m.group(2)} {m.group(3) or ''}".lower() for k in keywords)),
+            None,
+        )
+        if target:
+            break
+    if target is None:
+        return None
+
+    node_id = _unique_id(re.sub(r'\W', '_', Path(file_path).stem) or 'file', mermaid)
+    line = f"\n{target.group(1)}    {node_id}[{label}]"
+    return mermaid[:target.end()] + line + mermaid[target.end():]
+
+
+def _unique_id(base: str, mermaid: str) -> str:
+    """Return a node id based on base that the diagram does not use yet."""
+    if base[0].isdigit():
+        base = f"f_{base}"
+    taken = set(_WORD_RE.findall(mermaid))
+    node_id, n = base, 2
+    while node_id in taken:
+        node_id, n = f"{base}_{n}", n + 1
+    return node_id
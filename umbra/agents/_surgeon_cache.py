@@ -0,0 +1,225 @@
+"""
+On-disk memoization for Surgeon LLM responses.
+
+Responses are keyed by a SHA-256 of the model, system prompt and rendered
+prompt (current diagram, analysis and file content), so re-saving an
+unchanged buffer never triggers a second diagram update call.
+Set UMBRA_SURGEON_CACHE=0 to disable.
+
+An optional semantic layer (UMBRA_SURGEON_SEMANTIC_CACHE=1) also reuses
+diagrams when the same file changes again against the same diagram and
+the embedded analysis is nearly identical (cosine similarity above
+SEMANTIC_THRESHOLD), which catches small edits that alter the prompt.
+
+Entries expire after a TTL that depends on the change type, and all
+entries for a file are dropped when the file is deleted.
+"""
+
+import hashlib
+import json
+import math
+import os
+import time
+from pathlib import Path
+
+CACHE_DIR = Path.home() / ".cache" / "umbra" / "surgeon"
+
+# Entries older than this are regenerated
+TTL_SECONDS = 3600
+
+# Per change type TTLs: changes that wire a file to other files or services
+# go stale sooner than a self-contained service or refactor
+TTL_BY_CHANGE_TYPE = {
+    "new_service": 4 * 3600,
+    "orchestration": 4 * 3600,
+    "refactor": 2 * 3600,
+    "new_dependency": 900,
+    "inter_service": 900,
+    "api_call": 900,
+    "api_route": 900,
+    "db_connection": 900,
+}
+
+# file path -> keys of the exact entries stored for it
+PATHS_INDEX = CACHE_DIR / "paths.json"
+
+SEMANTIC_INDEX = CACHE_DIR / "semantic.json"
+# Minimum cosine similarity for a semantic hit
+SEMANTIC_THRESHOLD = 0.95
+# Oldest semantic entries are dropped beyond this
+SEMANTIC_MAX_ENTRIES = 200
+
+# Semantic entries, loaded lazily: {"group", "file", "embedding", "norm", "diagrams", "expires"}
+_semantic_entries: list[dict] | None = None
+
+
+def is_enabled() -> bool:
+    """Check if the surgeon cache is enabled."""
+    return os.getenv("UMBRA_SURGEON_CACHE", "1") != "0"
+
+
+def is_semantic_enabled() -> bool:
+    """Check if the semantic (embedding similarity) layer is enabled."""
+    return is_enabled() and os.getenv("UMBRA_SURGEON_SEMANTIC_CACHE", "0") == "1"
+
+
+def ttl_for(change_type: str) -> int:
+    """Return the TTL for entries produced by a change of the given type."""
+    return TTL_BY_CHANGE_TYPE.get(change_type, TTL_SECONDS)
+
+
+def make_key(model: str, system_prompt: str, prompt: str) -> str:
+    """Build a cache key from everything that determines the response."""
+    h = hashlib.sha256(f"{model}\0".encode())
+    h.update(system_prompt.encode("utf-8", "surrogatepass"))
+    h.update(b"\0")
+    h.update(prompt.encode("utf-8", "surrogatepass"))
+    return h.hexdigest()
+
+
+def get(key: str) -> list[str] | None:
+    """Return the cached candidate diagrams for a key, or None on a miss or expiry."""
+    try:
+        entry = json.loads((CACHE_DIR / f"{key}.json").read_text(encoding="utf-8"))
+        if entry["expires"] < time.time():
+            return None
+        return entry["diagrams"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def put(key: str, diagrams: list[str], ttl: int = TTL_SECONDS, file_path: str = "") -> None:
+    """Store candidate diagrams (best effort, errors are ignored)."""
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = CACHE_DIR / f"{key}.tmp"
+        tmp.write_text(
+            json.dumps({"expires": time.time() + ttl, "diagrams": diagrams}),
+            encoding="utf-8",
+        )
+        os.replace(tmp, CACHE_DIR / f"{key}.json")
+
+        if file_path:
+            paths = _load_json(PATHS_INDEX, {})
+            keys = paths.setdefault(_normalize(file_path), [])
+            if key not in keys:
+                keys.append(key)
+                _write_json(PATHS_INDEX, paths)
+    except (OSError, TypeError, ValueError):
+        pass
+
+
+def invalidate_file(file_path: str) -> None:
+    """Drop every entry (exact and semantic) stored for a file (best effort)."""
+    path = _normalize(file_path)
+    try:
+        paths = _load_json(PATHS_INDEX, {})
+        keys = paths.pop(path, None)
+        if keys is not None:
+            for key in keys:
+                (CACHE_DIR / f"{key}.json").unlink(missing_ok=True)
+            _write_json(PATHS_INDEX, paths)
+    except (OSError, TypeError, ValueError):
+        pass
+
+    entries = _load_semantic()
+    kept = [e for e in entries if e.get("file") != path]
+    if len(kept) != len(entries):
+        _save_semantic(kept)
+
+
+def make_group(model: str, file_path: str, current_mermaid: str) -> str:
+    """Key of the semantic entries a request may match (exact inputs only)."""
+    h = hashlib.blake2b(digest_size=16)
+    for part in (model, file_path, current_mermaid):
+        h.update(part.encode("utf-8", "surrogatepass"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def semantic_text(change_type: str, affected_components: list[str], reasoning: str) -> str:
+    """Normalized description of a change, the text that gets embedded."""
+    components = ", ".join(sorted(c.strip() for c in affected_components))
+    return f"{change_type}\n{components}\n{' '.join(reasoning.split())}"
+
+
+def semantic_get(group: str, embedding: list[float]) -> list[str] | None:
+    """Return the diagrams of the most similar entry in a group, if similar enough."""
+    norm = math.sqrt(math.fsum(x * x for x in embedding))
+    if not norm:
+        return None
+
+    now = time.time()
+    best, best_score = None, SEMANTIC_THRESHOLD
+    for entry in _load_semantic():
+        if entry["group"] != group or entry["expires"] < now:
+            continue
+        dot = math.fsum(a * b for a, b in zip(entry["embedding"], embedding))
+        score = dot / (entry["norm"] * norm)
+        if score >= best_score:
+            best, best_score = entry, score
+
+    return best["diagrams"] if best else None
+
+
+def semantic_put(
+    group: str,
+    embedding: list[float],
+    diagrams: list[str],
+    ttl: int = TTL_SECONDS,
+    file_path: str = "",
+) -> None:
+    """Add a semantic entry and persist the index (best effort)."""
+    norm = math.sqrt(math.fsum(x * x for x in embedding))
+    if not norm:
+        return
+
+    now = time.time()
+    entries = [e for e in _load_semantic() if e["expires"] >= now]
+    entries.append({
+        "group": group,
+        "file": _normalize(file_path) if file_path else "",
+        "embedding": embedding,
+        "norm": norm,
+        "diagrams": diagrams,
+        "expires": now + ttl,
+    })
+    del entries[:-SEMANTIC_MAX_ENTRIES]
+    _save_semantic(entries)
+
+
+def _load_semantic() -> list[dict]:
+    """Load the semantic index from disk once per process."""
+    global _semantic_entries
+    if _semantic_entries is None:
+        _semantic_entries = _load_json(SEMANTIC_INDEX, [])
+    return _semantic_entries
+
+
+def _save_semantic(entries: list[dict]) -> None:
+    """Replace the semantic index in memory and on disk (best effort)."""
+    global _semantic_entries
+    _semantic_entries = entries
+    try:
+        _write_json(SEMANTIC_INDEX, entries)
+    except (OSError, TypeError, ValueError):
+        pass
+
+
+def _normalize(file_path: str) -> str:
+    """Canonical form of a file path used in the indexes."""
+    return os.path.realpath(file_path)
+
+
+def _load_json(path: Path, default):
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return default
+
+
+def _write_json(path: Path, data) -> None:
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(data), encoding="utf-8")
+    os.replace(tmp, path)
@@ -5,16 +5,37 @@ This node determines if a code change is "structural" (affects architecture)
 or "cosmetic" (can be ignored).
 """
 
+import asyncio
 import json
+import logging
 import os
+import re
 
 from langchain_core.messages import HumanMessage, SystemMessage
-from langchain_google_genai import ChatGoogleGenerativeAI
-from rich.console import Console
 
+from umbra.agents import _analyst_cache
 from umbra.agents.state import AnalysisResult, GraphState
-
-console = Console()
+from umbra.utils.llm import get_llm
+
+logger = logging.getLogger(__name__)
+
+# Markdown fences wrapping an LLM response (opening fence with any info string)
+_FENCE_RE = re.compile(r"\A```[^\n]*\n|\n?```\s*\Z")
+# First flat JSON object in a free-form response
+_JSON_OBJ_RE = re.compile(r"\{[^{}]*\}", re.DOTALL)
+
+# Files that are never structural (tests, package markers, type stubs, assets)
+_COSMETIC_RE = re.compile(
+    r"(?:_test\.py$|(?:^|/)test_[^/]*\.py$|\.(?:spec|test)\.(?:ts|js|tsx|jsx)$"
+    r"|(?:^|/)__init__\.py$|(?:^|/)types\.(?:py|ts)$|\.d\.ts$"
+    r"|\.(?:css|scss|md|json|lock)$)"
+)
+# Diff lines that only add/remove whitespace (unified or ADDED:/REMOVED: summary)
+_BLANK_DIFF_LINE_RE = re.compile(r"^(?:[+\- ]?\s*|ADDED:|REMOVED:)$")
+# Lines that outline a module's structure (imports, definitions, routes)
+_SIGNATURE_RE = re.compile(
+    r"^[ \t]*(?:import |from |class |def |async def |@?app\.|@?router\.).*$", re.MULTILINE
+)
 
 ANALYST_SYSTEM_PROMPT = """You analyze code to determine if it should appear in an architecture diagram.
 
@@ -63,6 +84,24 @@ change_type options:
 - "cosmetic" - Supporting files (DEFAULT if unsure)
 """
 
+ANALYST_PROMPT_TEMPLATE = """## File: {file_path}
+
+## Change:
+{diff}
+
+## {content_title}:
+```python
+{content}
+```
+
+Analyze this change and determine if it affects the system architecture.
+"""
+
+# The system prompt never changes, so the message is built once
+_SYSTEM_MESSAGE = SystemMessage(content=ANALYST_SYSTEM_PROMPT)
+# Part of every cache key, so prompt edits invalidate cached analyses
+_CACHE_PROMPTS = f"{ANALYST_SYSTEM_PROMPT}\0{ANALYST_PROMPT_TEMPLATE}"
+
 
 def analyst_node(state: GraphState) -> GraphState:
     """
@@ -71,66 +110,146 @@ def analyst_node(state: GraphState) -> GraphState:
     Input: file_path, file_content, diff
     Output: analysis_result
     """
-    model = os.getenv("GEMINI_MODEL", "models/gemini-flash-latest")
-    llm = ChatGoogleGenerativeAI(model=model, temperature=0)
+    # Analysis may already have been computed for this change (see analyze_batch)
+    if state.get("analysis_result") is not None:
+        return {"analysis_result": state["analysis_result"]}
 
-    # Truncate content to save tokens
-    content = state.get("file_content", "")
-    if len(content) > 3000:
-        content = content[:3000] + "\n... (truncated)"
+    # Skip the LLM for changes that can never be structural
+    reason = cosmetic_reason(state.get("file_path", ""), state.get("diff"))
+    if reason:
+        logger.debug("   -> Analysis: cosmetic (%s)", reason)
+        return {"analysis_result": _cosmetic_result(reason)}
 
-    diff = state.get("diff") or "New file or full content"
+    model = os.getenv("GEMINI_MODEL", "models/gemini-flash-latest")
 
-    prompt = f"""## File: {state.get("file_path", "unknown")}
+    # Reuse a previous analysis of the exact same change
+    cache_key = None
+    if _analyst_cache.is_enabled():
+        cache_key = _analyst_cache.make_key(
+            model,
+            _CACHE_PROMPTS,
+            state.get("file_path", ""),
+            state.get("file_content", ""),
+            state.get("diff"),
+        )
+        cached = _analyst_cache.get(cache_key)
+        if cached is not None:
+            analysis = _build_analysis(cached)
+            logger.debug("   -> Analysis: %s (cached)", analysis.change_type)
+            return {"analysis_result": analysis}
 
-## Change:
-{diff}
+    llm = get_llm(model, 0.0)
 
-## Full File Content:
-```python
-{content}
-```
-
-Analyze this change and determine if it affects the system architecture.
-"""
+    content = state.get("file_content", "")
+    diff = state.get("diff")
+
+    if is_incremental_diff(diff):
+        # The diff carries the change; an outline of the file is enough context
+        content_title = "File Outline"
+        content = extract_signatures(content)
+    else:
+        # Truncate content to save tokens
+        content_title = "Full File Content"
+        if len(content) > 3000:
+            content = content[:3000] + "\n... (truncated)"
+
+    prompt = ANALYST_PROMPT_TEMPLATE.format(
+        file_path=state.get("file_path", "unknown"),
+        diff=diff or "New file or full content",
+        content_title=content_title,
+        content=content,
+    )
 
     try:
-        response = llm.invoke(
-            [
-                SystemMessage(content=ANALYST_SYSTEM_PROMPT),
-                HumanMessage(content=prompt),
-            ]
-        )
+        response = llm.invoke([_SYSTEM_MESSAGE, HumanMessage(content=prompt)])
 
         # Parse JSON response
         result = parse_json_response(response.content)
+        analysis = _build_analysis(result)
 
-        analysis = AnalysisResult(
-            is_structural_change=result.get("is_structural", False),
-            change_type=result.get("change_type", "cosmetic"),
-            affected_components=result.get("affected_components", []),
-            reasoning=result.get("reasoning", ""),
-        )
+        if cache_key is not None:
+            _analyst_cache.put(cache_key, result)
 
-        console.print(
-            f"[dim]   -> Analysis: {analysis.change_type} "
-            f"({'structural' if analysis.is_structural_change else 'cosmetic'})[/dim]"
+        logger.debug(
+            "   -> Analysis: %s (%s)",
+            analysis.change_type,
+            "structural" if analysis.is_structural_change else "cosmetic",
         )
 
-        return {**state, "analysis_result": analysis}
+        return {"analysis_result": analysis}
 
     except Exception as e:
-        console.print(f"[red]   -> Analyst error: {e}[/red]")
+        logger.warning("   -> Analyst error: %s", e)
         # Return non-structural on error to be safe
-        return {
-            **state,
-            "analysis_result": AnalysisResult(
-                is_structural_change=False,
-                change_type="cosmetic",
-                affected_components=[],
-                reasoning=f"Analysis failed: {e}",
-            ),
-        }
+        return {"analysis_result": _cosmetic_result(f"Analysis failed: {e}")}
+
+
+async def analyze_batch(
+    states: list[GraphState], max_concurrency: int = 4
+) -> list[AnalysisResult]:
+    """
+    Analyze several changes concurrently.
+
+    Each analysis runs the regular (blocking) analyst_node in a worker
+    thread so LLM round-trips overlap, bounded by max_concurrency.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run(state: GraphState) -> AnalysisResult:
+        async with semaphore:
+            result = await asyncio.to_thread(analyst_node, state)
+            return result["analysis_result"]
+
+    return await asyncio.gather(*(run(state) for state in states))
+
+
+def cosmetic_reason(file_path: str, diff: str | None) -> str | None:
+    """
+    Cheap local check for changes that never affect the architecture.
+
+    Returns a short reason when the change is known to be cosmetic,
+    or None when the LLM should decide.
+    """
+    if _COSMETIC_RE.search(file_path.replace("\\", "/")):
+        return "non-structural file"
+
+    if diff and all(
+        _BLANK_DIFF_LINE_RE.match(line) for line in diff.splitlines()
+    ):
+        return "whitespace-only change"
+
+    return None
+
+
+def is_incremental_diff(diff: str | None) -> bool:
+    """Check if diff is an actual line diff rather than a placeholder note."""
+    return bool(diff) and diff.startswith(("ADDED:", "REMOVED:", "@@", "+", "-"))
+
+
+def extract_signatures(content: str, max_lines: int = 50, max_chars: int = 1000) -> str:
+    """Keep only import, class, def and route lines of a module."""
+    lines = _SIGNATURE_RE.findall(content)[:max_lines]
+    return "\n".join(lines)[:max_chars]
+
+
+def _build_analysis(result: dict) -> AnalysisResult:
+    """Convert the parsed LLM response into an AnalysisResult."""
+    return AnalysisResult(
+        is_structural_change=result.get("is_structural", False),
+        change_type=result.get("change_type", "cosmetic"),
+        affected_components=result.get("affected_components", []),
+        reasoning=result.get("reasoning", ""),
+    )
+
+
+def _cosmetic_result(reasoning: str) -> AnalysisResult:
+    """Build a non-structural analysis result."""
+    return AnalysisResult(
+        is_structural_change=False,
+        change_type="cosmetic",
+        affected_components=[],
+        reasoning=reasoning,
+    )
 
 
 def parse_json_response(content: str) -> dict:
@@ -138,18 +257,13 @@ def parse_json_response(content: str) -> dict:
     # Remove markdown code fences if present
     content = content.strip()
     if content.startswith("```"):
-        lines = content.split("\n")
-        # Remove first and last lines (fences)
-        lines = [l for l in lines if not l.startswith("```")]
-        content = "\n".join(lines)
+        content = _FENCE_RE.sub("", content)
 
     try:
         return json.loads(content)
     except json.JSONDecodeError:
         # Try to extract JSON from the response
-        import re
-
-        match = re.search(r"\{[^{}]*\}", content, re.DOTALL)
+        match = _JSON_OBJ_RE.search(content)
         if match:
             return json.loads(match.group())
         raise ValueError(f"Could not parse JSON from response: {content[:200]}")
@@ -1,12 +1,17 @@
 """
 Ask Umbra - Chat with your codebase in natural language.
 """
+import hashlib
+import json
 import os
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import HumanMessage, SystemMessage
 
+from umbra.utils.llm import get_llm
+
 
 CHAT_SYSTEM_PROMPT = """You are Umbra, an AI assistant that knows EVERYTHING about this codebase.
 
@@ -35,50 +40,163 @@ You have access to:
 """
 
 
-def get_code_files(project_path: str, extensions: tuple = ('.py', '.js', '.ts', '.jsx', '.tsx')) -> dict:
-    """Get all code files content from the project."""
-    files_content = {}
+# Truncated file contents keyed by path, with the mtime they were read at (LRU)
+_FILE_CACHE: OrderedDict[str, tuple[int, str]] = OrderedDict()
+_FILE_CACHE_MAX = 200
+
+# Characters of each file sent to the LLM
+MAX_FILE_CHARS = 5000
+# Files included in the chat context
+CONTEXT_MAX_FILES = 20
+
+
+# Directories to ignore
+IGNORE_DIRS = frozenset({'.git', '__pycache__', 'node_modules', '.venv', 'venv', 'env', 
+                         '.env', 'dist', 'build', '.next', '.nuxt', 'coverage', '.pytest_cache'})
+
+CODE_EXTENSIONS = ('.py', '.js', '.ts', '.jsx', '.tsx')
+
+# Formatted file context per project, persisted across `umbra ask` runs
+CONTEXT_CACHE_DIR = Path.home() / ".cache" / "umbra" / "chat"
+
+
+def get_code_files(
+    project_path: str,
+    extensions: tuple = CODE_EXTENSIONS,
+    max_files: int | None = None,
+) -> dict:
+    """Get code files content from the project.
+    
+    Paths are collected first; with max_files set, only that many of the
+    most important ones (see file_priority) are read.
+    """
+    return _read_code_files(_list_code_files(project_path, extensions), max_files)
+
+
+def _list_code_files(project_path: str, extensions: tuple) -> list[tuple[str, str]]:
+    """List (relative_path, path) of code files, most important first."""
     project = Path(project_path)
     
-    # Directories to ignore
-    ignore_dirs = {'.git', '__pycache__', 'node_modules', '.venv', 'venv', 'env', 
-                   '.env', 'dist', 'build', '.next', '.nuxt', 'coverage', '.pytest_cache'}
+    candidates = []
+    for root, dirs, files in os.walk(project):
+        # Prune ignored directories so we never descend into them
+        dirs[:] = [d for d in dirs if d not in IGNORE_DIRS]
+        
+        for name in files:
+            if name.endswith(extensions):
+                file_path = os.path.join(root, name)
+                candidates.append((os.path.relpath(file_path, project), file_path))
     
-    for ext in extensions:
-        for file_path in project.rglob(f'*{ext}'):
-            # Skip ignored directories
-            if any(ignored in file_path.parts for ignored in ignore_dirs):
-                continue
-            
-            try:
-                relative_path = file_path.relative_to(project)
-                content = file_path.read_text(encoding='utf-8', errors='ignore')
-                
-                # Limit file size to avoid token overflow
-                if len(content) > 5000:
-                    content = content[:5000] + "\n\n... [truncated]"
-                
-                files_content[str(relative_path)] = content
-            except Exception:
-                continue
+    # Most important files first (stable, so walk order breaks ties)
+    candidates.sort(key=lambda c: file_priority(c[0]))
+    return candidates
+
+
+def _read_code_files(candidates: list[tuple[str, str]], max_files: int | None) -> dict:
+    """Read candidates in order until max_files files (if set) have been collected."""
+    files_content = {}
+    for relative_path, file_path in candidates:
+        try:
+            content = _read_cached(file_path)
+        except Exception:
+            continue
+        
+        files_content[relative_path] = content
+        if max_files is not None and len(files_content) >= max_files:
+            break
     
     return files_content
 
 
+def get_files_context(project_path: str, max_files: int = CONTEXT_MAX_FILES) -> str:
+    """Get the formatted code context for a project.
+    
+    The result is cached on disk and reused as long as no code file was
+    added, removed or modified (only a stat pass is needed to check).
+    """
+    candidates = _list_code_files(project_path, CODE_EXTENSIONS)
+    fingerprint = _fingerprint(candidates, max_files)
+    
+    project_key = hashlib.blake2b(
+        str(Path(project_path).resolve()).encode(), digest_size=16
+    ).hexdigest()
+    cache_file = CONTEXT_CACHE_DIR / f"{project_key}.json"
+    
+    try:
+        cached = json.loads(cache_file.read_text(encoding='utf-8'))
+        if cached.get("fingerprint") == fingerprint:
+            return cached["files_formatted"]
+    except (OSError, ValueError, KeyError):
+        pass
+    
+    files_content = _read_code_files(candidates, max_files * 2)
+    files_formatted = format_files_for_context(files_content, max_files=max_files)
+    
+    try:
+        CONTEXT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        cache_file.write_text(
+            json.dumps({"fingerprint": fingerprint, "files_formatted": files_formatted}),
+            encoding='utf-8',
+        )
+    except OSError:
+        pass
+    
+    return files_formatted
+
+
+def _fingerprint(candidates: list[tuple[str, str]], max_files: int) -> str:
+    """Hash the paths, sizes and mtimes of all candidate files."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{max_files}|{MAX_FILE_CHARS}\n".encode())
+    for relative_path, file_path in candidates:
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            continue
+        h.update(f"{relative_path}\0{st.st_mtime_ns}\0{st.st_size}\n".encode(errors='surrogatepass'))
+    return h.hexdigest()
+
+
+def _read_cached(file_path: str) -> str:
+    """Read a file's truncated content, reusing the cached copy if unmodified."""
+    st = os.stat(file_path)
+    cached = _FILE_CACHE.get(file_path)
+    if cached is not None and cached[0] == st.st_mtime_ns:
+        _FILE_CACHE.move_to_end(file_path)
+        return cached[1]
+    
+    # Limit file size to avoid token overflow (stop reading at the cap)
+    with open(file_path, encoding='utf-8', errors='ignore') as f:
+        content = f.read(MAX_FILE_CHARS + 1)
+    if len(content) > MAX_FILE_CHARS:
+        content = content[:MAX_FILE_CHARS] + "\n\n... [truncated]"
+    
+    _FILE_CACHE[file_path] = (st.st_mtime_ns, content)
+    _FILE_CACHE.move_to_end(file_path)
+    if len(_FILE_CACHE) > _FILE_CACHE_MAX:
+        _FILE_CACHE.popitem(last=False)
+    return content
+
+
+# Important files first, in this order
+PRIORITY_PATTERNS = ('main', 'app', 'index', 'server', 'api', 'route', 'config')
+
+
+@lru_cache(maxsize=4096)
+def file_priority(filename: str) -> int:
+    """Rank a file by the first priority pattern found in its name (lower is better)."""
+    lowered = filename.lower()
+    for i, pattern in enumerate(PRIORITY_PATTERNS):
+        if pattern in lowered:
+            return i
+    return len(PRIORITY_PATTERNS)
+
+
 def format_files_for_context(files_content: dict, max_files: int = 20) -> str:
     """Format files content for LLM context."""
     if not files_content:
         return "No code files found."
     
-    # Prioritize important files
-    priority_patterns = ['main', 'app', 'index', 'server', 'api', 'route', 'config']
-    
-    def file_priority(filename: str) -> int:
-        for i, pattern in enumerate(priority_patterns):
-            if pattern in filename.lower():
-                return i
-        return len(priority_patterns)
-    
     sorted_files = sorted(files_content.keys(), key=file_priority)[:max_files]
     
     formatted = []
@@ -123,8 +241,7 @@ def ask_umbra(question: str, project_path: str = ".") -> str:
     
     # Load context
     architecture_context = load_architecture_context(project_path)
-    files_content = get_code_files(project_path)
-    files_formatted = format_files_for_context(files_content)
+    files_formatted = get_files_context(project_path)
     
     # Build the prompt
     system_prompt = CHAT_SYSTEM_PROMPT.format(
@@ -132,12 +249,8 @@ def ask_umbra(question: str, project_path: str = ".") -> str:
         files_content=files_formatted
     )
     
-    # Initialize LLM
-    llm = ChatGoogleGenerativeAI(
-        model="models/gemini-flash-latest",
-        google_api_key=api_key,
-        temperature=0.3
-    )
+    # Initialize LLM (cached client)
+    llm = get_llm("models/gemini-flash-latest", 0.3, google_api_key=api_key)
     
     # Get response
     messages = [
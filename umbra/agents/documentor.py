@@ -7,12 +7,23 @@ based on code analysis.
 
 import os
 import ast
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+import urllib.request
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
 from rich.console import Console
 
+from umbra.agents import _doc_cache
+
 console = Console()
 
 # Configure API
@@ -20,17 +31,40 @@ api_key = os.getenv("GOOGLE_API_KEY")
 if api_key:
     genai.configure(api_key=api_key)
 
-DOC_PROMPT = """You are a documentation expert. Analyze this Python module and generate clear, concise documentation.
-
-**File**: {file_path}
-**Code**:
-```python
-{code}
-```
+MODEL_NAME = "gemini-2.0-flash"
+
+# Concurrent Gemini requests when documenting/scanning many files
+BATCH_CONCURRENCY = 8
+# Files sent together in one documentation/security prompt
+BATCH_SIZE = 5
+
+# Transient Gemini errors (rate limit, overload, timeout) are retried with
+# exponential backoff; anything else (e.g. an invalid key) fails fast
+RETRYABLE_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.DeadlineExceeded,
+)
+MAX_ATTEMPTS = 3
+RETRY_BASE_SECONDS = 0.5
+RETRY_MAX_SECONDS = 8.0
+
+# Gemini Batch API (half price, results within 24h) for offline bulk scans
+BATCH_API_URL = "https://generativelanguage.googleapis.com/v1beta"
+BATCH_POLL_SECONDS = 30
+BATCH_TIMEOUT_SECONDS = 24 * 3600
+
+# Numbered section headings ("### 2. ...") in a batched documentation response
+_SECTION_RE = re.compile(r"^### (\d+)\.[^\S\n]*", re.MULTILINE)
+
+# Static instructions go in the system instruction so every request shares
+# the same prefix (eligible for Gemini's implicit prompt caching); the
+# per-file prompts below only carry the file itself.
+DOC_SYSTEM_PROMPT = """You are a documentation expert. Analyze the Python module you are given and generate clear, concise documentation.
 
 Generate documentation in this EXACT format:
 
-### {module_name}
+### <module name>
 
 **Purpose**: [One sentence explaining what this module does]
 
@@ -48,13 +82,7 @@ Generate documentation in this EXACT format:
 Keep it SHORT and USEFUL. Focus on WHAT it does, not HOW.
 """
 
-SECURITY_PROMPT = """You are a security expert. Analyze this code for potential vulnerabilities.
-
-**File**: {file_path}
-**Code**:
-```python
-{code}
-```
+SECURITY_SYSTEM_PROMPT = """You are a security expert. Analyze the code you are given for potential vulnerabilities.
 
 Check for these vulnerabilities:
 1. Hardcoded secrets/API keys
@@ -67,29 +95,47 @@ Check for these vulnerabilities:
 8. Debug code left in production
 
 Respond in this EXACT format (JSON):
-{{
-  "file": "{file_path}",
+{
+  "file": "<file path exactly as given>",
   "risk_level": "none|low|medium|high|critical",
   "issues": [
-    {{
+    {
       "type": "vulnerability type",
       "line": line_number_or_null,
       "description": "brief description",
       "recommendation": "how to fix"
-    }}
+    }
   ]
-}}
+}
 
-If no issues found, return:
-{{
-  "file": "{file_path}",
-  "risk_level": "none",
-  "issues": []
-}}
+If no issues found, return the same object with "risk_level": "none" and "issues": [].
 
 Return ONLY valid JSON, no markdown.
 """
 
+DOC_PROMPT = """**Module**: {module_name}
+**File**: {file_path}
+**Code**:
+```python
+{code}
+```
+"""
+
+SECURITY_PROMPT = """**File**: {file_path}
+**Code**:
+```python
+{code}
+```
+"""
+
+DOC_BATCH_PROMPT = """Document EACH module below. Write one section per module, in the same order, starting it with `### <number>. <module name>` (numbered like the modules below) instead of `### <module name>`.
+
+{modules}"""
+
+SECURITY_BATCH_PROMPT = """Analyze EACH file below. Respond with a JSON array containing one report object per file.
+
+{files}"""
+
 
 def extract_module_info(code: str) -> Dict:
     """Extract structural information from Python code using AST."""
@@ -103,16 +149,19 @@ def extract_module_info(code: str) -> Dict:
     try:
         tree = ast.parse(code)
         
-        for node in ast.walk(tree):
+        # Only module-level definitions matter, so function bodies are never visited
+        for node in tree.body:
             if isinstance(node, ast.ClassDef):
-                methods = [n.name for n in node.body if isinstance(n, ast.FunctionDef)]
+                methods = [
+                    n.name for n in node.body
+                    if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef))
+                ]
                 info["classes"].append({
                     "name": node.name,
                     "methods": methods,
                     "docstring": ast.get_docstring(node),
                 })
-            elif isinstance(node, ast.FunctionDef) and node.col_offset == 0:
-                # Top-level function only
+            elif isinstance(node, ast.FunctionDef):
                 info["functions"].append({
                     "name": node.name,
                     "args": [arg.arg for arg in node.args.args],
@@ -135,29 +184,344 @@ def extract_module_info(code: str) -> Dict:
     return info
 
 
+@lru_cache(maxsize=None)
+def _get_model(
+    name: str = MODEL_NAME, system_instruction: Optional[str] = None
+) -> genai.GenerativeModel:
+    """Get a shared GenerativeModel instance."""
+    return genai.GenerativeModel(name, system_instruction=system_instruction)
+
+
+def _generate(
+    prompt: str,
+    temperature: float,
+    max_output_tokens: int,
+    system_instruction: Optional[str] = None,
+) -> str:
+    """Generate text for a prompt, reusing a cached response when available."""
+    key = None
+    if _doc_cache.is_enabled():
+        key = _doc_cache.make_key(
+            MODEL_NAME, temperature, max_output_tokens, f"{system_instruction or ''}\0{prompt}"
+        )
+        cached = _doc_cache.get(key)
+        if cached is not None:
+            return cached
+
+    model = _get_model(system_instruction=system_instruction)
+    for attempt in range(MAX_ATTEMPTS):
+        try:
+            response = model.generate_content(
+                prompt,
+                generation_config=genai.types.GenerationConfig(
+                    temperature=temperature,
+                    max_output_tokens=max_output_tokens,
+                ),
+            )
+            break
+        except RETRYABLE_ERRORS:
+            if attempt == MAX_ATTEMPTS - 1:
+                raise
+            delay = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** attempt)
+            time.sleep(delay + random.uniform(0, delay / 2))
+    text = response.text.strip()
+
+    if key is not None:
+        _doc_cache.put(key, text)
+    return text
+
+
+async def _run_batch(func, batches: List[List[Tuple[str, str]]], concurrency: int) -> list:
+    """Run func(batch) for every batch of (file_path, code), at most `concurrency` at a time.
+
+    Calls run in worker threads: the blocking client is safe to share,
+    while the async gRPC client is bound to the first event loop it sees.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(batch: List[Tuple[str, str]]):
+        async with semaphore:
+            return await asyncio.to_thread(func, batch)
+
+    results = await asyncio.gather(*(run(batch) for batch in batches))
+    return [item for batch_results in results for item in batch_results]
+
+
+def _chunk(modules: Dict[str, str], size: int) -> List[List[Tuple[str, str]]]:
+    """Split modules into lists of at most `size` (file_path, code) pairs."""
+    items = list(modules.items())
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _format_batch(batch: List[Tuple[str, str]]) -> str:
+    """Format a batch of modules as numbered prompt sections."""
+    return "\n".join(
+        f"### {i}. {file_path}\n```python\n{code[:8000]}\n```\n"
+        for i, (file_path, code) in enumerate(batch, 1)
+    )
+
+
+def batch_generate_module_docs(
+    modules: Dict[str, str],
+    batch_size: int = BATCH_SIZE,
+    concurrency: int = BATCH_CONCURRENCY,
+) -> List[Optional[str]]:
+    """Generate documentation for many modules (results in input order).
+
+    Modules are sent `batch_size` at a time in one prompt, and batches run
+    concurrently. Modules with identical code are documented once.
+    """
+    unique, sources = _dedupe(modules)
+    docs = dict(zip(unique, asyncio.run(
+        _run_batch(_generate_doc_batch, _chunk(unique, batch_size), concurrency)
+    )))
+    return [
+        _retitle(docs[source], file_path) if source != file_path else docs[source]
+        for file_path, source in zip(modules, sources)
+    ]
+
+
+def batch_scan_security(
+    modules: Dict[str, str],
+    batch_size: int = BATCH_SIZE,
+    concurrency: int = BATCH_CONCURRENCY,
+) -> List[Optional[Dict]]:
+    """Scan many files for vulnerabilities (results in input order).
+
+    Files are sent `batch_size` at a time in one prompt, and batches run
+    concurrently. Files with identical code are scanned once.
+    """
+    unique, sources = _dedupe(modules)
+    reports = dict(zip(unique, asyncio.run(
+        _run_batch(_scan_security_batch, _chunk(unique, batch_size), concurrency)
+    )))
+    return [
+        {**reports[source], "file": file_path}
+        if source != file_path and reports[source] is not None
+        else reports[source]
+        for file_path, source in zip(modules, sources)
+    ]
+
+
+def _dedupe(modules: Dict[str, str]) -> Tuple[Dict[str, str], List[str]]:
+    """Collapse modules whose (truncated) code is identical.
+
+    Returns the unique modules and, for every input module, the path of
+    the unique module standing in for it.
+    """
+    first_by_hash: Dict[str, str] = {}
+    unique: Dict[str, str] = {}
+    sources = []
+    for file_path, code in modules.items():
+        digest = hashlib.sha256(code[:8000].encode("utf-8", "surrogatepass")).digest()
+        source = first_by_hash.setdefault(digest, file_path)
+        if source == file_path:
+            unique[file_path] = code
+        sources.append(source)
+    return unique, sources
+
+
+def _retitle(doc: Optional[str], file_path: str) -> Optional[str]:
+    """Point a doc generated for an identical module at file_path's module name."""
+    if doc is None or not doc.startswith("### "):
+        return doc
+    body = doc.partition("\n")[2]
+    return f"### {Path(file_path).stem}\n{body}"
+
+
+def generate_all_docs_batch(
+    modules: Dict[str, str],
+    poll_seconds: float = BATCH_POLL_SECONDS,
+    timeout: float = BATCH_TIMEOUT_SECONDS,
+) -> Dict[str, Optional[str]]:
+    """Generate documentation for all modules with one Gemini Batch API job.
+    
+    Cheaper than interactive calls but may take minutes to hours, so this
+    is meant for offline scans (`umbra scan --batch`). Cached docs are
+    reused and new ones are added to the cache. Falls back to
+    batch_generate_module_docs if the job cannot be run.
+    """
+    docs: Dict[str, Optional[str]] = {}
+    if not api_key:
+        return {file_path: None for file_path in modules}
+    
+    # Reuse cached docs and only submit the rest
+    requests = []
+    keys = {}
+    for file_path, code in modules.items():
+        prompt = DOC_PROMPT.format(
+            file_path=file_path,
+            code=code[:8000],
+            module_name=Path(file_path).stem,
+        )
+        key = _doc_cache.make_key(MODEL_NAME, 0.3, 1000, f"{DOC_SYSTEM_PROMPT}\0{prompt}")
+        cached = _doc_cache.get(key) if _doc_cache.is_enabled() else None
+        if cached is not None:
+            docs[file_path] = cached
+            continue
+        
+        keys[file_path] = key
+        requests.append({
+            "request": {
+                "system_instruction": {"parts": [{"text": DOC_SYSTEM_PROMPT}]},
+                "contents": [{"parts": [{"text": prompt}]}],
+                "generation_config": {"temperature": 0.3, "max_output_tokens": 1000},
+            },
+            "metadata": {"key": file_path},
+        })
+    
+    if not requests:
+        return docs
+    
+    try:
+        job = _batch_api_request(
+            f"models/{MODEL_NAME}:batchGenerateContent",
+            {
+                "batch": {
+                    "display_name": "umbra-module-docs",
+                    "input_config": {"requests": {"requests": requests}},
+                }
+            },
+        )
+        
+        deadline = time.monotonic() + timeout
+        state = job.get("metadata", {}).get("state")
+        while state != "BATCH_STATE_SUCCEEDED":
+            if state in ("BATCH_STATE_FAILED", "BATCH_STATE_CANCELLED", "BATCH_STATE_EXPIRED"):
+                raise RuntimeError(f"batch job ended with {state}")
+            if time.monotonic() > deadline:
+                raise TimeoutError("batch job did not finish in time")
+            time.sleep(poll_seconds)
+            job = _batch_api_request(job["name"])
+            state = job.get("metadata", {}).get("state")
+        
+        responses = job["response"]["inlinedResponses"]["inlinedResponses"]
+        for item in responses:
+            file_path = item.get("metadata", {}).get("key")
+            try:
+                text = item["response"]["candidates"][0]["content"]["parts"][0]["text"].strip()
+            except (KeyError, IndexError):
+                text = None
+            if file_path in keys and text:
+                docs[file_path] = text
+                if _doc_cache.is_enabled():
+                    _doc_cache.put(keys[file_path], text)
+    except Exception as e:
+        console.print(f"[yellow]   Batch API job failed, generating directly: {e}[/yellow]")
+        remaining = {fp: modules[fp] for fp in keys if fp not in docs}
+        docs.update(zip(remaining, batch_generate_module_docs(remaining)))
+    
+    return {file_path: docs.get(file_path) for file_path in modules}
+
+
+def _batch_api_request(path: str, body: Optional[dict] = None) -> dict:
+    """Call the Gemini REST API (GET, or POST when a body is given)."""
+    request = urllib.request.Request(
+        f"{BATCH_API_URL}/{path}",
+        data=json.dumps(body).encode() if body is not None else None,
+        headers={"x-goog-api-key": api_key, "Content-Type": "application/json"},
+        method="POST" if body is not None else "GET",
+    )
+    with urllib.request.urlopen(request, timeout=60) as response:
+        return json.loads(response.read())
+
+
+def _generate_doc_batch(batch: List[Tuple[str, str]]) -> List[Optional[str]]:
+    """Document a batch of modules with one request.
+
+    Modules missing from a successful response are documented one by one;
+    if the request itself failed on quota/availability after its retries,
+    the batch is skipped rather than retried per module.
+    """
+    docs: List[Optional[str]] = [None] * len(batch)
+    if len(batch) > 1 and api_key:
+        try:
+            text = _generate(
+                DOC_BATCH_PROMPT.format(modules=_format_batch(batch)),
+                temperature=0.3,
+                max_output_tokens=1000 * len(batch),
+                system_instruction=DOC_SYSTEM_PROMPT,
+            )
+            parts = _SECTION_RE.split(text)
+            # parts = [preamble, number, section, number, section, ...]
+            for number, section in zip(parts[1::2], parts[2::2]):
+                index = int(number) - 1
+                body = section.partition("\n")[2].strip()
+                if 0 <= index < len(batch) and body:
+                    docs[index] = f"### {Path(batch[index][0]).stem}\n\n{body}"
+        except RETRYABLE_ERRORS as e:
+            console.print(f"[yellow]   Batched doc generation gave up: {e}[/yellow]")
+            return docs
+        except Exception as e:
+            console.print(f"[yellow]   Batched doc generation failed: {e}[/yellow]")
+
+    return [
+        doc if doc is not None else generate_module_doc(file_path, code)
+        for doc, (file_path, code) in zip(docs, batch)
+    ]
+
+
+def _scan_security_batch(batch: List[Tuple[str, str]]) -> List[Optional[Dict]]:
+    """Scan a batch of files with one request.
+
+    Files missing from a successful response are scanned one by one;
+    if the request itself failed on quota/availability after its retries,
+    the batch is skipped rather than retried per file.
+    """
+    results: List[Optional[Dict]] = [None] * len(batch)
+    if len(batch) > 1 and api_key:
+        try:
+            text = _generate(
+                SECURITY_BATCH_PROMPT.format(files=_format_batch(batch)),
+                temperature=0.1,
+                max_output_tokens=1000 * len(batch),
+                system_instruction=SECURITY_SYSTEM_PROMPT,
+            )
+            reports = _parse_json(text)
+            if isinstance(reports, list):
+                positions = {file_path: i for i, (file_path, _) in enumerate(batch)}
+                for report in reports:
+                    if isinstance(report, dict) and report.get("file") in positions:
+                        results[positions[report["file"]]] = report
+        except RETRYABLE_ERRORS as e:
+            console.print(f"[yellow]   Batched security scan gave up: {e}[/yellow]")
+            return results
+        except Exception as e:
+            console.print(f"[yellow]   Batched security scan failed: {e}[/yellow]")
+
+    return [
+        result if result is not None else scan_security(file_path, code)
+        for result, (file_path, code) in zip(results, batch)
+    ]
+
+
+def _parse_json(text: str):
+    """Parse a JSON response, unwrapping a markdown code fence if present."""
+    if text.startswith("```"):
+        text = text.split("```")[1]
+        if text.startswith("json"):
+            text = text[4:]
+    return json.loads(text)
+
+
 def generate_module_doc(file_path: str, code: str) -> Optional[str]:
     """Generate documentation for a single module."""
     if not api_key:
         return None
     
     try:
-        model = genai.GenerativeModel("gemini-2.0-flash")
-        
         module_name = Path(file_path).stem
         
-        response = model.generate_content(
+        return _generate(
             DOC_PROMPT.format(
                 file_path=file_path,
                 code=code[:8000],  # Limit code size
                 module_name=module_name,
             ),
-            generation_config=genai.types.GenerationConfig(
-                temperature=0.3,
-                max_output_tokens=1000,
-            ),
+            temperature=0.3,
+            max_output_tokens=1000,
+            system_instruction=DOC_SYSTEM_PROMPT,
         )
-        
-        return response.text.strip()
     except Exception as e:
         console.print(f"[yellow]   Doc generation failed: {e}[/yellow]")
         return None
@@ -169,30 +533,18 @@ def scan_security(file_path: str, code: str) -> Optional[Dict]:
         return None
     
     try:
-        model = genai.GenerativeModel("gemini-2.0-flash")
-        
-        response = model.generate_content(
+        text = _generate(
             SECURITY_PROMPT.format(
                 file_path=file_path,
                 code=code[:8000],
             ),
-            generation_config=genai.types.GenerationConfig(
-                temperature=0.1,
-                max_output_tokens=1000,
-            ),
+            temperature=0.1,
+            max_output_tokens=1000,
+            system_instruction=SECURITY_SYSTEM_PROMPT,
         )
         
-        # Parse JSON response
-        import json
-        text = response.text.strip()
-        
-        # Clean up if wrapped in markdown
-        if text.startswith("```"):
-            text = text.split("```")[1]
-            if text.startswith("json"):
-                text = text[4:]
-        
-        return json.loads(text)
+        # Parse JSON response (may be wrapped in markdown)
+        return _parse_json(text)
     except Exception as e:
         console.print(f"[yellow]   Security scan failed: {e}[/yellow]")
         return None
@@ -233,7 +585,7 @@ def generate_quick_context(project_summary: str, file_list: List[str]) -> str:
         return "Quick context not available (no API key)."
     
     try:
-        model = genai.GenerativeModel("gemini-2.0-flash")
+        model = _get_model()
         
         prompt = f"""Based on this project information, write a SINGLE paragraph (3-5 sentences) that gives an LLM everything it needs to understand this project quickly.
 
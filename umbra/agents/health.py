@@ -10,11 +10,17 @@ Continuously monitors project health, detecting:
 """
 
 import ast
+import hashlib
+import json
 import os
 import re
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
+from itertools import repeat
 from pathlib import Path
 from typing import Dict, List, Optional, Set, Tuple
 
@@ -22,6 +28,65 @@ from rich.console import Console
 
 console = Console()
 
+# Hardcoded secret patterns, checked in order (first match names the secret)
+SECRET_PATTERNS = [
+    (r'api[_-]?key\s*=\s*["\'][^"\']{10,}["\']', "API key"),
+    (r'password\s*=\s*["\'][^"\']+["\']', "Password"),
+    (r'secret\s*=\s*["\'][^"\']{10,}["\']', "Secret"),
+    (r'token\s*=\s*["\'][^"\']{20,}["\']', "Token"),
+    (r'aws[_-]?access[_-]?key', "AWS Access Key"),
+    (r'private[_-]?key\s*=', "Private Key"),
+]
+_SECRET_RES = [(re.compile(p, re.IGNORECASE), name) for p, name in SECRET_PATTERNS]
+# All secret patterns at once, to find candidate lines in a single pass
+_ANY_SECRET_RE = re.compile("|".join(f"(?:{p})" for p, _ in SECRET_PATTERNS), re.IGNORECASE)
+# Every secret pattern contains one of these words (lowercase)
+_SECRET_TRIGGERS = ("key", "password", "secret", "token")
+# Same, on raw bytes, to rule out files before decoding
+_ANY_SECRET_BYTES_RE = re.compile(_ANY_SECRET_RE.pattern.encode(), re.IGNORECASE)
+
+# Parse results (imports, syntax error) keyed by content hash (LRU), so
+# unchanged files are not parsed again on re-scan
+_PARSE_CACHE: "OrderedDict[str, Tuple[frozenset, Optional[SyntaxError]]]" = OrderedDict()
+_PARSE_CACHE_MAX = 4096
+
+# Standard library and known third-party top-level modules
+_STDLIB = frozenset({
+    "os", "sys", "re", "json", "datetime", "time", "pathlib",
+    "typing", "collections", "itertools", "functools", "ast",
+    "dataclasses", "enum", "abc", "copy", "io", "logging",
+    "threading", "multiprocessing", "subprocess", "socket",
+    "http", "urllib", "email", "html", "xml", "sqlite3",
+    "hashlib", "hmac", "secrets", "random", "math", "statistics",
+    "unittest", "doctest", "pdb", "profile", "timeit",
+    "argparse", "configparser", "csv", "pickle", "shelve",
+    "contextlib", "traceback", "warnings", "inspect", "dis",
+    "builtins", "importlib", "pkgutil", "types", "textwrap",
+    "difflib", "tempfile", "shutil", "glob", "fnmatch",
+})
+
+_THIRDPARTY = frozenset({
+    "click", "rich", "dotenv", "requests", "flask", "fastapi",
+    "django", "sqlalchemy", "pydantic", "pytest", "numpy",
+    "pandas", "scipy", "matplotlib", "google", "langchain",
+    "langgraph", "openai", "anthropic", "watchdog", "uvicorn",
+    "starlette", "httpx", "aiohttp", "asyncio", "anyio",
+})
+
+# Directories never scanned
+IGNORE_DIRS = frozenset({
+    "__pycache__", ".git", ".venv", "venv", "node_modules",
+    ".pytest_cache", "dist", "build", ".next", "output",
+})
+
+# Per-file results of previous scans, one index per project
+HEALTH_CACHE_DIR = Path.home() / ".cache" / "umbra" / "health"
+# Bump when per-file checks change so stale results are discarded
+_HEALTH_CACHE_VERSION = 1
+
+# Below this many files, scanning in-process beats starting worker processes
+PARALLEL_MIN_FILES = 64
+
 
 class IssueSeverity(Enum):
     """Severity level of health issues."""
@@ -43,7 +108,7 @@ class IssueType(Enum):
     DEPRECATED_USAGE = "deprecated_usage"
 
 
-@dataclass
+@dataclass(slots=True)
 class HealthIssue:
     """A detected health issue."""
     issue_type: IssueType
@@ -64,9 +129,20 @@ class HealthIssue:
             "suggestion": self.suggestion,
             "detected_at": self.detected_at.isoformat(),
         }
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> "HealthIssue":
+        return cls(
+            issue_type=IssueType(data["type"]),
+            severity=IssueSeverity(data["severity"]),
+            file_path=data["file"],
+            line_number=data["line"],
+            message=data["message"],
+            suggestion=data["suggestion"],
+        )
 
 
-@dataclass
+@dataclass(slots=True)
 class HealthReport:
     """Overall health report for the project."""
     score: int  # 0-100
@@ -103,9 +179,14 @@ class HealthMonitor:
         # Find all Python files
         python_files = self._find_python_files()
         
-        # Load and analyze each file
-        for file_path in python_files:
-            self._analyze_file(file_path)
+        # Load and analyze each file, reusing results for unchanged files
+        results = self._analyze_files(python_files)
+        
+        for file_path, content, imports, issues in results:
+            if content is not None:
+                self.file_contents[file_path] = content
+                self.import_graph[file_path] = imports
+            self.issues.extend(issues)
         
         # Run cross-file checks
         self._check_broken_imports()
@@ -137,7 +218,8 @@ class HealthMonitor:
         issues = []
         
         # Syntax check
-        syntax_issue = self._check_syntax(file_path, content)
+        _, syntax_error = self._parse(content)
+        syntax_issue = self._check_syntax(file_path, syntax_error)
         if syntax_issue:
             issues.append(syntax_issue)
         
@@ -154,44 +236,156 @@ class HealthMonitor:
     
     def _find_python_files(self) -> List[Path]:
         """Find all Python files in the project."""
-        ignore_patterns = {
-            "__pycache__", ".git", ".venv", "venv", "node_modules",
-            ".pytest_cache", "dist", "build", ".next", "output"
-        }
-        
         files = []
-        for file_path in self.project_path.rglob("*.py"):
-            if not any(p in file_path.parts for p in ignore_patterns):
-                files.append(file_path)
+        stack = [str(self.project_path)]
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            # Prune ignored directories before descending
+                            if entry.name not in IGNORE_DIRS:
+                                stack.append(entry.path)
+                        elif entry.name.endswith(".py"):
+                            files.append(Path(entry.path))
+            except OSError:
+                continue
         
         return files
     
-    def _analyze_file(self, file_path: Path):
-        """Analyze a single file."""
+    def _analyze_files(
+        self, python_files: List[Path]
+    ) -> List[Tuple[str, Optional[str], Set[str], List[HealthIssue]]]:
+        """Analyze files, skipping those unchanged since the previous scan.
+        
+        A file is unchanged if its mtime and size, or else its SHA-256,
+        match the cached entry. Changed files are analyzed in worker
+        processes for large projects.
+        """
+        cache_file = HEALTH_CACHE_DIR / (
+            hashlib.blake2b(str(self.project_path).encode(), digest_size=16).hexdigest() + ".json"
+        )
+        try:
+            cached = json.loads(cache_file.read_text(encoding="utf-8"))
+            if cached.get("version") != _HEALTH_CACHE_VERSION:
+                cached = {}
+            index = cached.get("files", {})
+        except (OSError, ValueError, AttributeError):
+            index = {}
+        
+        results = [None] * len(python_files)
+        stats = [None] * len(python_files)
+        digests = [None] * len(python_files)
+        pending = []
+        for i, file_path in enumerate(python_files):
+            path = str(file_path)
+            try:
+                st = file_path.stat()
+                stats[i] = st
+                entry = index.get(path)
+                if entry is None:
+                    pending.append(i)
+                    continue
+                
+                content = file_path.read_text(encoding="utf-8", errors="ignore")
+                if entry["mtime_ns"] == st.st_mtime_ns and entry["size"] == st.st_size:
+                    digests[i] = entry["sha256"]
+                else:
+                    digests[i] = _sha256(content)
+                    if digests[i] != entry["sha256"]:
+                        pending.append(i)
+                        continue
+                
+                results[i] = (
+                    path,
+                    content,
+                    set(entry["imports"]),
+                    [HealthIssue.from_dict(issue) for issue in entry["issues"]],
+                )
+            except (OSError, KeyError, TypeError, ValueError):
+                pending.append(i)
+        
+        # Analyze changed files (in worker processes for large projects)
+        analyzed = None
+        if len(pending) >= PARALLEL_MIN_FILES:
+            try:
+                with ProcessPoolExecutor() as executor:
+                    analyzed = list(executor.map(
+                        _analyze_file_worker,
+                        repeat(str(self.project_path)),
+                        [str(python_files[i]) for i in pending],
+                        chunksize=16,
+                    ))
+            except (OSError, BrokenProcessPool):
+                analyzed = None
+        if analyzed is None:
+            analyzed = [self._analyze_file(python_files[i]) for i in pending]
+        for i, result in zip(pending, analyzed):
+            results[i] = result
+        
+        # Save the index for the next scan
+        files = {}
+        for i, (path, content, imports, issues) in enumerate(results):
+            if content is None or stats[i] is None:
+                continue
+            files[path] = {
+                "mtime_ns": stats[i].st_mtime_ns,
+                "size": stats[i].st_size,
+                "sha256": digests[i] or _sha256(content),
+                "imports": sorted(imports),
+                "issues": [issue.to_dict() for issue in issues],
+            }
+        try:
+            HEALTH_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            tmp = cache_file.with_suffix(".tmp")
+            tmp.write_text(
+                json.dumps({"version": _HEALTH_CACHE_VERSION, "files": files}),
+                encoding="utf-8",
+            )
+            os.replace(tmp, cache_file)
+        except OSError:
+            pass
+        
+        return results
+    
+    def _analyze_file(
+        self, file_path: Path
+    ) -> Tuple[str, Optional[str], Set[str], List[HealthIssue]]:
+        """Analyze a single file.
+        
+        Returns (path, content, imports, issues); content is None if the
+        file could not be read.
+        """
+        issues = []
         try:
-            content = file_path.read_text(encoding="utf-8", errors="ignore")
-            self.file_contents[str(file_path)] = content
+            data = file_path.read_bytes()
+            may_have_secrets = _ANY_SECRET_BYTES_RE.search(data) is not None
+            # Same text as read_text (universal newlines)
+            content = data.decode("utf-8", errors="ignore").replace("\r\n", "\n").replace("\r", "\n")
             
-            # Extract imports
-            imports = self._extract_imports(content)
-            self.import_graph[str(file_path)] = imports
+            # Parse once for imports and syntax
+            imports, syntax_error = self._parse(content)
             
             # Check syntax
-            syntax_issue = self._check_syntax(str(file_path), content)
+            syntax_issue = self._check_syntax(str(file_path), syntax_error)
             if syntax_issue:
-                self.issues.append(syntax_issue)
+                issues.append(syntax_issue)
             
             # Check secrets
-            secret_issues = self._check_secrets(str(file_path), content)
-            self.issues.extend(secret_issues)
+            if may_have_secrets:
+                secret_issues = self._check_secrets(str(file_path), content)
+                issues.extend(secret_issues)
             
             # Check god file
             god_issue = self._check_god_file(str(file_path), content)
             if god_issue:
-                self.issues.append(god_issue)
+                issues.append(god_issue)
+            
+            return str(file_path), content, imports, issues
                 
         except Exception as e:
-            self.issues.append(HealthIssue(
+            issues.append(HealthIssue(
                 issue_type=IssueType.SYNTAX_ERROR,
                 severity=IssueSeverity.ERROR,
                 file_path=str(file_path),
@@ -199,14 +393,35 @@ class HealthMonitor:
                 message=f"Could not read file: {e}",
                 suggestion="Check file encoding and permissions",
             ))
+            return str(file_path), None, set(), issues
     
-    def _extract_imports(self, content: str) -> Set[str]:
-        """Extract import statements from Python code."""
-        imports = set()
+    def _parse(self, content: str) -> Tuple[Set[str], Optional[SyntaxError]]:
+        """Parse Python code once, returning its imports and any syntax error."""
+        key = _sha256(content)
+        cached = _PARSE_CACHE.get(key)
+        if cached is not None:
+            _PARSE_CACHE.move_to_end(key)
+            return set(cached[0]), cached[1]
         
         try:
             tree = ast.parse(content)
-            
+            error = None
+        except SyntaxError as e:
+            tree = None
+            error = e.with_traceback(None)
+        
+        imports = self._extract_imports(content, tree)
+        
+        _PARSE_CACHE[key] = (frozenset(imports), error)
+        if len(_PARSE_CACHE) > _PARSE_CACHE_MAX:
+            _PARSE_CACHE.popitem(last=False)
+        return imports, error
+    
+    def _extract_imports(self, content: str, tree: Optional[ast.AST]) -> Set[str]:
+        """Extract import statements from a parsed module (regex fallback if tree is None)."""
+        imports = set()
+        
+        if tree is not None:
             for node in ast.walk(tree):
                 if isinstance(node, ast.Import):
                     for alias in node.names:
@@ -214,7 +429,7 @@ class HealthMonitor:
                 elif isinstance(node, ast.ImportFrom):
                     if node.module:
                         imports.add(node.module.split('.')[0])
-        except SyntaxError:
+        else:
             # Try regex fallback
             import_pattern = r'^(?:from\s+([\w.]+)|import\s+([\w.]+))'
             for match in re.finditer(import_pattern, content, re.MULTILINE):
@@ -224,47 +439,58 @@ class HealthMonitor:
         
         return imports
     
-    def _check_syntax(self, file_path: str, content: str) -> Optional[HealthIssue]:
-        """Check for syntax errors."""
-        try:
-            ast.parse(content)
+    def _check_syntax(self, file_path: str, error: Optional[SyntaxError]) -> Optional[HealthIssue]:
+        """Turn a syntax error from _parse into an issue."""
+        if error is None:
             return None
-        except SyntaxError as e:
-            return HealthIssue(
-                issue_type=IssueType.SYNTAX_ERROR,
-                severity=IssueSeverity.CRITICAL,
-                file_path=file_path,
-                line_number=e.lineno,
-                message=f"Syntax error: {e.msg}",
-                suggestion="Fix the syntax error before committing",
-            )
+        
+        return HealthIssue(
+            issue_type=IssueType.SYNTAX_ERROR,
+            severity=IssueSeverity.CRITICAL,
+            file_path=file_path,
+            line_number=error.lineno,
+            message=f"Syntax error: {error.msg}",
+            suggestion="Fix the syntax error before committing",
+        )
     
     def _check_secrets(self, file_path: str, content: str) -> List[HealthIssue]:
         """Check for hardcoded secrets."""
         issues = []
         
-        secret_patterns = [
-            (r'api[_-]?key\s*=\s*["\'][^"\']{10,}["\']', "API key"),
-            (r'password\s*=\s*["\'][^"\']+["\']', "Password"),
-            (r'secret\s*=\s*["\'][^"\']{10,}["\']', "Secret"),
-            (r'token\s*=\s*["\'][^"\']{20,}["\']', "Token"),
-            (r'aws[_-]?access[_-]?key', "AWS Access Key"),
-            (r'private[_-]?key\s*=', "Private Key"),
-        ]
-        
-        lines = content.split('\n')
-        for line_num, line in enumerate(lines, 1):
+        # Cheap substring test before any regex work
+        lowered = content.lower()
+        if not any(trigger in lowered for trigger in _SECRET_TRIGGERS):
+            return issues
+        
+        # Jump from candidate line to candidate line; only lines where some
+        # pattern matches are inspected individually
+        pos = 0
+        line_num = 1
+        counted_to = 0
+        while True:
+            match = _ANY_SECRET_RE.search(content, pos)
+            if match is None:
+                break
+            
+            line_start = content.rfind('\n', 0, match.start()) + 1
+            line_end = content.find('\n', match.start())
+            if line_end == -1:
+                line_end = len(content)
+            line_num += content.count('\n', counted_to, line_start)
+            counted_to = line_start
+            pos = line_end + 1
+            line = content[line_start:line_end]
+            
             # Skip comments
-            stripped = line.strip()
-            if stripped.startswith('#'):
+            if line.strip().startswith('#'):
                 continue
-                
-            for pattern, secret_type in secret_patterns:
-                if re.search(pattern, line, re.IGNORECASE):
-                    # Skip if it's reading from env
-                    if 'os.getenv' in line or 'os.environ' in line or '.env' in line:
-                        continue
-                    
+            
+            # Skip if it's reading from env
+            if 'os.getenv' in line or 'os.environ' in line or '.env' in line:
+                continue
+            
+            for pattern, secret_type in _SECRET_RES:
+                if pattern.search(line):
                     issues.append(HealthIssue(
                         issue_type=IssueType.HARDCODED_SECRET,
                         severity=IssueSeverity.CRITICAL,
@@ -279,7 +505,7 @@ class HealthMonitor:
     
     def _check_god_file(self, file_path: str, content: str) -> Optional[HealthIssue]:
         """Check for god files (too large)."""
-        lines = len(content.split('\n'))
+        lines = content.count('\n') + 1
         
         if lines > 500:
             return HealthIssue(
@@ -350,36 +576,22 @@ class HealthMonitor:
             local_imports = {i for i in imports if not self._is_stdlib_or_thirdparty(i)}
             module_imports[module_name] = local_imports
         
-        # Find cycles using DFS
-        visited = set()
-        rec_stack = set()
-        cycles = []
-        
-        def find_cycle(module: str, path: List[str]) -> bool:
-            visited.add(module)
-            rec_stack.add(module)
-            path.append(module)
-            
-            for imp in module_imports.get(module, set()):
-                if imp not in visited:
-                    if find_cycle(imp, path):
-                        return True
-                elif imp in rec_stack:
-                    # Found cycle
-                    cycle_start = path.index(imp)
-                    cycles.append(path[cycle_start:])
-                    return True
-            
-            path.pop()
-            rec_stack.remove(module)
-            return False
+        # Keep only edges to scanned modules
+        graph = {
+            module: sorted(imports.intersection(module_imports))
+            for module, imports in module_imports.items()
+        }
         
-        for module in module_imports:
-            if module not in visited:
-                find_cycle(module, [])
+        # Each strongly connected component with a cycle is one cycle set
+        cycles = [
+            component
+            for component in _strongly_connected_components(graph)
+            if len(component) > 1 or component[0] in graph[component[0]]
+        ]
         
-        # Report cycles
-        for cycle in cycles[:3]:  # Limit to first 3 cycles
+        # Report an actual import cycle from each set
+        for component in cycles[:3]:  # Limit to first 3 cycles
+            cycle = _shortest_cycle(graph, component[0], set(component))
             cycle_str = " -> ".join(cycle + [cycle[0]])
             self.issues.append(HealthIssue(
                 issue_type=IssueType.CIRCULAR_DEPENDENCY,
@@ -392,10 +604,12 @@ class HealthMonitor:
     
     def _check_orphan_files(self):
         """Find files that are never imported."""
-        # Build set of all imported modules
-        all_imports = set()
+        # Build set of all imported names (each dotted component counts)
+        imported_names = set()
         for imports in self.import_graph.values():
-            all_imports.update(imports)
+            for imp in imports:
+                imported_names.add(imp)
+                imported_names.update(imp.split('.'))
         
         # Check each file
         entry_points = {"main", "__main__", "cli", "app", "wsgi", "asgi", "manage"}
@@ -413,12 +627,7 @@ class HealthMonitor:
                 continue
             
             # Check if any file imports this module
-            is_imported = any(
-                module_name in imp or module_name in imp.split('.')
-                for imp in all_imports
-            )
-            
-            if not is_imported:
+            if module_name not in imported_names:
                 self.issues.append(HealthIssue(
                     issue_type=IssueType.ORPHAN_FILE,
                     severity=IssueSeverity.INFO,
@@ -453,30 +662,8 @@ class HealthMonitor:
     
     def _is_stdlib_or_thirdparty(self, module: str) -> bool:
         """Check if a module is from stdlib or known third-party."""
-        stdlib = {
-            "os", "sys", "re", "json", "datetime", "time", "pathlib",
-            "typing", "collections", "itertools", "functools", "ast",
-            "dataclasses", "enum", "abc", "copy", "io", "logging",
-            "threading", "multiprocessing", "subprocess", "socket",
-            "http", "urllib", "email", "html", "xml", "sqlite3",
-            "hashlib", "hmac", "secrets", "random", "math", "statistics",
-            "unittest", "doctest", "pdb", "profile", "timeit",
-            "argparse", "configparser", "csv", "pickle", "shelve",
-            "contextlib", "traceback", "warnings", "inspect", "dis",
-            "builtins", "importlib", "pkgutil", "types", "textwrap",
-            "difflib", "tempfile", "shutil", "glob", "fnmatch",
-        }
-        
-        thirdparty = {
-            "click", "rich", "dotenv", "requests", "flask", "fastapi",
-            "django", "sqlalchemy", "pydantic", "pytest", "numpy",
-            "pandas", "scipy", "matplotlib", "google", "langchain",
-            "langgraph", "openai", "anthropic", "watchdog", "uvicorn",
-            "starlette", "httpx", "aiohttp", "asyncio", "anyio",
-        }
-        
-        root = module.split('.')[0]
-        return root in stdlib or root in thirdparty
+        root = module.partition('.')[0]
+        return root in _STDLIB or root in _THIRDPARTY
     
     def _calculate_score(self) -> Tuple[int, str]:
         """Calculate health score and grade."""
@@ -512,6 +699,92 @@ class HealthMonitor:
         return score, grade
 
 
+def _sha256(content: str) -> str:
+    """Hash file content."""
+    return hashlib.sha256(content.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+def _shortest_cycle(graph: Dict[str, List[str]], start: str, members: Set[str]) -> List[str]:
+    """Find the shortest import cycle through start using only members (BFS).
+    
+    members must be the strongly connected component of start, so a cycle
+    always exists. Returns the path from start without repeating it.
+    """
+    parents: Dict[str, Optional[str]] = {start: None}
+    queue = deque([start])
+    while queue:
+        node = queue.popleft()
+        for child in graph[node]:
+            if child == start:
+                path = [node]
+                while parents[path[-1]] is not None:
+                    path.append(parents[path[-1]])
+                return path[::-1]
+            if child in members and child not in parents:
+                parents[child] = node
+                queue.append(child)
+    return [start]
+
+
+def _strongly_connected_components(graph: Dict[str, List[str]]) -> List[List[str]]:
+    """Find strongly connected components with an iterative Tarjan's algorithm.
+    
+    Components are returned in completion order, each listing its members
+    in the order they were discovered.
+    """
+    index: Dict[str, int] = {}
+    lowlink: Dict[str, int] = {}
+    on_stack: Set[str] = set()
+    stack: List[str] = []
+    components: List[List[str]] = []
+    
+    for root in graph:
+        if root in index:
+            continue
+        
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(graph[root]))]
+        
+        while work:
+            node, children = work[-1]
+            for child in children:
+                if child not in index:
+                    index[child] = lowlink[child] = len(index)
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(graph[child])))
+                    break
+                if child in on_stack:
+                    lowlink[node] = min(lowlink[node], index[child])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    component.reverse()
+                    components.append(component)
+    
+    return components
+
+
+def _analyze_file_worker(
+    project_path: str, file_path: str
+) -> Tuple[str, Optional[str], Set[str], List[HealthIssue]]:
+    """Analyze one file in a worker process (see HealthMonitor.scan_project)."""
+    return HealthMonitor(project_path)._analyze_file(Path(file_path))
+
+
 # Convenience function
 def run_health_check(project_path: str) -> HealthReport:
     """Run a full health check on a project."""
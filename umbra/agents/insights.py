@@ -1,9 +1,15 @@
 """
 Insights Engine - Automatically detect architectural problems and provide recommendations.
 """
+import hashlib
+import heapq
+import json
 import os
+import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
@@ -14,72 +20,288 @@ class InsightSeverity(Enum):
     CRITICAL = "critical"
 
 
-@dataclass
+# Health score points deducted per insight of each severity
+_SEVERITY_DEDUCTIONS = {
+    InsightSeverity.CRITICAL: 15,
+    InsightSeverity.WARNING: 8,
+    InsightSeverity.INFO: 2,
+}
+
+
+@dataclass(slots=True, frozen=True)
 class Insight:
     title: str
     description: str
     severity: InsightSeverity
     affected_files: List[str]
     recommendation: str
+
+
+# Directories each detector skips
+METRICS_IGNORE_DIRS = frozenset({'.git', '__pycache__', 'node_modules', '.venv', 'venv',
+                                 'env', 'dist', 'build', '.next', 'output'})
+NESTING_IGNORE_DIRS = frozenset({'.git', '__pycache__', 'node_modules', '.venv', 'venv', 'env', 'dist', 'build'})
+INIT_IGNORE_DIRS = frozenset({'.git', '__pycache__', 'node_modules', '.venv', 'venv', 'env', 'dist', 'build', 'output'})
+COUPLING_IGNORE_DIRS = frozenset({'.git', '__pycache__', 'node_modules', '.venv', 'venv', 'env'})
+
+_IGNORE_DIRS = {
+    'metrics': METRICS_IGNORE_DIRS,
+    'nesting': NESTING_IGNORE_DIRS,
+    'init': INIT_IGNORE_DIRS,
+    'coupling': COUPLING_IGNORE_DIRS,
+}
+
+METRICS_EXTENSIONS = ('.py', '.js', '.ts', '.jsx', '.tsx')
+# Number of largest files reported in the metrics
+LARGEST_FILES = 5
+
+# `from X` / `import X` at the start of a line; X is the next whitespace-delimited token
+_IMPORT_RE = re.compile(rb'^\s*(from|import) [^\S\n]*(\S+)', re.MULTILINE)
+# Standard-library modules not counted towards a file's coupling (matched on the top-level name)
+_STDLIB_MODULES = frozenset({'os', 'sys', 'json', 'typing', 'pathlib', 'dataclasses', 'enum', 're',
+                             'collections', 'functools', 'itertools', 'io', 'math', 'time'})
+
+# Below this many files to read, threads cost more than they save
+PARALLEL_MIN_FILES = 200
+READ_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Line counts and imports of previously read files, one index per project
+INSIGHTS_CACHE_DIR = Path.home() / ".cache" / "umbra" / "insights"
+# Bump when the cached per-file facts change meaning
+_CACHE_VERSION = 2
+
+
+def _scan_tree(
+    root: str, ignore_dirs: Dict[str, frozenset]
+) -> Iterator[Tuple[str, List[os.DirEntry], frozenset]]:
+    """Yield (directory, file entries, detectors) for root and its subdirectories, top-down.
     
+    ignore_dirs maps each detector to the directory names it skips;
+    `detectors` is the set of detectors that still see a directory. A
+    directory is only descended into while some detector sees it, and
+    symlinked directories are not followed.
+    """
+    stack = [(root, frozenset(ignore_dirs))]
+    while stack:
+        directory, detectors = stack.pop()
+        files = []
+        subdirs = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        visible = frozenset(d for d in detectors if entry.name not in ignore_dirs[d])
+                        if visible:
+                            subdirs.append((entry.path, visible))
+                    elif entry.is_file():
+                        files.append(entry)
+        except OSError:
+            continue
+        
+        yield directory, files, detectors
+        stack.extend(reversed(subdirs))
 
-def analyze_file_metrics(project_path: str) -> Dict[str, Any]:
-    """Analyze basic file metrics."""
-    project = Path(project_path)
+
+class AnalysisAccumulator:
+    """Inputs of every detector, collected in a single walk of the project.
     
-    ignore_dirs = {'.git', '__pycache__', 'node_modules', '.venv', 'venv', 
-                   'env', 'dist', 'build', '.next', 'output'}
+    Each file is read at most once, whether metrics, coupling or both
+    need it, and not at all if its mtime and size match the previous run.
+    """
     
-    extensions = {'.py', '.js', '.ts', '.jsx', '.tsx'}
+    def __init__(self, project_path: str, detectors=frozenset(_IGNORE_DIRS)):
+        self.project_path = project_path
+        self.metrics = {
+            'total_files': 0,
+            'total_lines': 0,
+            'files_by_type': {},
+            'largest_files': [],
+            'files_by_dir': {},
+        }
+        # Min-heap of the largest files as (lines, -walk order, path)
+        self._largest: List[Tuple[int, int, str]] = []
+        # First .py file of each directory with one, and its depth (walk order)
+        self.py_file_depths: List[Tuple[str, int]] = []
+        # Directories with .py files but no __init__.py (relative, walk order)
+        self.dirs_missing_init: List[str] = []
+        # file -> list of imported modules
+        self.imports_map: Dict[str, List[str]] = {}
+        
+        self._cache_file = INSIGHTS_CACHE_DIR / (
+            hashlib.blake2b(os.path.abspath(project_path).encode(), digest_size=16).hexdigest() + ".json"
+        )
+        self._cache = self._load_cache()
+        # relative path -> [mtime_ns, size, lines, imports] for files seen this run
+        self._seen: Dict[str, list] = {}
+        self._dirty = False
+        
+        # Walk first, then read the files that need it (in threads for large projects)
+        jobs = []
+        for directory, entries, visible in _scan_tree(
+            project_path, {d: _IGNORE_DIRS[d] for d in detectors}
+        ):
+            jobs.extend(self._add_directory(directory, entries, visible))
+        
+        entries = [job[0] for job in jobs]
+        relative_paths = [job[1] for job in jobs]
+        if len(jobs) >= PARALLEL_MIN_FILES:
+            with ThreadPoolExecutor(max_workers=READ_WORKERS) as executor:
+                facts = list(executor.map(self._file_facts, entries, relative_paths))
+        else:
+            facts = list(map(self._file_facts, entries, relative_paths))
+        
+        for job, record in zip(jobs, facts):
+            if record is not None:
+                self._add_file(*job, record)
+        
+        # Entries of deleted files are dropped with the rewrite
+        if self._dirty or (self._seen and self._seen.keys() != self._cache.keys()):
+            self._save_cache()
+        
+        # Get largest files (ties keep walk order)
+        self.metrics['largest_files'] = [
+            (path, lines) for lines, _, path in sorted(self._largest, reverse=True)
+        ]
     
-    metrics = {
-        'total_files': 0,
-        'total_lines': 0,
-        'files_by_type': {},
-        'largest_files': [],
-        'files_by_dir': {},
-    }
+    def _add_directory(self, directory: str, entries: List[os.DirEntry], visible: frozenset) -> list:
+        parent = os.path.relpath(directory, self.project_path)
+        py_entries = [entry for entry in entries if entry.name.endswith('.py')]
+        
+        if py_entries and 'nesting' in visible:
+            self.py_file_depths.append(_file_depth(py_entries[0], self.project_path))
+        
+        if (
+            py_entries
+            and 'init' in visible
+            and directory != self.project_path
+            and not any(entry.name == '__init__.py' for entry in entries)
+        ):
+            self.dirs_missing_init.append(parent)
+        
+        # Files to read: (entry, relative path, parent, count metrics, scan imports)
+        jobs = []
+        for entry in entries:
+            count_metrics = 'metrics' in visible and entry.name.endswith(METRICS_EXTENSIONS)
+            scan_imports = 'coupling' in visible and entry.name.endswith('.py')
+            if count_metrics or scan_imports:
+                relative_path = os.path.relpath(entry.path, self.project_path)
+                jobs.append((entry, relative_path, parent, count_metrics, scan_imports))
+        return jobs
     
-    file_sizes = []
+    def _add_file(
+        self,
+        entry: os.DirEntry,
+        relative_path: str,
+        parent: str,
+        count_metrics: bool,
+        scan_imports: bool,
+        record: list,
+    ):
+        self._seen[relative_path] = record
+        lines, imports = record[2], record[3]
+        
+        if count_metrics:
+            self.metrics['total_files'] += 1
+            self.metrics['total_lines'] += lines
+            
+            # Count by extension
+            ext = os.path.splitext(entry.name)[1]
+            self.metrics['files_by_type'][ext] = self.metrics['files_by_type'].get(ext, 0) + 1
+            
+            # Count by directory
+            self.metrics['files_by_dir'][parent] = self.metrics['files_by_dir'].get(parent, 0) + 1
+            
+            item = (lines, -self.metrics['total_files'], relative_path)
+            if len(self._largest) < LARGEST_FILES:
+                heapq.heappush(self._largest, item)
+            else:
+                heapq.heappushpop(self._largest, item)
+        
+        if scan_imports:
+            self.imports_map[relative_path] = imports
     
-    for file_path in project.rglob('*'):
-        if file_path.is_file() and file_path.suffix in extensions:
-            # Skip ignored directories
-            if any(ignored in file_path.parts for ignored in ignore_dirs):
-                continue
+    def _file_facts(self, entry: os.DirEntry, relative_path: str) -> Optional[list]:
+        """[mtime_ns, size, lines, imports (.py only)] of a file, or None if unreadable.
+        
+        Safe to call from worker threads.
+        """
+        try:
+            st = entry.stat()
+            cached = self._cache.get(relative_path)
+            if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+                return cached
             
-            try:
-                relative_path = str(file_path.relative_to(project))
-                content = file_path.read_text(encoding='utf-8', errors='ignore')
-                lines = len(content.splitlines())
-                
-                metrics['total_files'] += 1
-                metrics['total_lines'] += lines
-                
-                # Count by extension
-                ext = file_path.suffix
-                metrics['files_by_type'][ext] = metrics['files_by_type'].get(ext, 0) + 1
-                
-                # Count by directory
-                parent = str(file_path.parent.relative_to(project))
-                metrics['files_by_dir'][parent] = metrics['files_by_dir'].get(parent, 0) + 1
-                
-                file_sizes.append((relative_path, lines))
-                
-            except Exception:
-                continue
+            # Bytes are enough to count lines and find imports; nothing is decoded
+            with open(entry.path, 'rb') as f:
+                raw = f.read()
+        except Exception:
+            return None
+        
+        lines = _count_lines(raw)
+        imports = _scan_imports(raw) if entry.name.endswith('.py') else None
+        self._dirty = True
+        return [st.st_mtime_ns, st.st_size, lines, imports]
     
-    # Get largest files
-    file_sizes.sort(key=lambda x: x[1], reverse=True)
-    metrics['largest_files'] = file_sizes[:5]
+    def _load_cache(self) -> Dict[str, list]:
+        try:
+            data = json.loads(self._cache_file.read_text(encoding='utf-8'))
+            if data.get("version") == _CACHE_VERSION:
+                return data["files"]
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+        return {}
     
-    return metrics
+    def _save_cache(self):
+        try:
+            INSIGHTS_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            tmp = self._cache_file.with_suffix(".tmp")
+            tmp.write_text(json.dumps({"version": _CACHE_VERSION, "files": self._seen}), encoding='utf-8')
+            os.replace(tmp, self._cache_file)
+        except OSError:
+            pass
+
 
+def _scan_imports(raw: bytes) -> List[str]:
+    """Simple import detection (top module for `import`, full module for `from`)."""
+    if b'\r' in raw:
+        raw = raw.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+    return [
+        module.decode('utf-8', errors='ignore') if keyword == b'from'
+        else module.split(b'.')[0].decode('utf-8', errors='ignore')
+        for keyword, module in _IMPORT_RE.findall(raw)
+    ]
 
-def detect_god_files(project_path: str, threshold: int = 300) -> List[Insight]:
-    """Detect files that are too large (God files)."""
+
+def _count_lines(raw: bytes) -> int:
+    """Count lines like str.splitlines, treating \\n, \\r\\n and \\r as line breaks."""
+    breaks = raw.count(b'\n')
+    if b'\r' in raw:
+        breaks += raw.count(b'\r') - raw.count(b'\r\n')
+    return breaks + (1 if raw and not raw.endswith((b'\n', b'\r')) else 0)
+
+
+def analyze_file_metrics(project_path: str) -> Dict[str, Any]:
+    """Analyze basic file metrics."""
+    return AnalysisAccumulator(project_path, {'metrics'}).metrics
+
+
+def detect_god_files(
+    project_path: str,
+    threshold: int = 300,
+    metrics: Optional[Dict[str, Any]] = None,
+) -> List[Insight]:
+    """Detect files that are too large (God files).
+    
+    Pass metrics already returned by analyze_file_metrics to avoid
+    walking the project again.
+    """
+    if metrics is None:
+        metrics = analyze_file_metrics(project_path)
+    return _god_file_insights(metrics, threshold)
+
+
+def _god_file_insights(metrics: Dict[str, Any], threshold: int = 300) -> List[Insight]:
     insights = []
-    metrics = analyze_file_metrics(project_path)
     
     for filepath, lines in metrics['largest_files']:
         if lines > threshold:
@@ -95,25 +317,36 @@ def detect_god_files(project_path: str, threshold: int = 300) -> List[Insight]:
 
 
 def detect_deep_nesting(project_path: str, max_depth: int = 4) -> List[Insight]:
-    """Detect deeply nested directory structures."""
-    insights = []
-    project = Path(project_path)
+    """Detect deeply nested directory structures.
     
-    ignore_dirs = {'.git', '__pycache__', 'node_modules', '.venv', 'venv', 'env', 'dist', 'build'}
+    Only one insight is reported, so the walk stops at the first
+    directory with a .py file deeper than max_depth.
+    """
+    py_file_depths = (
+        _file_depth(py_entry, project_path)
+        for _, entries, _ in _scan_tree(project_path, {'nesting': NESTING_IGNORE_DIRS})
+        for py_entry in [next((entry for entry in entries if entry.name.endswith('.py')), None)]
+        if py_entry is not None
+    )
+    return _deep_nesting_insights(py_file_depths, max_depth)
+
+
+def _file_depth(entry: os.DirEntry, project_path: str) -> Tuple[str, int]:
+    """Return (relative path, number of directories above it) for a file."""
+    relative = Path(os.path.relpath(entry.path, project_path))
+    return str(relative), len(relative.parts) - 1
+
+
+def _deep_nesting_insights(py_file_depths: Iterable[Tuple[str, int]], max_depth: int = 4) -> List[Insight]:
+    insights = []
     
-    for file_path in project.rglob('*.py'):
-        if any(ignored in file_path.parts for ignored in ignore_dirs):
-            continue
-            
-        relative = file_path.relative_to(project)
-        depth = len(relative.parts) - 1  # -1 for the file itself
-        
+    for relative, depth in py_file_depths:
         if depth > max_depth:
             insights.append(Insight(
                 title=f"Deep nesting: {relative}",
                 description=f"This file is {depth} directories deep, which can make navigation difficult.",
                 severity=InsightSeverity.INFO,
-                affected_files=[str(relative)],
+                affected_files=[relative],
                 recommendation="Consider flattening your directory structure."
             ))
             break  # Only report once
@@ -123,75 +356,33 @@ def detect_deep_nesting(project_path: str, max_depth: int = 4) -> List[Insight]:
 
 def detect_missing_init(project_path: str) -> List[Insight]:
     """Detect Python packages missing __init__.py."""
-    insights = []
-    project = Path(project_path)
-    
-    ignore_dirs = {'.git', '__pycache__', 'node_modules', '.venv', 'venv', 'env', 'dist', 'build', 'output'}
-    
-    for dir_path in project.rglob('*'):
-        if not dir_path.is_dir():
-            continue
-        if any(ignored in dir_path.parts for ignored in ignore_dirs):
-            continue
-        
-        # Check if directory has .py files but no __init__.py
-        py_files = list(dir_path.glob('*.py'))
-        has_init = (dir_path / '__init__.py').exists()
-        
-        if py_files and not has_init and dir_path != project:
-            relative = dir_path.relative_to(project)
-            insights.append(Insight(
-                title=f"Missing __init__.py in {relative}",
-                description="This directory contains Python files but no __init__.py, so it's not a proper package.",
-                severity=InsightSeverity.INFO,
-                affected_files=[str(relative)],
-                recommendation="Add an __init__.py file to make this a proper Python package."
-            ))
-    
-    return insights
+    return _missing_init_insights(AnalysisAccumulator(project_path, {'init'}))
+
+
+def _missing_init_insights(acc: AnalysisAccumulator) -> List[Insight]:
+    return [
+        Insight(
+            title=f"Missing __init__.py in {relative}",
+            description="This directory contains Python files but no __init__.py, so it's not a proper package.",
+            severity=InsightSeverity.INFO,
+            affected_files=[relative],
+            recommendation="Add an __init__.py file to make this a proper Python package."
+        )
+        for relative in acc.dirs_missing_init
+    ]
 
 
 def detect_circular_potential(project_path: str) -> List[Insight]:
     """Detect potential circular import risks based on import patterns."""
+    return _coupling_insights(AnalysisAccumulator(project_path, {'coupling'}))
+
+
+def _coupling_insights(acc: AnalysisAccumulator) -> List[Insight]:
     insights = []
-    project = Path(project_path)
-    
-    ignore_dirs = {'.git', '__pycache__', 'node_modules', '.venv', 'venv', 'env'}
-    
-    # Track imports between files
-    imports_map = {}  # file -> list of imported modules
-    
-    for file_path in project.rglob('*.py'):
-        if any(ignored in file_path.parts for ignored in ignore_dirs):
-            continue
-        
-        try:
-            content = file_path.read_text(encoding='utf-8', errors='ignore')
-            relative = str(file_path.relative_to(project))
-            
-            # Simple import detection
-            imports = []
-            for line in content.splitlines():
-                line = line.strip()
-                if line.startswith('from ') or line.startswith('import '):
-                    # Extract module name
-                    if line.startswith('from '):
-                        parts = line.split()
-                        if len(parts) >= 2:
-                            imports.append(parts[1])
-                    else:
-                        parts = line.split()
-                        if len(parts) >= 2:
-                            imports.append(parts[1].split('.')[0])
-            
-            imports_map[relative] = imports
-            
-        except Exception:
-            continue
     
     # Check for files with many internal imports (potential coupling issues)
-    for filepath, imports in imports_map.items():
-        internal_imports = [i for i in imports if not i.startswith(('os', 'sys', 'json', 'typing', 'pathlib', 'dataclass', 'enum'))]
+    for filepath, imports in acc.imports_map.items():
+        internal_imports = [i for i in imports if i.partition('.')[0].rstrip(',') not in _STDLIB_MODULES]
         if len(internal_imports) > 10:
             insights.append(Insight(
                 title=f"High coupling: {filepath}",
@@ -210,14 +401,9 @@ def calculate_health_score(insights: List[Insight], metrics: Dict[str, Any]) ->
     # Base score
     score = 100
     
-    # Deduct for insights
-    for insight in insights:
-        if insight.severity == InsightSeverity.CRITICAL:
-            score -= 15
-        elif insight.severity == InsightSeverity.WARNING:
-            score -= 8
-        else:
-            score -= 2
+    # Deduct for insights (one pass, counted by severity)
+    counts = Counter(insight.severity for insight in insights)
+    score -= sum(_SEVERITY_DEDUCTIONS[severity] * n for severity, n in counts.items())
     
     # Bonus for good practices
     if metrics['total_files'] > 0:
@@ -250,24 +436,28 @@ def calculate_health_score(insights: List[Insight], metrics: Dict[str, Any]) ->
         'grade': grade,
         'status': status,
         'total_issues': len(insights),
-        'critical': sum(1 for i in insights if i.severity == InsightSeverity.CRITICAL),
-        'warnings': sum(1 for i in insights if i.severity == InsightSeverity.WARNING),
-        'info': sum(1 for i in insights if i.severity == InsightSeverity.INFO),
+        'critical': counts[InsightSeverity.CRITICAL],
+        'warnings': counts[InsightSeverity.WARNING],
+        'info': counts[InsightSeverity.INFO],
     }
 
 
 def run_full_analysis(project_path: str = ".") -> Dict[str, Any]:
-    """Run all insight detectors and return full analysis."""
+    """Run all insight detectors and return full analysis.
+    
+    The project is walked, and each file read, only once for all detectors.
+    """
+    acc = AnalysisAccumulator(project_path)
     
     # Collect metrics
-    metrics = analyze_file_metrics(project_path)
+    metrics = acc.metrics
     
     # Run all detectors
     insights = []
-    insights.extend(detect_god_files(project_path))
-    insights.extend(detect_deep_nesting(project_path))
-    insights.extend(detect_missing_init(project_path))
-    insights.extend(detect_circular_potential(project_path))
+    insights.extend(_god_file_insights(metrics))
+    insights.extend(_deep_nesting_insights(acc.py_file_depths))
+    insights.extend(_missing_init_insights(acc))
+    insights.extend(_coupling_insights(acc))
     
     # Calculate health score
     health = calculate_health_score(insights, metrics)
@@ -277,4 +467,3 @@ def run_full_analysis(project_path: str = ".") -> Dict[str, Any]:
         'insights': insights,
         'health': health,
     }
-
@@ -5,6 +5,8 @@ This module builds and compiles the LangGraph that orchestrates
 the entire analysis pipeline.
 """
 
+from functools import lru_cache
+
 from langgraph.graph import END, StateGraph
 from rich.console import Console
 
@@ -55,7 +57,7 @@ def check_validity(state: GraphState) -> str:
 
 def increment_retry(state: GraphState) -> GraphState:
     """Increment the retry counter."""
-    return {**state, "retry_count": state.get("retry_count", 0) + 1}
+    return {"retry_count": state.get("retry_count", 0) + 1}
 
 
 def build_graph() -> StateGraph:
@@ -112,8 +114,9 @@ def build_graph() -> StateGraph:
     return graph.compile()
 
 
-# Pre-built graph instance for convenience
+# Compiled once per process and shared (the compiled graph is stateless)
+@lru_cache(maxsize=1)
 def get_graph():
-    """Get a compiled graph instance."""
+    """Get the shared compiled graph instance."""
     return build_graph()
 
@@ -37,6 +37,8 @@ class GraphState(TypedDict, total=False):
     file_path: str
     file_content: str
     diff: str | None
+    # Watcher event type ("created", "modified"), if known
+    change_event: str
 
     # Current architecture (loaded from file)
     current_mermaid: str
@@ -46,6 +48,8 @@ class GraphState(TypedDict, total=False):
 
     # Surgeon output
     updated_mermaid: str | None
+    # Alternative diagrams from the same Surgeon call, tried on retry
+    surgeon_candidates: list[str]
 
     # Validation
     is_valid_mermaid: bool
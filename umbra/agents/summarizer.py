@@ -6,9 +6,10 @@ import os
 from pathlib import Path
 
 from langchain_core.messages import HumanMessage, SystemMessage
-from langchain_google_genai import ChatGoogleGenerativeAI
 from rich.console import Console
 
+from umbra.utils.llm import get_llm
+
 console = Console()
 
 SUMMARIZER_PROMPT = """You are explaining a codebase to a developer who just joined the team.
@@ -69,7 +70,7 @@ def generate_summary(
         Markdown summary string
     """
     model = os.getenv("GEMINI_MODEL", "models/gemini-flash-latest")
-    llm = ChatGoogleGenerativeAI(model=model, temperature=0.3)
+    llm = get_llm(model, 0.3)
     
     # Get project name from path
     project_name = Path(project_path).name
@@ -116,7 +117,7 @@ Unable to generate summary. Please check your API key.
 def generate_quick_summary(mermaid_diagram: str) -> str:
     """Generate a one-line summary from the diagram."""
     model = os.getenv("GEMINI_MODEL", "models/gemini-flash-latest")
-    llm = ChatGoogleGenerativeAI(model=model, temperature=0)
+    llm = get_llm(model, 0.0)
     
     prompt = f"""Based on this architecture diagram, write a ONE sentence summary (max 100 chars):
 
@@ -6,15 +6,30 @@ based on the analysis results.
 """
 
 import os
+import re
 
 from langchain_core.messages import HumanMessage, SystemMessage
-from langchain_google_genai import ChatGoogleGenerativeAI
 from rich.console import Console
 
+from umbra.agents import _mermaid_template, _surgeon_cache
 from umbra.agents.state import GraphState
+from umbra.utils.llm import get_embeddings, get_llm
 
 console = Console()
 
+# Markdown fence and comment (% or %%) lines, removed from LLM output
+_FENCE_OR_COMMENT_RE = re.compile(r"^[^\S\n]*(?:```|%).*(?:\n|\Z)", re.MULTILINE)
+# Line holding the diagram directive
+_DIRECTIVE_RE = re.compile(r"^[^\S\n]*(?:graph|flowchart) ", re.MULTILINE)
+
+# Characters of the changed file included in the prompt
+MAX_CONTENT_CHARS = 2000
+# Diagrams requested per LLM call; the extras are used for validation retries
+SURGEON_CANDIDATES = 3
+# Change types of a new file that need no edges, so the template can place it;
+# anything that connects to other files or services goes to the LLM
+TEMPLATE_CHANGE_TYPES = frozenset({"new_service"})
+
 SURGEON_SYSTEM_PROMPT = """You create CLEAR, LAYERED architecture diagrams.
 
 ## GOAL: Show all files in a LEFT-TO-RIGHT flow with clear layers
@@ -91,21 +106,43 @@ def surgeon_node(state: GraphState) -> GraphState:
     """
     Update the Mermaid diagram based on the analysis.
 
-    Input: current_mermaid, analysis_result, file_content
-    Output: updated_mermaid
+    Several candidate diagrams are requested in one call; on a retry
+    the next unused candidate is returned without calling the LLM again.
+
+    Input: current_mermaid, analysis_result, file_content, surgeon_candidates
+    Output: updated_mermaid, surgeon_candidates
     """
     analysis = state.get("analysis_result")
     if not analysis or not analysis.is_structural_change:
-        return state
+        return {}
+
+    candidates = state.get("surgeon_candidates")
+    if candidates:
+        console.print("[dim]   -> Trying next candidate diagram[/dim]")
+        return {"updated_mermaid": candidates[0], "surgeon_candidates": candidates[1:]}
+
+    # A new self-contained file only needs a node in its layer; no LLM unless that was rejected
+    if (
+        state.get("change_event") == "created"
+        and analysis.change_type in TEMPLATE_CHANGE_TYPES
+        and not state.get("retry_count")
+    ):
+        mermaid = _mermaid_template.add_file_node(
+            state.get("current_mermaid", ""), state.get("file_path", "")
+        )
+        if mermaid is not None:
+            console.print("[dim]   -> Diagram updated (new file node)[/dim]")
+            return {"updated_mermaid": mermaid, "surgeon_candidates": []}
 
     model = os.getenv("GEMINI_MODEL", "models/gemini-flash-latest")
-    # Use slightly higher temperature for creativity
-    llm = ChatGoogleGenerativeAI(model=model, temperature=0.2)
+    # Use slightly higher temperature for creativity (and distinct candidates)
+    llm = get_llm(model, 0.2, n=SURGEON_CANDIDATES)
 
-    # Truncate content to save tokens
+    # Truncate content to save tokens (at a line boundary so no line is cut in half)
     content = state.get("file_content", "")
-    if len(content) > 2000:
-        content = content[:2000] + "\n... (truncated)"
+    if len(content) > MAX_CONTENT_CHARS:
+        cut = content.rfind("\n", 0, MAX_CONTENT_CHARS + 1)
+        content = content[:cut if cut != -1 else MAX_CONTENT_CHARS] + "\n... (truncated)"
 
     prompt = f"""## Current Architecture Diagram:
 {state.get("current_mermaid", "")}
@@ -127,53 +164,76 @@ Update the diagram to reflect this change. Remember:
 - Output ONLY the Mermaid diagram, starting with "graph TD"
 """
 
+    # Reuse the diagrams of an identical earlier request; a retry (the cached
+    # candidates were all rejected) always asks the LLM again
+    cache_key = None
+    if _surgeon_cache.is_enabled():
+        cache_key = _surgeon_cache.make_key(model, SURGEON_SYSTEM_PROMPT, prompt)
+        cached = _surgeon_cache.get(cache_key) if not state.get("retry_count") else None
+        if cached:
+            console.print("[dim]   -> Diagram updated (cached)[/dim]")
+            return {"updated_mermaid": cached[0], "surgeon_candidates": cached[1:]}
+
+    # Then a near-identical change of the same file against the same diagram
+    group = embedding = None
+    if _surgeon_cache.is_semantic_enabled():
+        group = _surgeon_cache.make_group(
+            model, state.get("file_path", ""), state.get("current_mermaid", "")
+        )
+        try:
+            embedding = get_embeddings().embed_query(
+                _surgeon_cache.semantic_text(
+                    analysis.change_type, analysis.affected_components, analysis.reasoning
+                )
+            )
+        except Exception as e:
+            console.print(f"[dim]   -> Embedding failed, semantic cache skipped: {e}[/dim]")
+        if embedding and not state.get("retry_count"):
+            cached = _surgeon_cache.semantic_get(group, embedding)
+            if cached:
+                console.print("[dim]   -> Diagram updated (similar change cached)[/dim]")
+                return {"updated_mermaid": cached[0], "surgeon_candidates": cached[1:]}
+
     try:
-        response = llm.invoke(
+        result = llm.generate(
             [
-                SystemMessage(content=SURGEON_SYSTEM_PROMPT),
-                HumanMessage(content=prompt),
+                [
+                    SystemMessage(content=SURGEON_SYSTEM_PROMPT),
+                    HumanMessage(content=prompt),
+                ]
             ]
         )
 
-        mermaid = clean_mermaid_output(response.content)
+        # Identical candidates would fail validation the same way
+        diagrams = list(dict.fromkeys(
+            clean_mermaid_output(generation.message.content)
+            for generation in result.generations[0]
+        ))
+
+        ttl = _surgeon_cache.ttl_for(analysis.change_type)
+        if cache_key is not None:
+            _surgeon_cache.put(cache_key, diagrams, ttl, state.get("file_path", ""))
+        if embedding:
+            _surgeon_cache.semantic_put(group, embedding, diagrams, ttl, state.get("file_path", ""))
 
         console.print("[dim]   -> Diagram updated[/dim]")
 
-        return {**state, "updated_mermaid": mermaid}
+        return {"updated_mermaid": diagrams[0], "surgeon_candidates": diagrams[1:]}
 
     except Exception as e:
         console.print(f"[red]   -> Surgeon error: {e}[/red]")
-        return {**state, "updated_mermaid": None}
+        return {"updated_mermaid": None, "surgeon_candidates": []}
 
 
 def clean_mermaid_output(raw: str) -> str:
     """Remove markdown code fences, comments, and clean up the output."""
-    lines = raw.strip().split("\n")
-
-    # Remove markdown fences and invalid comments
-    cleaned_lines = []
-    for line in lines:
-        stripped = line.strip()
-        # Skip markdown fences
-        if stripped.startswith("```"):
-            continue
-        # Skip single % comments (invalid in Mermaid, should be %%)
-        if stripped.startswith("%") and not stripped.startswith("%%"):
-            continue
-        # Skip %% comments too for cleaner output
-        if stripped.startswith("%%"):
-            continue
-        cleaned_lines.append(line)
-
-    result = "\n".join(cleaned_lines).strip()
-
-    # Ensure it starts with graph directive
+    # Markdown fences and comments (single % is invalid in Mermaid, %% is noise)
+    result = _FENCE_OR_COMMENT_RE.sub("", raw).strip()
+
+    # Drop any prose before the graph directive
     if not result.startswith(("graph ", "flowchart ")):
-        # Try to find where the graph starts
-        for i, line in enumerate(result.split("\n")):
-            if line.strip().startswith(("graph ", "flowchart ")):
-                result = "\n".join(result.split("\n")[i:])
-                break
+        match = _DIRECTIVE_RE.search(result)
+        if match:
+            result = result[match.start():]
 
     return result
-
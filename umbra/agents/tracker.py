@@ -6,19 +6,73 @@ This is the core of Umbra's "Guardian" functionality.
 """
 
 import ast
+import hashlib
+import json
 import os
 import re
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Set
+from typing import Dict, List, Optional, Set, Tuple
 
 import google.generativeai as genai
 from rich.console import Console
 
 console = Console()
 
+# Import statements, used when a file does not parse
+_IMPORT_RE = re.compile(r'^(?:from\s+([\w.]+)|import\s+([\w.]+))', re.MULTILINE)
+
+# Hardcoded credential assignments (api_key = "...", password = '...', ...)
+_SECRET_RE = re.compile(
+    r'(?:api[_-]?key|password|secret|token)\s*=\s*["\'][^"\']+["\']',
+    re.IGNORECASE,
+)
+# Every _SECRET_RE match contains one of these (lowercase); checked first
+_SECRET_KEYWORDS = ("key", "password", "secret", "token")
+
+# Imports of each file from previous sessions, per project
+TRACKER_CACHE_DIR = Path.home() / ".cache" / "umbra" / "tracker"
+# Bump when the import extraction changes so stale entries are ignored
+TRACKER_CACHE_VERSION = 1
+
+# Model used for change descriptions
+MODEL_NAME = "gemini-2.0-flash"
+
+# Diffs with fewer changed lines get a plain description instead of an LLM call
+MIN_LLM_CHANGED_LINES = 3
+
+LLM_DESCRIPTION_PROMPT = """Describe this code change in ONE short sentence (max 10 words).
+
+File: {file_name}
+Changes: +{added} -{removed} lines
+
+Diff:
+{diff}
+
+Be specific about WHAT changed, not generic. Example: "Added user authentication validation" not "Modified code"."""
+
+LLM_BATCH_DESCRIPTION_PROMPT = """Describe each of the following {count} code changes in ONE short sentence (max 10 words each).
+
+{changes}
+
+Be specific about WHAT changed, not generic. Example: "Added user authentication validation" not "Modified code".
+Return ONLY a JSON list of {count} strings, one per change, in the same order."""
+
+# Changes described per batched LLM call
+DESCRIPTION_BATCH_SIZE = 10
+
+# Markdown fences around a JSON reply
+_FENCE_RE = re.compile(r"\A```[^\n]*\n|\n?```\s*\Z")
+
+# Parse results (imports, syntax error) keyed by content hash (LRU), so a file
+# is parsed once per change and re-adding an unchanged file skips the parse
+_PARSE_CACHE: "OrderedDict[bytes, Tuple[frozenset, Optional[SyntaxError]]]" = OrderedDict()
+_PARSE_CACHE_MAX = 2048
+
 # Configure API
 api_key = os.getenv("GOOGLE_API_KEY")
 if api_key:
@@ -76,14 +130,23 @@ class TrackedChange:
     impact_level: ImpactLevel
     session_id: str
     warnings: List[str] = field(default_factory=list)
+    # Enum values resolved once (a change is not modified after it is tracked)
+    _change_type_value: str = field(init=False, repr=False, compare=False)
+    _intent_value: str = field(init=False, repr=False, compare=False)
+    _impact_level_value: str = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self._change_type_value = self.change_type.value
+        self._intent_value = self.intent.value
+        self._impact_level_value = self.impact_level.value
     
     def to_dict(self) -> dict:
         """Convert to dictionary for serialization."""
         return {
             "timestamp": self.timestamp.isoformat(),
             "file_path": self.file_path,
-            "change_type": self.change_type.value,
-            "intent": self.intent.value,
+            "change_type": self._change_type_value,
+            "intent": self._intent_value,
             "description": self.description,
             "diff_summary": self.diff_summary,
             "lines_added": self.lines_added,
@@ -92,7 +155,7 @@ class TrackedChange:
                 {"file": f.file_path, "type": f.impact_type, "desc": f.description}
                 for f in self.impacted_files
             ],
-            "impact_level": self.impact_level.value,
+            "impact_level": self._impact_level_value,
             "session_id": self.session_id,
             "warnings": self.warnings,
         }
@@ -104,74 +167,66 @@ class DependencyGraph:
     def __init__(self):
         self.imports: Dict[str, Set[str]] = {}  # file -> files it imports
         self.imported_by: Dict[str, Set[str]] = {}  # file -> files that import it
+        # file -> transitive dependents, cleared whenever an edge changes
+        self._dependents_cache: Dict[str, frozenset] = {}
         
     def add_file(self, file_path: str, content: str):
-        """Analyze a file and add its dependencies to the graph."""
-        imports = self._extract_imports(content, file_path)
+        """Analyze a file and add (or update) its dependencies in the graph."""
+        self.set_imports(file_path, self._extract_imports(content, file_path))
+    
+    def set_imports(self, file_path: str, imports: Set[str]):
+        """Add (or update) a file whose imports are already known.
         
+        Only the imports that changed since the file was last added
+        touch the reverse mapping.
+        """
+        old = self.imports.get(file_path, set())
         self.imports[file_path] = imports
         
-        # Update reverse mapping
-        for imported in imports:
-            if imported not in self.imported_by:
-                self.imported_by[imported] = set()
-            self.imported_by[imported].add(file_path)
+        # Update reverse mapping (dropped imports must not keep their edge)
+        removed, added = old - imports, imports - old
+        for imported in removed:
+            self.imported_by.get(imported, set()).discard(file_path)
+        for imported in added:
+            self.imported_by.setdefault(imported, set()).add(file_path)
+        if removed or added:
+            self._dependents_cache.clear()
     
     def remove_file(self, file_path: str):
-        """Remove a file from the dependency graph."""
-        # Remove from imports
-        if file_path in self.imports:
-            del self.imports[file_path]
+        """Remove a file's own imports from the dependency graph.
         
-        # Remove from imported_by
-        for imports_set in self.imported_by.values():
-            imports_set.discard(file_path)
-        
-        if file_path in self.imported_by:
-            del self.imported_by[file_path]
+        Files that still import it keep their edges (imported_by stays
+        the exact inverse of imports), so they show up as dependents.
+        """
+        imports = self.imports.pop(file_path, set())
+        for imported in imports:
+            self.imported_by.get(imported, set()).discard(file_path)
+        if imports:
+            self._dependents_cache.clear()
     
     def get_dependents(self, file_path: str) -> Set[str]:
         """Get all files that depend on this file (directly or indirectly)."""
+        cached = self._dependents_cache.get(file_path)
+        if cached is not None:
+            return set(cached)
+        
         dependents = set()
         to_check = [file_path]
         
         while to_check:
             current = to_check.pop()
-            direct_dependents = self.imported_by.get(current, set())
             
-            for dep in direct_dependents:
+            for dep in self.imported_by.get(current, ()):
                 if dep not in dependents:
                     dependents.add(dep)
                     to_check.append(dep)
         
+        self._dependents_cache[file_path] = frozenset(dependents)
         return dependents
     
     def _extract_imports(self, content: str, file_path: str) -> Set[str]:
-        """Extract import statements from Python code."""
-        imports = set()
-        
-        try:
-            tree = ast.parse(content)
-            file_dir = Path(file_path).parent
-            
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Import):
-                    for alias in node.names:
-                        imports.add(alias.name)
-                elif isinstance(node, ast.ImportFrom):
-                    if node.module:
-                        # Convert module path to potential file path
-                        module_parts = node.module.split('.')
-                        imports.add(node.module)
-        except SyntaxError:
-            # If we can't parse, try regex
-            import_pattern = r'^(?:from\s+([\w.]+)|import\s+([\w.]+))'
-            for match in re.finditer(import_pattern, content, re.MULTILINE):
-                module = match.group(1) or match.group(2)
-                if module:
-                    imports.add(module)
-        
-        return imports
+        """Extract import statements from Python code (cached by content)."""
+        return set(_parse(content)[0])
 
 
 class ChangeTracker:
@@ -181,13 +236,55 @@ class ChangeTracker:
         self.project_path = Path(project_path).resolve()
         self.session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
         self.changes: List[TrackedChange] = []
+        # Running session totals, updated as changes are tracked
+        self._files_seen: Set[str] = set()
+        self._lines_added = 0
+        self._lines_removed = 0
+        self._warning_count = 0
+        self._breaking_count = 0
+        # Descriptions fetched ahead by prefetch_descriptions, keyed by _description_key
+        self._prefetched_descriptions: Dict[tuple, str] = {}
         self.dependency_graph = DependencyGraph()
         self._initialized = False
         
     def initialize(self, files: Dict[str, str]):
-        """Initialize the dependency graph with existing files."""
+        """Initialize the dependency graph with existing files.
+        
+        Imports of files whose content is unchanged since the last session
+        are loaded from the on-disk cache instead of being parsed again.
+        """
+        cache_file = TRACKER_CACHE_DIR / f"{_project_key(self.project_path)}.json"
+        try:
+            cached = json.loads(cache_file.read_text(encoding="utf-8"))
+            if cached.get("version") != TRACKER_CACHE_VERSION:
+                cached = {}
+        except (OSError, ValueError):
+            cached = {}
+        cached_files = cached.get("files", {})
+        
+        entries = {}
         for file_path, content in files.items():
-            self.dependency_graph.add_file(file_path, content)
+            digest = _content_digest(content).hex()
+            entry = cached_files.get(file_path)
+            if entry and entry[0] == digest:
+                self.dependency_graph.set_imports(file_path, set(entry[1]))
+            else:
+                self.dependency_graph.add_file(file_path, content)
+                entry = [digest, sorted(self.dependency_graph.imports[file_path])]
+            entries[file_path] = entry
+        
+        if entries != cached_files:
+            try:
+                TRACKER_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+                tmp = cache_file.with_suffix(".tmp")
+                tmp.write_text(
+                    json.dumps({"version": TRACKER_CACHE_VERSION, "files": entries}),
+                    encoding="utf-8",
+                )
+                os.replace(tmp, cache_file)
+            except OSError:
+                pass
+        
         self._initialized = True
         console.print(f"[dim]Tracker initialized with {len(files)} files[/dim]")
     
@@ -208,16 +305,18 @@ class ChangeTracker:
         elif new_content:
             self.dependency_graph.add_file(file_path, new_content)
         
+        file_name = os.path.basename(file_path)
+        
         # Analyze impact
-        impacted_files = self._analyze_impact(file_path, change_type)
+        impacted_files = self._analyze_impact(file_path, file_name, change_type)
         impact_level = self._calculate_impact_level(impacted_files)
         
         # Detect intent
-        intent = self._detect_intent(file_path, diff_lines, stats)
+        intent = self._detect_intent(file_name, diff_lines, stats)
         
         # Generate description
         description = self._generate_description(
-            file_path, change_type, diff_lines, stats
+            file_path, file_name, change_type, diff_lines, stats
         )
         
         # Check for warnings
@@ -245,10 +344,16 @@ class ChangeTracker:
         )
         
         self.changes.append(change)
+        self._files_seen.add(change.file_path)
+        self._lines_added += change.lines_added
+        self._lines_removed += change.lines_removed
+        self._warning_count += len(change.warnings)
+        if change.impact_level == ImpactLevel.CRITICAL:
+            self._breaking_count += 1
         return change
     
     def _analyze_impact(
-        self, file_path: str, change_type: ChangeType
+        self, file_path: str, file_name: str, change_type: ChangeType
     ) -> List[FileImpact]:
         """Analyze which files are impacted by this change."""
         impacts = []
@@ -256,15 +361,15 @@ class ChangeTracker:
         # Get files that import/depend on this file
         dependents = self.dependency_graph.get_dependents(file_path)
         
+        # Determine impact type (the same for every dependent)
+        if change_type == ChangeType.DELETED:
+            impact_type = "broken_import"
+            description = f"Imports deleted file {file_name}"
+        else:
+            impact_type = "imports"
+            description = f"Imports {file_name}"
+        
         for dep in dependents:
-            # Determine impact type
-            if change_type == ChangeType.DELETED:
-                impact_type = "broken_import"
-                description = f"Imports deleted file {Path(file_path).name}"
-            else:
-                impact_type = "imports"
-                description = f"Imports {Path(file_path).name}"
-            
             impacts.append(FileImpact(
                 file_path=dep,
                 impact_type=impact_type,
@@ -291,12 +396,12 @@ class ChangeTracker:
     
     def _detect_intent(
         self,
-        file_path: str,
+        file_name: str,
         diff_lines: List[dict],
         stats: dict,
     ) -> ChangeIntent:
         """Detect the intent of the change using heuristics."""
-        file_name = Path(file_path).name.lower()
+        file_name = file_name.lower()
         
         # Check file name patterns
         if "test" in file_name:
@@ -335,25 +440,30 @@ class ChangeTracker:
     def _generate_description(
         self,
         file_path: str,
+        file_name: str,
         change_type: ChangeType,
         diff_lines: List[dict],
         stats: dict,
     ) -> str:
         """Generate a human-readable description of the change."""
-        file_name = Path(file_path).name
-        
         if change_type == ChangeType.CREATED:
             return f"New file created: {file_name}"
         elif change_type == ChangeType.DELETED:
             return f"File deleted: {file_name}"
         
-        # For modifications, use LLM if available
-        if api_key and diff_lines:
+        added = stats.get("added", 0)
+        removed = stats.get("removed", 0)
+        
+        # For modifications, use LLM if available (and the change is not trivial)
+        if _wants_llm_description(diff_lines, stats):
+            prefetched = self._prefetched_descriptions.pop(
+                _description_key(file_path, diff_lines, stats), None
+            )
+            if prefetched:
+                return prefetched
             return self._llm_description(file_name, diff_lines, stats)
         
         # Fallback to simple description
-        added = stats.get("added", 0)
-        removed = stats.get("removed", 0)
         return f"Modified {file_name}: +{added} -{removed} lines"
     
     def _llm_description(
@@ -364,23 +474,14 @@ class ChangeTracker:
     ) -> str:
         """Generate description using LLM."""
         try:
-            model = genai.GenerativeModel("gemini-2.0-flash")
-            
-            # Build diff text
-            diff_text = []
-            for d in diff_lines[:15]:  # Limit
-                prefix = "+" if d.get("type") == "add" else "-" if d.get("type") == "remove" else " "
-                diff_text.append(f"{prefix} {d.get('line', '')}")
+            model = _get_model()
             
-            prompt = f"""Describe this code change in ONE short sentence (max 10 words).
-
-File: {file_name}
-Changes: +{stats.get('added', 0)} -{stats.get('removed', 0)} lines
-
-Diff:
-{chr(10).join(diff_text)}
-
-Be specific about WHAT changed, not generic. Example: "Added user authentication validation" not "Modified code"."""
+            prompt = LLM_DESCRIPTION_PROMPT.format(
+                file_name=file_name,
+                added=stats.get('added', 0),
+                removed=stats.get('removed', 0),
+                diff=_diff_text(diff_lines),
+            )
 
             response = model.generate_content(
                 prompt,
@@ -394,6 +495,53 @@ Be specific about WHAT changed, not generic. Example: "Added user authentication
         except Exception:
             return f"Modified {file_name}: +{stats.get('added', 0)} -{stats.get('removed', 0)} lines"
     
+    def prefetch_descriptions(self, changes: List[Tuple[str, List[dict], dict]]):
+        """Describe a burst of modifications with one LLM call per batch.
+        
+        changes holds (file_path, diff_lines, stats) for each file about to
+        be tracked; track_change then uses the prefetched description
+        instead of its own LLM call. Failures are ignored (track_change
+        falls back to describing the change itself).
+        """
+        pending = [
+            change for change in changes
+            if _wants_llm_description(change[1], change[2])
+            and _description_key(*change) not in self._prefetched_descriptions
+        ]
+        if len(pending) < 2:
+            return
+        
+        for start in range(0, len(pending), DESCRIPTION_BATCH_SIZE):
+            batch = pending[start:start + DESCRIPTION_BATCH_SIZE]
+            sections = "\n\n".join(
+                f"### Change {i}\nFile: {os.path.basename(file_path)}\n"
+                f"Changes: +{stats.get('added', 0)} -{stats.get('removed', 0)} lines\n"
+                f"Diff:\n{_diff_text(diff_lines)}"
+                for i, (file_path, diff_lines, stats) in enumerate(batch, 1)
+            )
+            prompt = LLM_BATCH_DESCRIPTION_PROMPT.format(count=len(batch), changes=sections)
+            
+            try:
+                model = _get_model()
+                response = model.generate_content(
+                    prompt,
+                    generation_config=genai.types.GenerationConfig(
+                        temperature=0.3,
+                        max_output_tokens=50 * len(batch),
+                    ),
+                )
+                descriptions = json.loads(_FENCE_RE.sub("", response.text.strip()))
+            except Exception:
+                continue
+            
+            if not isinstance(descriptions, list) or len(descriptions) != len(batch):
+                continue
+            for change, description in zip(batch, descriptions):
+                if isinstance(description, str) and description.strip():
+                    self._prefetched_descriptions[_description_key(*change)] = (
+                        description.strip().strip('"').strip("'")
+                    )
+    
     def _detect_warnings(
         self,
         file_path: str,
@@ -412,25 +560,17 @@ Be specific about WHAT changed, not generic. Example: "Added user authentication
                     f"BREAKING: {len(dependents)} file(s) import this deleted file"
                 )
         
-        # Warning: Syntax error in new content
+        # Warning: Syntax error in new content (parsed already by add_file)
         if new_content and file_path.endswith(".py"):
-            try:
-                ast.parse(new_content)
-            except SyntaxError as e:
-                warnings.append(f"SYNTAX ERROR: Line {e.lineno}: {e.msg}")
+            error = _parse(new_content)[1]
+            if error is not None:
+                warnings.append(f"SYNTAX ERROR: Line {error.lineno}: {error.msg}")
         
         # Warning: Hardcoded secrets
         if new_content:
-            secret_patterns = [
-                r'api[_-]?key\s*=\s*["\'][^"\']+["\']',
-                r'password\s*=\s*["\'][^"\']+["\']',
-                r'secret\s*=\s*["\'][^"\']+["\']',
-                r'token\s*=\s*["\'][^"\']+["\']',
-            ]
-            for pattern in secret_patterns:
-                if re.search(pattern, new_content, re.IGNORECASE):
-                    warnings.append("SECURITY: Possible hardcoded secret detected")
-                    break
+            lowered = new_content.lower()
+            if any(k in lowered for k in _SECRET_KEYWORDS) and _SECRET_RE.search(new_content):
+                warnings.append("SECURITY: Possible hardcoded secret detected")
         
         return warnings
     
@@ -453,34 +593,91 @@ Be specific about WHAT changed, not generic. Example: "Added user authentication
     
     def get_session_summary(self) -> dict:
         """Get summary statistics for current session."""
-        if not self.changes:
-            return {
-                "session_id": self.session_id,
-                "total_changes": 0,
-                "files_modified": 0,
-                "lines_added": 0,
-                "lines_removed": 0,
-                "warnings": 0,
-                "breaking_changes": 0,
-            }
-        
-        files_modified = len(set(c.file_path for c in self.changes))
-        total_added = sum(c.lines_added for c in self.changes)
-        total_removed = sum(c.lines_removed for c in self.changes)
-        total_warnings = sum(len(c.warnings) for c in self.changes)
-        breaking = sum(1 for c in self.changes if c.impact_level == ImpactLevel.CRITICAL)
-        
         return {
             "session_id": self.session_id,
             "total_changes": len(self.changes),
-            "files_modified": files_modified,
-            "lines_added": total_added,
-            "lines_removed": total_removed,
-            "warnings": total_warnings,
-            "breaking_changes": breaking,
+            "files_modified": len(self._files_seen),
+            "lines_added": self._lines_added,
+            "lines_removed": self._lines_removed,
+            "warnings": self._warning_count,
+            "breaking_changes": self._breaking_count,
         }
 
 
+def _content_digest(content: str) -> bytes:
+    """Digest identifying a file's content."""
+    return hashlib.blake2b(content.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+
+def _project_key(project_path: Path) -> str:
+    """Cache file name for a project's dependency graph."""
+    return hashlib.blake2b(str(project_path).encode(), digest_size=16).hexdigest()
+
+
+def _parse(content: str) -> Tuple[frozenset, Optional[SyntaxError]]:
+    """Parse Python code once, returning its imports and any syntax error."""
+    key = _content_digest(content)
+    cached = _PARSE_CACHE.get(key)
+    if cached is not None:
+        _PARSE_CACHE.move_to_end(key)
+        return cached
+    
+    imports = set()
+    error = None
+    
+    try:
+        tree = ast.parse(content)
+        
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    imports.add(alias.name)
+            elif isinstance(node, ast.ImportFrom):
+                if node.module:
+                    imports.add(node.module)
+    except SyntaxError as e:
+        error = e.with_traceback(None)
+        # If we can't parse, try regex
+        for match in _IMPORT_RE.finditer(content):
+            module = match.group(1) or match.group(2)
+            if module:
+                imports.add(module)
+    
+    result = (frozenset(imports), error)
+    _PARSE_CACHE[key] = result
+    if len(_PARSE_CACHE) > _PARSE_CACHE_MAX:
+        _PARSE_CACHE.popitem(last=False)
+    return result
+
+
+@lru_cache(maxsize=None)
+def _get_model(name: str = MODEL_NAME) -> genai.GenerativeModel:
+    """Get a shared GenerativeModel instance."""
+    return genai.GenerativeModel(name)
+
+
+def _wants_llm_description(diff_lines: List[dict], stats: dict) -> bool:
+    """Check if a modification is worth an LLM description."""
+    return (
+        bool(api_key)
+        and len(diff_lines) >= MIN_LLM_CHANGED_LINES
+        and stats.get("added", 0) + stats.get("removed", 0) >= MIN_LLM_CHANGED_LINES
+    )
+
+
+def _diff_text(diff_lines: List[dict]) -> str:
+    """Format the start of a diff for an LLM prompt."""
+    return "\n".join(
+        f"{'+' if d.get('type') == 'add' else '-' if d.get('type') == 'remove' else ' '} {d.get('line', '')}"
+        for d in diff_lines[:15]  # Limit
+    )
+
+
+def _description_key(file_path: str, diff_lines: List[dict], stats: dict) -> tuple:
+    """Identify a change by what its description prompt contains."""
+    return (file_path, stats.get("added", 0), stats.get("removed", 0), _diff_text(diff_lines))
+
+
 # Global tracker instance
 _tracker: Optional[ChangeTracker] = None
 
@@ -38,15 +38,15 @@ def writer_node(state: GraphState) -> GraphState:
     Write the updated architecture to file.
 
     Input: updated_mermaid, file_path (the changed file), analysis_result
-    Output: (writes to disk, returns unchanged state)
+    Output: (writes to disk, no state updates)
     """
     updated = state.get("updated_mermaid")
     if not updated:
-        return state
+        return {}
 
     if not state.get("is_valid_mermaid", False):
         console.print("[yellow]   SKIP: invalid mermaid[/yellow]")
-        return state
+        return {}
 
     output_path = Path(os.getenv("OUTPUT_FILE", "./output/LIVE_ARCHITECTURE.md"))
     output_path.parent.mkdir(parents=True, exist_ok=True)
@@ -90,7 +90,7 @@ def writer_node(state: GraphState) -> GraphState:
     except Exception as e:
         console.print(f"[red]   ERROR: Write failed: {e}[/red]")
 
-    return state
+    return {}
 
 
 def load_existing_history(path: Path) -> str:
@@ -4,9 +4,14 @@ Generates stunning interactive HTML dashboards.
 """
 
 from datetime import datetime
+from functools import lru_cache
+from html import escape
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterator, Optional
+import hashlib
+import json
 import re
+import string
 
 
 HTML_TEMPLATE = '''<!DOCTYPE html>
@@ -15,1041 +20,13 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>{project_name} · Umbra</title>
+    <link rel="preconnect" href="https://cdn.jsdelivr.net">
+    <link rel="preconnect" href="https://fonts.googleapis.com">
+    <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
     <script src="https://cdn.jsdelivr.net/npm/mermaid@10/dist/mermaid.min.js"></script>
     <script src="https://cdn.jsdelivr.net/npm/panzoom@9.4.0/dist/panzoom.min.js"></script>
     <link href="https://fonts.googleapis.com/css2?family=Outfit:wght@300;400;500;600;700;800&family=JetBrains+Mono:wght@400;500&display=swap" rel="stylesheet">
-    <style>
-        :root {{
-            --bg-void: #0a0a0c;
-            --bg-deep: #0f0f12;
-            --bg-surface: rgba(18, 18, 24, 0.8);
-            --bg-glass: rgba(255, 255, 255, 0.03);
-            --bg-glass-hover: rgba(255, 255, 255, 0.06);
-            
-            --border-subtle: rgba(255, 255, 255, 0.06);
-            --border-medium: rgba(255, 255, 255, 0.1);
-            --border-accent: rgba(139, 92, 246, 0.4);
-            
-            --text-primary: #f8fafc;
-            --text-secondary: #94a3b8;
-            --text-muted: #64748b;
-            
-            --accent-violet: #8b5cf6;
-            --accent-blue: #3b82f6;
-            --accent-cyan: #06b6d4;
-            --accent-emerald: #10b981;
-            --accent-amber: #f59e0b;
-            --accent-rose: #f43f5e;
-            
-            --gradient-primary: linear-gradient(135deg, var(--accent-violet), var(--accent-blue));
-            --gradient-mesh: 
-                radial-gradient(at 20% 30%, rgba(139, 92, 246, 0.15) 0%, transparent 50%),
-                radial-gradient(at 80% 20%, rgba(6, 182, 212, 0.1) 0%, transparent 40%),
-                radial-gradient(at 40% 80%, rgba(59, 130, 246, 0.08) 0%, transparent 45%);
-            
-            --font: 'Outfit', -apple-system, sans-serif;
-            --mono: 'JetBrains Mono', monospace;
-            
-            --radius-sm: 8px;
-            --radius-md: 12px;
-            --radius-lg: 16px;
-            --radius-xl: 24px;
-            
-            --shadow-glow: 0 0 60px rgba(139, 92, 246, 0.15);
-            --shadow-card: 0 4px 24px rgba(0, 0, 0, 0.3);
-            
-            --sidebar-width: 340px;
-            --chat-height: 280px;
-        }}
-
-        @keyframes float {{
-            0%, 100% {{ transform: translateY(0px); }}
-            50% {{ transform: translateY(-10px); }}
-        }}
-
-        @keyframes pulse-glow {{
-            0%, 100% {{ opacity: 0.5; }}
-            50% {{ opacity: 1; }}
-        }}
-
-        @keyframes gradient-shift {{
-            0% {{ background-position: 0% 50%; }}
-            50% {{ background-position: 100% 50%; }}
-            100% {{ background-position: 0% 50%; }}
-        }}
-
-        @keyframes fade-in {{
-            from {{ opacity: 0; transform: translateY(10px); }}
-            to {{ opacity: 1; transform: translateY(0); }}
-        }}
-
-        * {{ box-sizing: border-box; margin: 0; padding: 0; }}
-        
-        html, body {{ 
-            height: 100%; 
-            overflow: hidden;
-            background: var(--bg-void);
-            color: var(--text-primary);
-            font-family: var(--font);
-            font-size: 14px;
-            -webkit-font-smoothing: antialiased;
-        }}
-
-        /* ===== ANIMATED BACKGROUND ===== */
-        .bg-mesh {{
-            position: fixed;
-            inset: 0;
-            background: var(--gradient-mesh);
-            pointer-events: none;
-            z-index: 0;
-        }}
-
-        .bg-grid {{
-            position: fixed;
-            inset: 0;
-            background-image: 
-                linear-gradient(rgba(255,255,255,0.02) 1px, transparent 1px),
-                linear-gradient(90deg, rgba(255,255,255,0.02) 1px, transparent 1px);
-            background-size: 40px 40px;
-            pointer-events: none;
-            z-index: 0;
-        }}
-
-        /* ===== LAYOUT ===== */
-        .app {{
-            display: flex;
-            height: 100vh;
-            position: relative;
-            z-index: 1;
-        }}
-
-        /* ===== SIDEBAR ===== */
-        .sidebar {{
-            width: var(--sidebar-width);
-            min-width: 300px;
-            max-width: 480px;
-            background: var(--bg-surface);
-            backdrop-filter: blur(20px);
-            border-right: 1px solid var(--border-subtle);
-            display: flex;
-            flex-direction: column;
-            position: relative;
-        }}
-
-        .sidebar-resize {{
-            position: absolute;
-            right: -3px;
-            top: 0;
-            width: 6px;
-            height: 100%;
-            cursor: ew-resize;
-            z-index: 50;
-            transition: background 0.2s;
-        }}
-        .sidebar-resize:hover {{ background: var(--accent-violet); }}
-
-        /* Brand */
-        .brand {{
-            padding: 1.5rem;
-            border-bottom: 1px solid var(--border-subtle);
-            display: flex;
-            align-items: center;
-            gap: 1rem;
-        }}
-
-        .brand-logo {{
-            width: 44px;
-            height: 44px;
-            background: var(--gradient-primary);
-            border-radius: var(--radius-md);
-            display: grid;
-            place-items: center;
-            font-size: 22px;
-            box-shadow: var(--shadow-glow);
-            animation: float 4s ease-in-out infinite;
-        }}
-
-        .brand-text h1 {{
-            font-size: 20px;
-            font-weight: 700;
-            background: var(--gradient-primary);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-            background-clip: text;
-        }}
-
-        .brand-text p {{
-            font-size: 13px;
-            color: var(--text-muted);
-            font-weight: 400;
-        }}
-
-        /* Tabs */
-        .tabs {{
-            display: flex;
-            padding: 0.5rem;
-            gap: 0.25rem;
-            background: var(--bg-glass);
-            margin: 1rem;
-            border-radius: var(--radius-lg);
-        }}
-
-        .tab {{
-            flex: 1;
-            padding: 0.75rem;
-            text-align: center;
-            cursor: pointer;
-            color: var(--text-muted);
-            font-size: 13px;
-            font-weight: 500;
-            border-radius: var(--radius-md);
-            transition: all 0.2s ease;
-        }}
-
-        .tab:hover {{ color: var(--text-secondary); background: var(--bg-glass); }}
-        .tab.active {{ 
-            color: var(--text-primary); 
-            background: var(--bg-glass-hover);
-            box-shadow: 0 2px 8px rgba(0,0,0,0.2);
-        }}
-
-        /* Panels */
-        .panel {{
-            flex: 1;
-            overflow-y: auto;
-            padding: 0 1rem 1rem;
-        }}
-        .panel.hidden {{ display: none; }}
-
-        .section {{ 
-            margin-bottom: 1.5rem;
-            animation: fade-in 0.4s ease;
-        }}
-        
-        .section-header {{
-            font-size: 11px;
-            font-weight: 600;
-            color: var(--text-muted);
-            text-transform: uppercase;
-            letter-spacing: 1px;
-            margin-bottom: 0.75rem;
-            display: flex;
-            align-items: center;
-            gap: 0.5rem;
-        }}
-
-        /* ===== BENTO GRID ===== */
-        .bento {{
-            display: grid;
-            grid-template-columns: repeat(2, 1fr);
-            gap: 0.75rem;
-            margin-bottom: 1rem;
-        }}
-
-        .bento-card {{
-            background: var(--bg-glass);
-            backdrop-filter: blur(10px);
-            border: 1px solid var(--border-subtle);
-            border-radius: var(--radius-lg);
-            padding: 1rem;
-            transition: all 0.3s ease;
-            position: relative;
-            overflow: hidden;
-        }}
-
-        .bento-card::before {{
-            content: '';
-            position: absolute;
-            top: 0;
-            left: 0;
-            right: 0;
-            height: 2px;
-            background: var(--gradient-primary);
-            opacity: 0;
-            transition: opacity 0.3s;
-        }}
-
-        .bento-card:hover {{
-            background: var(--bg-glass-hover);
-            border-color: var(--border-medium);
-            transform: translateY(-2px);
-        }}
-
-        .bento-card:hover::before {{ opacity: 1; }}
-
-        .bento-card.large {{
-            grid-column: span 2;
-        }}
-
-        .bento-value {{
-            font-family: var(--mono);
-            font-size: 28px;
-            font-weight: 700;
-            background: var(--gradient-primary);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-        }}
-
-        .bento-label {{
-            font-size: 12px;
-            color: var(--text-muted);
-            margin-top: 4px;
-        }}
-
-        /* Health Card */
-        .health-card {{
-            background: var(--bg-glass);
-            backdrop-filter: blur(10px);
-            border: 1px solid var(--border-subtle);
-            border-radius: var(--radius-xl);
-            padding: 1.25rem;
-            display: flex;
-            gap: 1rem;
-            align-items: center;
-            margin-bottom: 1rem;
-        }}
-
-        .grade-ring {{
-            width: 64px;
-            height: 64px;
-            border-radius: 50%;
-            display: grid;
-            place-items: center;
-            font-size: 28px;
-            font-weight: 800;
-            position: relative;
-        }}
-
-        .grade-ring::before {{
-            content: '';
-            position: absolute;
-            inset: -3px;
-            border-radius: 50%;
-            padding: 3px;
-            background: var(--gradient-primary);
-            -webkit-mask: linear-gradient(#fff 0 0) content-box, linear-gradient(#fff 0 0);
-            -webkit-mask-composite: xor;
-            mask-composite: exclude;
-        }}
-
-        .grade-ring.A {{ color: var(--accent-emerald); }}
-        .grade-ring.B {{ color: #4ade80; }}
-        .grade-ring.C {{ color: var(--accent-amber); }}
-        .grade-ring.D {{ color: #f97316; }}
-        .grade-ring.F {{ color: var(--accent-rose); }}
-
-        .health-info h3 {{ font-size: 15px; font-weight: 600; }}
-        .health-info p {{ font-size: 12px; color: var(--text-muted); }}
-
-        /* Chips */
-        .chip-wrap {{
-            display: flex;
-            flex-wrap: wrap;
-            gap: 0.5rem;
-        }}
-
-        .chip {{
-            background: var(--bg-glass);
-            border: 1px solid var(--border-subtle);
-            padding: 0.5rem 0.875rem;
-            border-radius: var(--radius-lg);
-            font-size: 12px;
-            font-family: var(--mono);
-            color: var(--text-secondary);
-            transition: all 0.2s;
-            cursor: default;
-        }}
-
-        .chip:hover {{
-            background: var(--bg-glass-hover);
-            border-color: var(--border-medium);
-        }}
-
-        .chip.entry {{ 
-            border-color: rgba(16, 185, 129, 0.3);
-            color: var(--accent-emerald);
-        }}
-        .chip.api {{ 
-            border-color: rgba(59, 130, 246, 0.3);
-            color: var(--accent-blue);
-        }}
-
-        /* File List */
-        .file-list {{
-            display: flex;
-            flex-direction: column;
-            gap: 4px;
-        }}
-
-        .file-row {{
-            display: flex;
-            align-items: center;
-            justify-content: space-between;
-            padding: 0.625rem 0.875rem;
-            border-radius: var(--radius-md);
-            cursor: pointer;
-            transition: all 0.15s;
-            font-family: var(--mono);
-            font-size: 12px;
-            color: var(--text-secondary);
-            background: var(--bg-glass);
-            border: 1px solid transparent;
-        }}
-
-        .file-row:hover {{
-            background: var(--bg-glass-hover);
-            border-color: var(--border-subtle);
-            color: var(--text-primary);
-        }}
-
-        .file-row .lines {{
-            color: var(--text-muted);
-            font-size: 11px;
-        }}
-
-        /* Activity List */
-        .activity-list {{
-            display: flex;
-            flex-direction: column;
-            gap: 0.5rem;
-        }}
-
-        .activity-item {{
-            display: flex;
-            flex-direction: column;
-            gap: 0.5rem;
-            padding: 0.875rem;
-            background: var(--bg-glass);
-            border: 1px solid var(--border-subtle);
-            border-radius: var(--radius-md);
-            animation: fade-in 0.3s ease;
-            transition: all 0.2s;
-        }}
-
-        .activity-item:hover {{
-            background: var(--bg-glass-hover);
-            border-color: var(--border-medium);
-        }}
-
-        .activity-header {{
-            display: flex;
-            align-items: center;
-            gap: 0.75rem;
-        }}
-
-        .activity-time {{
-            font-family: var(--mono);
-            font-size: 10px;
-            color: var(--text-muted);
-            min-width: 55px;
-        }}
-
-        .activity-icon {{
-            width: 22px;
-            height: 22px;
-            border-radius: 6px;
-            display: grid;
-            place-items: center;
-            font-size: 11px;
-            flex-shrink: 0;
-        }}
-
-        .activity-icon.modified {{ background: rgba(59, 130, 246, 0.2); color: var(--accent-blue); }}
-        .activity-icon.created {{ background: rgba(16, 185, 129, 0.2); color: var(--accent-emerald); }}
-        .activity-icon.deleted {{ background: rgba(244, 63, 94, 0.2); color: var(--accent-rose); }}
-
-        .activity-file {{
-            font-family: var(--mono);
-            font-size: 12px;
-            color: var(--text-primary);
-            font-weight: 500;
-        }}
-
-        .activity-desc {{
-            font-size: 12px;
-            color: var(--text-secondary);
-            padding-left: 2rem;
-            line-height: 1.4;
-        }}
-
-        /* Diff Stats Badge */
-        .diff-stats {{
-            margin-left: auto;
-            display: flex;
-            gap: 0.5rem;
-            font-family: var(--mono);
-            font-size: 10px;
-        }}
-
-        .stat-add {{
-            color: var(--accent-emerald);
-            font-weight: 600;
-        }}
-
-        .stat-remove {{
-            color: var(--accent-rose);
-            font-weight: 600;
-        }}
-
-        /* Diff Toggle & Content */
-        .diff-toggle {{
-            display: flex;
-            align-items: center;
-            gap: 0.5rem;
-            padding: 0.375rem 0.75rem;
-            margin-left: 2rem;
-            font-size: 11px;
-            color: var(--text-muted);
-            cursor: pointer;
-            border-radius: var(--radius-sm);
-            transition: all 0.2s;
-        }}
-
-        .diff-toggle:hover {{
-            background: var(--bg-glass);
-            color: var(--text-secondary);
-        }}
-
-        .diff-toggle-icon {{
-            font-size: 8px;
-            transition: transform 0.2s;
-        }}
-
-        .diff-toggle.active .diff-toggle-icon {{
-            transform: rotate(90deg);
-        }}
-
-        .diff-content {{
-            margin-left: 2rem;
-            margin-top: 0.5rem;
-            padding: 0.75rem;
-            background: rgba(0, 0, 0, 0.3);
-            border-radius: var(--radius-md);
-            font-family: var(--mono);
-            font-size: 11px;
-            overflow-x: auto;
-            border: 1px solid var(--border-subtle);
-        }}
-
-        .diff-line {{
-            padding: 2px 8px;
-            white-space: pre;
-            border-radius: 2px;
-        }}
-
-        .diff-add {{
-            background: rgba(16, 185, 129, 0.15);
-            color: #4ade80;
-        }}
-
-        .diff-remove {{
-            background: rgba(244, 63, 94, 0.15);
-            color: #fb7185;
-        }}
-
-        .diff-context {{
-            color: var(--text-muted);
-        }}
-
-        .diff-header {{
-            color: var(--accent-purple);
-            font-weight: 500;
-            margin-top: 0.5rem;
-        }}
-
-        .diff-more {{
-            color: var(--text-muted);
-            font-style: italic;
-            padding-top: 0.5rem;
-        }}
-
-        /* Intent badges */
-        .intent-badge {{
-            font-size: 9px;
-            font-weight: 600;
-            text-transform: uppercase;
-            padding: 2px 6px;
-            border-radius: 4px;
-            letter-spacing: 0.5px;
-        }}
-
-        /* Warnings box */
-        .warnings-box {{
-            background: rgba(244, 63, 94, 0.1);
-            border: 1px solid rgba(244, 63, 94, 0.3);
-            border-radius: var(--radius-sm);
-            padding: 0.5rem 0.75rem;
-            margin-top: 0.25rem;
-        }}
-
-        .warning-item {{
-            color: var(--accent-rose);
-            font-size: 11px;
-            font-weight: 500;
-        }}
-
-        .activity-item.has-warning {{
-            border-color: rgba(244, 63, 94, 0.4);
-            background: rgba(244, 63, 94, 0.05);
-        }}
-
-        /* Impact box */
-        .impact-box {{
-            background: rgba(245, 158, 11, 0.08);
-            border: 1px solid rgba(245, 158, 11, 0.2);
-            border-radius: var(--radius-sm);
-            padding: 0.5rem 0.75rem;
-            margin-top: 0.25rem;
-        }}
-
-        .impact-header {{
-            color: var(--accent-amber);
-            font-size: 11px;
-            font-weight: 600;
-            margin-bottom: 0.25rem;
-        }}
-
-        .impact-item {{
-            font-size: 10px;
-            color: var(--text-secondary);
-            padding: 2px 0;
-        }}
-
-        .impact-file {{
-            color: var(--accent-amber);
-            font-family: var(--mono);
-        }}
-
-        .impact-more {{
-            color: var(--text-muted);
-            font-size: 10px;
-            font-style: italic;
-            margin-top: 0.25rem;
-        }}
-
-        .activity-empty {{
-            text-align: center;
-            padding: 2rem 1rem;
-            color: var(--text-muted);
-            font-size: 13px;
-        }}
-
-        /* Live indicator */
-        .live-indicator {{
-            display: flex;
-            align-items: center;
-            gap: 0.5rem;
-            padding: 0.5rem 0.75rem;
-            background: rgba(16, 185, 129, 0.1);
-            border: 1px solid rgba(16, 185, 129, 0.2);
-            border-radius: var(--radius-md);
-            font-size: 11px;
-            color: var(--accent-emerald);
-            margin-bottom: 1rem;
-        }}
-
-        .live-dot {{
-            width: 6px;
-            height: 6px;
-            border-radius: 50%;
-            background: var(--accent-emerald);
-            animation: pulse-glow 1.5s infinite;
-        }}
-
-        /* Issues */
-        .issue-card {{
-            background: var(--bg-glass);
-            border: 1px solid var(--border-subtle);
-            border-left: 3px solid var(--accent-amber);
-            border-radius: var(--radius-md);
-            padding: 0.875rem;
-            margin-bottom: 0.5rem;
-            cursor: pointer;
-            transition: all 0.2s;
-        }}
-
-        .issue-card:hover {{
-            background: var(--bg-glass-hover);
-            transform: translateX(4px);
-        }}
-
-        .issue-card.critical {{ border-left-color: var(--accent-rose); }}
-
-        .issue-title {{ font-size: 13px; font-weight: 500; margin-bottom: 4px; }}
-        .issue-desc {{ font-size: 12px; color: var(--text-muted); line-height: 1.5; }}
-
-        /* Summary */
-        .summary-content {{
-            font-size: 13px;
-            color: var(--text-secondary);
-            line-height: 1.7;
-        }}
-
-        .summary-content h4 {{
-            color: var(--text-primary);
-            font-size: 14px;
-            font-weight: 600;
-            margin: 1rem 0 0.5rem;
-        }}
-
-        .summary-content table {{
-            width: 100%;
-            border-collapse: collapse;
-            margin: 0.75rem 0;
-            font-size: 12px;
-        }}
-
-        .summary-content th,
-        .summary-content td {{
-            padding: 0.625rem;
-            text-align: left;
-            border-bottom: 1px solid var(--border-subtle);
-        }}
-
-        .summary-content th {{
-            color: var(--text-muted);
-            font-weight: 500;
-            text-transform: uppercase;
-            font-size: 10px;
-            letter-spacing: 0.5px;
-        }}
-
-        .summary-content code {{
-            background: var(--bg-glass);
-            padding: 2px 6px;
-            border-radius: 4px;
-            font-family: var(--mono);
-            font-size: 11px;
-        }}
-
-        /* ===== MAIN AREA ===== */
-        .main {{
-            flex: 1;
-            display: flex;
-            flex-direction: column;
-            min-width: 0;
-            position: relative;
-        }}
-
-        .diagram-area {{
-            flex: 1;
-            position: relative;
-            overflow: hidden;
-        }}
-
-        .diagram-toolbar {{
-            position: absolute;
-            top: 1rem;
-            right: 1rem;
-            display: flex;
-            gap: 0.5rem;
-            z-index: 100;
-        }}
-
-        .tool-btn {{
-            width: 40px;
-            height: 40px;
-            background: var(--bg-surface);
-            backdrop-filter: blur(10px);
-            border: 1px solid var(--border-subtle);
-            border-radius: var(--radius-md);
-            color: var(--text-primary);
-            display: grid;
-            place-items: center;
-            cursor: pointer;
-            font-size: 18px;
-            transition: all 0.2s;
-        }}
-
-        .tool-btn:hover {{
-            background: var(--bg-glass-hover);
-            border-color: var(--border-medium);
-            transform: scale(1.05);
-        }}
-
-        .tool-btn:active {{ transform: scale(0.95); }}
-
-        #diagram-wrapper {{
-            width: 100%;
-            height: 100%;
-            overflow: hidden;
-        }}
-
-        #diagram-content {{
-            display: inline-block;
-            padding: 3rem;
-            min-width: 100%;
-            min-height: 100%;
-        }}
-
-        .mermaid {{
-            display: flex;
-            justify-content: center;
-        }}
-
-        /* ===== CHAT PANEL ===== */
-        .chat-panel {{
-            height: var(--chat-height);
-            min-height: 200px;
-            max-height: 50vh;
-            background: var(--bg-surface);
-            backdrop-filter: blur(20px);
-            border-top: 1px solid var(--border-subtle);
-            display: flex;
-            flex-direction: column;
-            position: relative;
-        }}
-
-        .chat-resize {{
-            position: absolute;
-            top: -4px;
-            left: 0;
-            width: 100%;
-            height: 8px;
-            cursor: ns-resize;
-            z-index: 50;
-        }}
-        .chat-resize:hover {{ background: linear-gradient(to bottom, var(--accent-violet), transparent); }}
-
-        .chat-header {{
-            padding: 0.875rem 1.25rem;
-            border-bottom: 1px solid var(--border-subtle);
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            background: var(--bg-glass);
-        }}
-
-        .chat-title {{
-            font-weight: 600;
-            font-size: 14px;
-            display: flex;
-            align-items: center;
-            gap: 0.625rem;
-        }}
-
-        .chat-title span {{ font-size: 18px; }}
-
-        .status {{
-            display: flex;
-            align-items: center;
-            gap: 8px;
-            font-size: 12px;
-            color: var(--text-muted);
-        }}
-
-        .status-dot {{
-            width: 8px;
-            height: 8px;
-            border-radius: 50%;
-            background: var(--text-muted);
-            transition: all 0.3s;
-        }}
-
-        .status-dot.online {{ 
-            background: var(--accent-emerald); 
-            box-shadow: 0 0 12px var(--accent-emerald);
-            animation: pulse-glow 2s infinite;
-        }}
-
-        .chat-body {{
-            flex: 1;
-            overflow-y: auto;
-            padding: 1rem 1.25rem;
-            display: flex;
-            flex-direction: column;
-            gap: 1rem;
-        }}
-
-        .msg {{
-            display: flex;
-            gap: 0.75rem;
-            max-width: 85%;
-            animation: fade-in 0.3s ease;
-        }}
-        
-        .msg.user {{ flex-direction: row-reverse; align-self: flex-end; }}
-
-        .msg-avatar {{
-            width: 32px;
-            height: 32px;
-            border-radius: var(--radius-md);
-            display: grid;
-            place-items: center;
-            font-size: 14px;
-            font-weight: 600;
-            flex-shrink: 0;
-        }}
-
-        .msg-avatar.ai {{ background: var(--gradient-primary); }}
-        .msg-avatar.user {{ background: var(--bg-glass); color: var(--text-muted); }}
-
-        .msg-bubble {{
-            background: var(--bg-glass);
-            border: 1px solid var(--border-subtle);
-            padding: 0.875rem 1rem;
-            border-radius: var(--radius-lg);
-            font-size: 13px;
-            line-height: 1.6;
-        }}
-
-        .msg.user .msg-bubble {{
-            background: var(--gradient-primary);
-            border: none;
-        }}
-
-        .msg-bubble code {{
-            font-family: var(--mono);
-            background: rgba(0,0,0,0.3);
-            padding: 2px 6px;
-            border-radius: 4px;
-            font-size: 12px;
-        }}
-
-        .msg-bubble pre {{
-            background: rgba(0,0,0,0.3);
-            border: 1px solid var(--border-subtle);
-            padding: 0.75rem;
-            border-radius: var(--radius-md);
-            overflow-x: auto;
-            margin: 0.5rem 0;
-        }}
-
-        .chat-input-wrap {{
-            padding: 0.875rem 1.25rem;
-            border-top: 1px solid var(--border-subtle);
-            display: flex;
-            gap: 0.625rem;
-            background: var(--bg-glass);
-        }}
-
-        .chat-input {{
-            flex: 1;
-            background: var(--bg-void);
-            border: 1px solid var(--border-subtle);
-            border-radius: var(--radius-lg);
-            padding: 0.875rem 1rem;
-            color: var(--text-primary);
-            font-family: var(--font);
-            font-size: 13px;
-            outline: none;
-            transition: all 0.2s;
-        }}
-
-        .chat-input:focus {{ 
-            border-color: var(--accent-violet); 
-            box-shadow: 0 0 0 3px rgba(139, 92, 246, 0.1);
-        }}
-        .chat-input::placeholder {{ color: var(--text-muted); }}
-
-        .send-btn {{
-            background: var(--gradient-primary);
-            color: white;
-            border: none;
-            border-radius: var(--radius-lg);
-            padding: 0 1.5rem;
-            font-weight: 600;
-            font-size: 13px;
-            cursor: pointer;
-            transition: all 0.2s;
-        }}
-
-        .send-btn:hover {{ filter: brightness(1.1); transform: scale(1.02); }}
-        .send-btn:active {{ transform: scale(0.98); }}
-        .send-btn:disabled {{ opacity: 0.5; cursor: not-allowed; }}
-
-        /* ===== COMMAND PALETTE (Ctrl+K) ===== */
-        .cmd-overlay {{
-            position: fixed;
-            inset: 0;
-            background: rgba(0,0,0,0.7);
-            backdrop-filter: blur(8px);
-            z-index: 1000;
-            display: none;
-            place-items: center;
-        }}
-
-        .cmd-overlay.open {{ display: grid; }}
-
-        .cmd-modal {{
-            width: 560px;
-            max-width: 90vw;
-            background: var(--bg-surface);
-            border: 1px solid var(--border-subtle);
-            border-radius: var(--radius-xl);
-            overflow: hidden;
-            box-shadow: var(--shadow-card), var(--shadow-glow);
-            animation: fade-in 0.2s ease;
-        }}
-
-        .cmd-input-wrap {{
-            display: flex;
-            align-items: center;
-            gap: 0.75rem;
-            padding: 1rem 1.25rem;
-            border-bottom: 1px solid var(--border-subtle);
-        }}
-
-        .cmd-icon {{ font-size: 20px; color: var(--text-muted); }}
-
-        .cmd-input {{
-            flex: 1;
-            background: none;
-            border: none;
-            outline: none;
-            font-size: 16px;
-            color: var(--text-primary);
-            font-family: var(--font);
-        }}
-
-        .cmd-input::placeholder {{ color: var(--text-muted); }}
-
-        .cmd-hint {{
-            font-size: 12px;
-            color: var(--text-muted);
-            padding: 4px 8px;
-            background: var(--bg-glass);
-            border-radius: 4px;
-        }}
-
-        .cmd-results {{
-            max-height: 320px;
-            overflow-y: auto;
-            padding: 0.5rem;
-        }}
-
-        .cmd-item {{
-            display: flex;
-            align-items: center;
-            gap: 0.75rem;
-            padding: 0.75rem 1rem;
-            border-radius: var(--radius-md);
-            cursor: pointer;
-            transition: background 0.15s;
-        }}
-
-        .cmd-item:hover, .cmd-item.selected {{ background: var(--bg-glass-hover); }}
-
-        .cmd-item-icon {{
-            width: 28px;
-            height: 28px;
-            background: var(--bg-glass);
-            border-radius: 6px;
-            display: grid;
-            place-items: center;
-            font-size: 14px;
-        }}
-
-        .cmd-item-text {{ flex: 1; }}
-        .cmd-item-title {{ font-size: 14px; font-weight: 500; }}
-        .cmd-item-path {{ font-size: 11px; color: var(--text-muted); font-family: var(--mono); }}
-
-        /* Scrollbar */
-        ::-webkit-scrollbar {{ width: 8px; height: 8px; }}
-        ::-webkit-scrollbar-track {{ background: transparent; }}
-        ::-webkit-scrollbar-thumb {{ background: var(--border-subtle); border-radius: 4px; }}
-        ::-webkit-scrollbar-thumb:hover {{ background: var(--border-medium); }}
-    </style>
+    <style>{dashboard_css}</style>
 </head>
 <body>
     <!-- Animated Background -->
@@ -1131,7 +108,7 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
             <div class="panel hidden" id="panel-files">
                 <div class="section">
                     <div class="section-header">📁 All Files ({total_files})</div>
-                    <div class="file-list">{files_html}</div>
+                    <div class="file-list" id="file-list"></div>
                 </div>
             </div>
         </aside>
@@ -1255,7 +232,7 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
             const url = URL.createObjectURL(blob);
             const a = document.createElement('a');
             a.href = url;
-            a.download = '{project_name}-architecture.svg';
+            a.download = {project_name_json} + '-architecture.svg';
             a.click();
             URL.revokeObjectURL(url);
         }}
@@ -1267,9 +244,21 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
                 document.querySelectorAll('.panel').forEach(p => p.classList.add('hidden'));
                 tab.classList.add('active');
                 document.getElementById('panel-' + tab.dataset.tab).classList.remove('hidden');
+                if (tab.dataset.tab === 'files') renderFiles();
             }});
         }});
 
+        // ===== FILES =====
+        // Rendered from fileIndex the first time the Files tab is shown
+        let filesRendered = false;
+        function renderFiles() {{
+            if (filesRendered) return;
+            filesRendered = true;
+            document.getElementById('file-list').innerHTML = fileIndex.map(f =>
+                `<div class="file-row"><span>${{escapeHtml(f.path)}}</span><span class="lines">${{f.lines}} lines</span></div>`
+            ).join('') || '<div class="file-row"><span style="color:var(--text-muted);">No files analyzed</span></div>';
+        }}
+
         // ===== DIFF TOGGLE =====
         function toggleDiff(diffId) {{
             const diffEl = document.getElementById(diffId);
@@ -1316,6 +305,10 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
         function openCmd() {{ document.getElementById('cmd-overlay').classList.add('open'); document.getElementById('cmd-input').focus(); }}
         function closeCmd() {{ document.getElementById('cmd-overlay').classList.remove('open'); document.getElementById('cmd-input').value = ''; }}
         
+        function escapeHtml(s) {{
+            return String(s).replace(/[&<>"']/g, c => ({{'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'}})[c]);
+        }}
+
         function searchFiles(q) {{
             const res = document.getElementById('cmd-results');
             if (!q) {{ res.innerHTML = ''; return; }}
@@ -1324,8 +317,8 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
                 <div class="cmd-item" onclick="closeCmd()">
                     <div class="cmd-item-icon">📄</div>
                     <div class="cmd-item-text">
-                        <div class="cmd-item-title">${{f.path.split('/').pop()}}</div>
-                        <div class="cmd-item-path">${{f.path}}</div>
+                        <div class="cmd-item-title">${{escapeHtml(f.path.split('/').pop())}}</div>
+                        <div class="cmd-item-path">${{escapeHtml(f.path)}}</div>
                     </div>
                 </div>
             `).join('') || '<div style="padding:1rem;color:var(--text-muted);">No results</div>';
@@ -1423,12 +416,90 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
 '''
 
 
+def compile_template(
+    template: str, constants: Dict[str, str] | None = None
+) -> tuple[tuple[str, ...], tuple[str, ...]]:
+    """Split a str.format template into its literal text and field names.
+
+    Returns (literals, fields) with len(literals) == len(fields) + 1;
+    escaped braces and the fields given in constants are already
+    resolved in the literals.
+    """
+    constants = constants or {}
+    literals, fields, pending = [], [], []
+    for literal, field, _, _ in string.Formatter().parse(template):
+        pending.append(literal)
+        if field in constants:
+            pending.append(constants[field])
+        elif field is not None:
+            literals.append(''.join(pending))
+            fields.append(field)
+            pending = []
+    literals.append(''.join(pending))
+    return tuple(literals), tuple(fields)
+
+
+def encode_template(
+    compiled: tuple[tuple[str, ...], tuple[str, ...]]
+) -> tuple[tuple[bytes, ...], tuple[str, ...]]:
+    """UTF-8 encode the literals of a compiled template ahead of rendering."""
+    literals, fields = compiled
+    return tuple(literal.encode("utf-8") for literal in literals), fields
+
+
+def iter_template(
+    encoded: tuple[tuple[bytes, ...], tuple[str, ...]], values: Dict[str, Any]
+) -> Iterator[bytes]:
+    """Yield the chunks of an encoded template (see encode_template) filled with values.
+
+    Only the values are encoded; the chunks can be written out as they come.
+    """
+    literals, fields = encoded
+    yield literals[0]
+    for field, literal in zip(fields, literals[1:]):
+        yield str(values[field]).encode("utf-8")
+        yield literal
+
+
+_CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+_CSS_SPACE_RE = re.compile(r'\s+')
+# Whitespace next to punctuation where it never matters
+_CSS_PUNCT_SPACE_RE = re.compile(r'\s*([{};,])\s*|(?<=:)\s+')
+
+
+def minify_css(css: str) -> str:
+    """Strip comments and insignificant whitespace from a stylesheet.
+
+    Assumes no string literal in the stylesheet depends on its spacing.
+    """
+    css = _CSS_COMMENT_RE.sub('', css)
+    css = _CSS_SPACE_RE.sub(' ', css)
+    css = _CSS_PUNCT_SPACE_RE.sub(r'\1', css)
+    return css.replace(';}', '}').strip()
+
+
+# Dashboard styles, kept as a plain CSS asset (no brace escaping) and minified once
+DASHBOARD_CSS = minify_css(
+    (Path(__file__).parent / "assets" / "dashboard.css").read_text(encoding="utf-8")
+)
+
+# Parsed and encoded once with the styles inlined, so exports only touch the values
+_COMPILED_TEMPLATE = encode_template(
+    compile_template(HTML_TEMPLATE, {"dashboard_css": DASHBOARD_CSS})
+)
+
+# Output path -> digest of the values last written there (see export_html)
+_LAST_EXPORTS: Dict[str, bytes] = {}
+
+
+@lru_cache(maxsize=16)
 def markdown_to_html(md: str) -> str:
     """Convert markdown to beautiful HTML with table support."""
     if not md:
         return "No summary available."
     
-    html = md
+    # The summary is LLM/file text: escape it before adding our own markup
+    html = escape(md, quote=False)
     
     # Parse tables
     table_pattern = r'\|(.+)\|\n\|[-:| ]+\|\n((?:\|.+\|\n?)+)'
@@ -1439,21 +510,18 @@ def markdown_to_html(md: str) -> str:
         
         headers = [h.strip() for h in header_row.split('|') if h.strip()]
         
-        result = '<table>'
-        result += '<thead><tr>'
-        for h in headers:
-            result += f'<th>{h}</th>'
-        result += '</tr></thead><tbody>'
+        parts = ['<table><thead><tr>']
+        parts.extend(f'<th>{h}</th>' for h in headers)
+        parts.append('</tr></thead><tbody>')
         
         for row in body_rows:
             cells = [c.strip() for c in row.split('|') if c.strip()]
-            result += '<tr>'
-            for c in cells:
-                result += f'<td>{c}</td>'
-            result += '</tr>'
+            parts.append('<tr>')
+            parts.extend(f'<td>{c}</td>' for c in cells)
+            parts.append('</tr>')
         
-        result += '</tbody></table>'
-        return result
+        parts.append('</tbody></table>')
+        return ''.join(parts)
     
     html = re.sub(table_pattern, table_to_html, html)
     
@@ -1496,32 +564,52 @@ def extract_external_apis(mermaid: str) -> list:
     return apis if apis else ['None detected']
 
 
-def generate_files_html(files: list) -> str:
-    """Generate HTML for file list."""
-    if not files:
-        return '<div class="file-row"><span style="color:var(--text-muted);">No files analyzed</span></div>'
-    
-    html = ""
-    for path, lines in files:
-        html += f'<div class="file-row"><span>{path}</span><span class="lines">{lines} lines</span></div>'
-    return html
-
-
 def generate_issues_html(insights: list) -> str:
     """Generate HTML for issues."""
     if not insights:
         return '<div style="color:var(--text-muted);font-size:13px;padding:1rem;text-align:center;">✨ No issues found. Nice!</div>'
     
-    html = ""
+    parts = []
     for i in insights:
         sev = "critical" if "critical" in str(getattr(i, 'severity', '')).lower() else ""
-        html += f'''
+        parts.append(f'''
         <div class="issue-card {sev}">
-            <div class="issue-title">{i.title}</div>
-            <div class="issue-desc">{i.recommendation}</div>
+            <div class="issue-title">{escape(str(i.title))}</div>
+            <div class="issue-desc">{escape(str(i.recommendation))}</div>
         </div>
-        '''
-    return html
+        ''')
+    return ''.join(parts)
+
+
+# Activity icon (class, emoji) per change type; anything else is a modification
+CHANGE_ICONS = {
+    'created': ('created', '➕'),
+    'deleted': ('deleted', '🗑️'),
+}
+DEFAULT_CHANGE_ICON = ('modified', '✏️')
+
+INTENT_COLORS = {
+    'feature': 'var(--accent-emerald)',
+    'bugfix': 'var(--accent-amber)',
+    'refactor': 'var(--accent-blue)',
+    'cleanup': 'var(--text-muted)',
+    'breaking': 'var(--accent-rose)',
+}
+
+# Opening tag (and marker) of a diff preview line per line type
+DIFF_LINE_OPEN = {
+    'add': '<div class="diff-line diff-add">+ ',
+    'remove': '<div class="diff-line diff-remove">- ',
+    'header': '<div class="diff-line diff-header">',
+}
+DIFF_CONTEXT_OPEN = '<div class="diff-line diff-context">  '
+
+
+@lru_cache(maxsize=32)
+def intent_badge_html(intent: str) -> str:
+    """Badge for a change intent (a handful of distinct values, built once each)."""
+    color = INTENT_COLORS.get(intent, 'var(--text-muted)')
+    return f'<span class="intent-badge" style="background:{color}20;color:{color};border:1px solid {color}40;">{escape(intent)}</span>'
 
 
 def generate_recent_changes_html(changes: list) -> str:
@@ -1534,18 +622,18 @@ def generate_recent_changes_html(changes: list) -> str:
         </div>
         '''
     
-    html = '''
+    parts = ['''
     <div class="live-indicator">
         <div class="live-dot"></div>
         <span>Live updates enabled</span>
     </div>
-    '''
+    ''']
     
     for idx, change in enumerate(changes[:15]):  # Show more changes
-        time_str = change.get('time', '')
-        file_name = change.get('file', 'unknown')
+        time_str = escape(change.get('time', ''))
+        file_name = escape(change.get('file', 'unknown'))
         change_type = change.get('type', 'modified')
-        description = change.get('description', '')
+        description = escape(change.get('description', ''))
         diff_lines = change.get('diff_lines', [])
         stats = change.get('stats', {"added": 0, "removed": 0})
         impact = change.get('impact', [])
@@ -1553,27 +641,10 @@ def generate_recent_changes_html(changes: list) -> str:
         intent = change.get('intent', '')
         
         # Icon and class based on type
-        icon_class = 'modified'
-        icon = '✏️'
-        if change_type == 'created':
-            icon_class = 'created'
-            icon = '➕'
-        elif change_type == 'deleted':
-            icon_class = 'deleted'
-            icon = '🗑️'
+        icon_class, icon = CHANGE_ICONS.get(change_type, DEFAULT_CHANGE_ICON)
         
         # Intent badge
-        intent_html = ''
-        if intent:
-            intent_colors = {
-                'feature': 'var(--accent-emerald)',
-                'bugfix': 'var(--accent-amber)',
-                'refactor': 'var(--accent-blue)',
-                'cleanup': 'var(--text-muted)',
-                'breaking': 'var(--accent-rose)',
-            }
-            intent_color = intent_colors.get(intent, 'var(--text-muted)')
-            intent_html = f'<span class="intent-badge" style="background:{intent_color}20;color:{intent_color};border:1px solid {intent_color}40;">{intent}</span>'
+        intent_html = intent_badge_html(intent) if intent else ''
         
         # Build stats badge
         stats_html = ''
@@ -1589,14 +660,14 @@ def generate_recent_changes_html(changes: list) -> str:
         # Build warnings HTML
         warnings_html = ''
         if warnings:
-            warnings_content = ''.join([f'<div class="warning-item">⚠️ {w}</div>' for w in warnings])
+            warnings_content = ''.join([f'<div class="warning-item">⚠️ {escape(w)}</div>' for w in warnings])
             warnings_html = f'<div class="warnings-box">{warnings_content}</div>'
         
         # Build impact HTML
         impact_html = ''
         if impact:
             impact_items = ''.join([
-                f'<div class="impact-item"><span class="impact-file">{i.get("file", "?")}</span> - {i.get("desc", "affected")}</div>'
+                f'<div class="impact-item"><span class="impact-file">{escape(i.get("file", "?"))}</span> - {escape(i.get("desc", "affected"))}</div>'
                 for i in impact[:5]
             ])
             more = f'<div class="impact-more">+{len(impact) - 5} more</div>' if len(impact) > 5 else ''
@@ -1612,22 +683,15 @@ def generate_recent_changes_html(changes: list) -> str:
         diff_html = ''
         if diff_lines:
             diff_id = f"diff-{idx}"
-            diff_content = ''
+            diff_parts = []
             for d in diff_lines[:15]:  # Max 15 lines
-                line_type = d.get('type', 'context')
-                line_text = d.get('line', '').replace('<', '&lt;').replace('>', '&gt;')
-                
-                if line_type == 'add':
-                    diff_content += f'<div class="diff-line diff-add">+ {line_text}</div>'
-                elif line_type == 'remove':
-                    diff_content += f'<div class="diff-line diff-remove">- {line_text}</div>'
-                elif line_type == 'header':
-                    diff_content += f'<div class="diff-line diff-header">{line_text}</div>'
-                else:
-                    diff_content += f'<div class="diff-line diff-context">  {line_text}</div>'
+                line_open = DIFF_LINE_OPEN.get(d.get('type', 'context'), DIFF_CONTEXT_OPEN)
+                line_text = escape(d.get('line', ''), quote=False)
+                diff_parts.append(f'{line_open}{line_text}</div>')
             
             if len(diff_lines) > 15:
-                diff_content += f'<div class="diff-line diff-more">... +{len(diff_lines) - 15} more lines</div>'
+                diff_parts.append(f'<div class="diff-line diff-more">... +{len(diff_lines) - 15} more lines</div>')
+            diff_content = ''.join(diff_parts)
             
             diff_html = f'''
             <div class="diff-toggle" onclick="toggleDiff('{diff_id}')">
@@ -1638,7 +702,7 @@ def generate_recent_changes_html(changes: list) -> str:
             </div>
             '''
         
-        html += f'''
+        parts.append(f'''
         <div class="activity-item {'has-warning' if warnings else ''}">
             <div class="activity-header">
                 <div class="activity-time">{time_str}</div>
@@ -1652,9 +716,9 @@ def generate_recent_changes_html(changes: list) -> str:
             {impact_html}
             {diff_html}
         </div>
-        '''
+        ''')
     
-    return html
+    return ''.join(parts)
 
 
 def export_html(
@@ -1664,8 +728,6 @@ def export_html(
     analysis: Dict[str, Any] | None = None,
 ) -> None:
     """Export architecture to stunning dashboard."""
-    import json
-    
     input_path = Path(input_file)
     if not input_path.exists():
         raise FileNotFoundError(f"Input file not found: {input_file}")
@@ -1732,7 +794,7 @@ def export_html(
     largest_files = metrics.get('largest_files', [])
     recent_changes = analysis.get('recent_changes', [])
     
-    # Prepare file index for search
+    # File index for search and the Files panel (rendered in the browser)
     file_index = [{"path": f[0], "lines": f[1]} for f in largest_files]
     
     # Generate chips
@@ -1742,26 +804,48 @@ def export_html(
     entry_html = ''.join([f'<span class="chip entry">{e}</span>' for e in entry_points])
     api_html = ''.join([f'<span class="chip api">{a}</span>' for a in external_apis])
     
-    # Generate timestamp for auto-refresh
-    last_modified = datetime.now().isoformat()
-    
-    html = HTML_TEMPLATE.format(
-        project_name=project_name or "Project",
-        mermaid_diagram=mermaid,
+    values = dict(
+        project_name=escape(project_name or "Project"),
+        # Script contexts get a JSON string literal instead of HTML escapes
+        project_name_json=_script_json(project_name or "Project"),
+        # Mermaid decodes entities when it reads the diagram source
+        mermaid_diagram=escape(mermaid, quote=False),
         health_score=health.get('score', 0),
-        health_grade=health.get('grade', 'C'),
-        health_status=health.get('status', 'Unknown'),
+        health_grade=escape(str(health.get('grade', 'C'))),
+        health_status=escape(str(health.get('status', 'Unknown'))),
         total_files=metrics.get('total_files', 0),
         total_lines=metrics.get('total_lines', 0),
         total_issues=len(insights),
         entry_points_html=entry_html,
         external_apis_html=api_html,
         summary_html=markdown_to_html(summary),
-        files_html=generate_files_html(largest_files),
         issues_html=generate_issues_html(insights),
         recent_changes_html=generate_recent_changes_html(recent_changes),
-        files_json=json.dumps(file_index),
-        last_modified=last_modified
+        files_json=_script_json(file_index),
     )
     
-    Path(output_file).write_text(html, encoding="utf-8")
+    # Nothing changed since the last export to this file: keep it as is
+    output_key = str(Path(output_file).resolve())
+    digest = _values_digest(values)
+    if _LAST_EXPORTS.get(output_key) == digest and Path(output_file).exists():
+        return
+    
+    # Generate timestamp for auto-refresh
+    values["last_modified"] = datetime.now().isoformat()
+    
+    with open(output_file, "wb") as f:
+        f.writelines(iter_template(_COMPILED_TEMPLATE, values))
+    _LAST_EXPORTS[output_key] = digest
+
+
+def _script_json(value: Any) -> str:
+    """JSON for a value embedded in a <script> (a '<' can never close the tag)."""
+    return json.dumps(value).replace('<', '\\u003c')
+
+
+def _values_digest(values: Dict[str, Any]) -> bytes:
+    """Digest of the template values, in field order."""
+    h = hashlib.blake2b(digest_size=16)
+    for name, value in values.items():
+        h.update(f"{name}\0{value}\0".encode("utf-8", "surrogatepass"))
+    return h.digest()
@@ -4,6 +4,8 @@ Umbra - The Shadow Architect
 Main entry point and CLI interface.
 """
 
+import asyncio
+import logging
 import os
 import signal
 import sys
@@ -16,10 +18,14 @@ from pathlib import Path
 import click
 from dotenv import load_dotenv
 from rich.console import Console
+from rich.highlighter import NullHighlighter
+from rich.logging import RichHandler
 from rich.panel import Panel
 
-from umbra.agents.orchestrator import build_graph
-from umbra.agents.state import INITIAL_DIAGRAM
+from umbra.agents import _surgeon_cache
+from umbra.agents.analyst import analyze_batch
+from umbra.agents.orchestrator import get_graph
+from umbra.agents.state import INITIAL_DIAGRAM, AnalysisResult
 from umbra.agents.writer import load_current_mermaid
 from umbra.agents.tracker import get_tracker, ChangeType, TrackedChange
 from umbra.watcher import FileChangeEvent, start_watching
@@ -40,6 +46,44 @@ file_cache = {}
 change_tracker = None
 
 
+def setup_logging(verbose: bool = False):
+    """Route library logging to the console (per-file details only if verbose)."""
+    logger = logging.getLogger("umbra")
+    if not any(isinstance(h, RichHandler) for h in logger.handlers):
+        handler = RichHandler(
+            console=console,
+            show_time=False,
+            show_path=False,
+            show_level=False,
+            highlighter=NullHighlighter(),
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+    logger.setLevel(logging.DEBUG if verbose else logging.WARNING)
+    logger.propagate = False
+
+
+# Code files picked up by project scans (Python + JS/TS)
+CODE_EXTENSIONS = (".py", ".js", ".jsx", ".ts", ".tsx")
+
+# Directories skipped by project scans
+SCAN_IGNORE_DIRS = frozenset({
+    "__pycache__", ".git", ".venv", "venv", "node_modules", ".pytest_cache",
+    "test", "tests", "dist", "build", ".next",
+})
+
+
+def find_code_files(path: str, ignore_dirs: frozenset = SCAN_IGNORE_DIRS) -> list[Path]:
+    """Find code files under path in a single walk, pruning ignored directories."""
+    code_files = []
+    for root, dirs, files in os.walk(path):
+        dirs[:] = [d for d in dirs if d not in ignore_dirs]
+        for name in files:
+            if name.endswith(CODE_EXTENSIONS):
+                code_files.append(Path(root, name))
+    return code_files
+
+
 @click.group()
 @click.version_option(version="0.1.0")
 def cli():
@@ -50,7 +94,7 @@ def cli():
     pass
 
 
-def do_initial_scan(path: str, output_file: str, graph, enable_docs: bool = True, enable_security: bool = True) -> str:
+def do_initial_scan(path: str, output_file: str, graph, enable_docs: bool = True, enable_security: bool = True, use_batch_api: bool = False) -> str:
     """Scan all Python files and return the generated mermaid diagram.
     
     Args:
@@ -59,26 +103,18 @@ def do_initial_scan(path: str, output_file: str, graph, enable_docs: bool = True
         graph: LangGraph workflow
         enable_docs: Generate module documentation
         enable_security: Run security scans
+        use_batch_api: Generate docs with a (cheaper, slower) Gemini Batch API job
     """
     from datetime import datetime
     from umbra.agents.summarizer import generate_summary
-    from umbra.agents.documentor import generate_module_doc, scan_security, generate_api_reference, generate_quick_context
+    from umbra.agents._doc_cache import cache_stats
+    from umbra.agents.documentor import batch_generate_module_docs, batch_scan_security, generate_all_docs_batch, generate_api_reference, generate_quick_context
     from umbra.agents.knowledge import generate_knowledge_file
     
     console.print(f"\n[cyan]Initial scan of project...[/cyan]")
     
     # Find all code files (Python + JS/TS)
-    extensions = ["*.py", "*.js", "*.jsx", "*.ts", "*.tsx"]
-    code_files = []
-    for ext in extensions:
-        code_files.extend(Path(path).rglob(ext))
-    
-    # Filter out venv, __pycache__, node_modules, etc.
-    ignore_patterns = {"__pycache__", ".git", ".venv", "venv", "node_modules", ".pytest_cache", "test", "tests", "dist", "build", ".next"}
-    code_files = [
-        f for f in code_files 
-        if not any(p in f.parts for p in ignore_patterns)
-    ]
+    code_files = find_code_files(path)
     
     console.print(f"[dim]Found {len(code_files)} code files to analyze[/dim]")
     
@@ -129,9 +165,14 @@ def do_initial_scan(path: str, output_file: str, graph, enable_docs: bool = True
     # Generate module documentation (if enabled)
     if enable_docs and len(code_files) <= 50:  # Limit for API cost
         console.print("\n[cyan]Generating module documentation...[/cyan]")
-        for i, (fp, content) in enumerate(list(all_modules.items())[:20], 1):  # Max 20 modules
+        doc_modules = dict(list(all_modules.items())[:20])  # Max 20 modules
+        if use_batch_api:
+            console.print("[dim]Submitted as a Batch API job, this can take a while...[/dim]")
+            docs = list(generate_all_docs_batch(doc_modules).values())
+        else:
+            docs = batch_generate_module_docs(doc_modules)
+        for i, (fp, doc) in enumerate(zip(doc_modules, docs), 1):
             console.print(f"[dim]({i}) {Path(fp).name}[/dim]", end=" ")
-            doc = generate_module_doc(str(fp), content)
             if doc:
                 module_docs.append(doc)
                 console.print("[green]OK[/green]")
@@ -141,9 +182,10 @@ def do_initial_scan(path: str, output_file: str, graph, enable_docs: bool = True
     # Security scan (if enabled)
     if enable_security:
         console.print("\n[cyan]Running security scan...[/cyan]")
-        for i, (fp, content) in enumerate(list(all_modules.items())[:30], 1):  # Max 30 files
+        security_modules = dict(list(all_modules.items())[:30])  # Max 30 files
+        results = batch_scan_security(security_modules)
+        for i, (fp, result) in enumerate(zip(security_modules, results), 1):
             console.print(f"[dim]({i}) {Path(fp).name}[/dim]", end=" ")
-            result = scan_security(str(fp), content)
             if result:
                 security_data.append(result)
                 risk = result.get("risk_level", "none")
@@ -156,6 +198,14 @@ def do_initial_scan(path: str, output_file: str, graph, enable_docs: bool = True
             else:
                 console.print("[dim]skip[/dim]")
     
+    # Report how many doc/security responses came from the on-disk cache
+    stats = cache_stats()
+    if stats["hits"] + stats["misses"]:
+        console.print(
+            f"[dim]Doc cache: {stats['hits']} hits, {stats['misses']} misses "
+            f"({stats['hit_rate']:.0%})[/dim]"
+        )
+    
     # Generate summary
     console.print("\n[cyan]Generating project summary...[/cyan]")
     summary = generate_summary(path, current_mermaid, code_files)
@@ -299,12 +349,7 @@ def regenerate_dashboard(path: str, output_file: str, dashboard_file: str):
         current_mermaid = load_current_mermaid(output_file)
         
         # Get file list
-        extensions = ["*.py", "*.js", "*.jsx", "*.ts", "*.tsx"]
-        code_files = []
-        for ext in extensions:
-            code_files.extend(Path(path).rglob(ext))
-        ignore_patterns = {"__pycache__", ".git", ".venv", "venv", "node_modules", ".pytest_cache", "test", "tests", "dist", "build", ".next"}
-        code_files = [f for f in code_files if not any(p in f.parts for p in ignore_patterns)]
+        code_files = find_code_files(path)
         
         # Update knowledge file
         generate_knowledge_file(
@@ -363,6 +408,17 @@ def add_recent_change(
     recent_changes = recent_changes[:MAX_RECENT_CHANGES]
 
 
+def read_code_file(file_path: Path) -> str:
+    """Read a source file, trying multiple encodings."""
+    try:
+        return file_path.read_text(encoding="utf-8")
+    except UnicodeDecodeError:
+        try:
+            return file_path.read_text(encoding="utf-16")
+        except UnicodeDecodeError:
+            return file_path.read_text(encoding="latin-1")
+
+
 def compute_diff(old_content: str, new_content: str) -> dict:
     """Compute a detailed diff between old and new content.
     
@@ -408,6 +464,12 @@ def compute_diff(old_content: str, new_content: str) -> dict:
     if removed_text:
         text_parts.append(f"REMOVED:\n" + "\n".join(removed_text))
     
+    # Say what was cut so the summary is never taken for the whole change
+    # (e.g. by the Analyst's whitespace-only shortcut)
+    omitted = added_count + removed_count - len(added_text) - len(removed_text)
+    if omitted:
+        text_parts.append(f"... ({omitted} more changed lines not shown)")
+    
     return {
         "text": "\n\n".join(text_parts) if text_parts else "Minor changes",
         "lines": diff_lines,
@@ -415,10 +477,17 @@ def compute_diff(old_content: str, new_content: str) -> dict:
     }
 
 
+def diff_for_analysis(diff_text: str, fallback: str | None) -> str | None:
+    """Pick the diff handed to the Analyst: the real diff when there is one."""
+    if diff_text and diff_text != "Minor changes":
+        return diff_text
+    return fallback
+
+
 def generate_change_description(file_name: str, content: str, change_type: str, diff_text: str = "") -> str:
     """Generate a short AI description of what ACTUALLY changed."""
-    from langchain_google_genai import ChatGoogleGenerativeAI
     from langchain_core.messages import HumanMessage
+    from umbra.utils.llm import get_llm
     import os
     
     try:
@@ -437,11 +506,11 @@ def generate_change_description(file_name: str, content: str, change_type: str,
         if not context.strip():
             return f"New empty file created"
         
-        llm = ChatGoogleGenerativeAI(
-            model="models/gemini-flash-latest",
+        llm = get_llm(
+            "models/gemini-flash-latest",
+            0.1,
             google_api_key=api_key,
-            temperature=0.1,
-            max_tokens=100
+            max_tokens=100,
         )
         
         if prompt_type == "DIFF":
@@ -557,6 +626,8 @@ def watch(path: str, verbose: bool, output: str | None, debounce: float, no_scan
     global recent_changes, change_tracker
     recent_changes = []
     
+    setup_logging(verbose)
+    
     # Initialize the change tracker
     change_tracker = get_tracker(path)
     
@@ -600,7 +671,7 @@ def watch(path: str, verbose: bool, output: str | None, debounce: float, no_scan
     )
 
     # Build the graph
-    graph = build_graph()
+    graph = get_graph()
     
     # Ensure output directory exists
     Path(output_file).parent.mkdir(parents=True, exist_ok=True)
@@ -609,19 +680,15 @@ def watch(path: str, verbose: bool, output: str | None, debounce: float, no_scan
     def prefill_cache():
         """Load all code files into cache for diff comparison and tracker."""
         global file_cache, change_tracker
-        extensions = ["*.py", "*.js", "*.jsx", "*.ts", "*.tsx"]
-        ignore_patterns = {"__pycache__", ".git", ".venv", "venv", "node_modules", ".pytest_cache", "test", "tests", "dist", "build", ".next", "output"}
         
-        for ext in extensions:
-            for file_path in Path(path).rglob(ext):
-                if not any(p in file_path.parts for p in ignore_patterns):
-                    try:
-                        content = file_path.read_text(encoding="utf-8", errors="ignore")
-                        # Use absolute path as key for consistency
-                        abs_path = str(file_path.resolve())
-                        file_cache[abs_path] = content
-                    except Exception:
-                        pass
+        for file_path in find_code_files(path, SCAN_IGNORE_DIRS | {"output"}):
+            try:
+                content = file_path.read_text(encoding="utf-8", errors="ignore")
+                # Use absolute path as key for consistency
+                abs_path = str(file_path.resolve())
+                file_cache[abs_path] = content
+            except Exception:
+                pass
         
         # Initialize change tracker with existing files
         if change_tracker:
@@ -700,8 +767,15 @@ def watch(path: str, verbose: bool, output: str | None, debounce: float, no_scan
         except Exception as e:
             console.print(f"[dim]   Could not update diagram: {e}[/dim]")
 
-    def process_change(event: FileChangeEvent):
-        """Process a file change event through the graph (sync wrapper)."""
+    def process_change(
+        event: FileChangeEvent,
+        refresh_dashboard: bool = True,
+        analysis: AnalysisResult | None = None,
+    ):
+        """Process a file change event through the graph (sync wrapper).
+
+        A precomputed analysis (see prefetch_analyses) skips the Analyst call.
+        """
         file_name = event.file_path.name
         event_type = event.event_type  # "created", "modified", or "deleted"
         
@@ -741,6 +815,9 @@ def watch(path: str, verbose: bool, output: str | None, debounce: float, no_scan
                 remove_file_from_diagram(file_name, output_file)
                 console.print(f"[dim]   -> Removed from diagram[/dim]")
                 
+                # Cached diagram updates for this file are stale now
+                _surgeon_cache.invalidate_file(file_key)
+                
                 # Remove from cache
                 if file_key in file_cache:
                     del file_cache[file_key]
@@ -749,19 +826,12 @@ def watch(path: str, verbose: bool, output: str | None, debounce: float, no_scan
                 add_recent_change(file_name, "deleted", f"Removed {file_name} from project")
                 
                 # Regenerate dashboard
-                if dashboard:
+                if dashboard and refresh_dashboard:
                     regenerate_dashboard(path, output_file, dashboard_file)
                     console.print(f"[dim]   Dashboard updated[/dim]")
                 return
 
-            # Read file content (try multiple encodings)
-            try:
-                content = event.file_path.read_text(encoding="utf-8")
-            except UnicodeDecodeError:
-                try:
-                    content = event.file_path.read_text(encoding="utf-16")
-                except UnicodeDecodeError:
-                    content = event.file_path.read_text(encoding="latin-1")
+            content = read_code_file(event.file_path)
             
             # Get previous content from cache for diff (use absolute path)
             file_key = str(event.file_path.resolve())
@@ -787,15 +857,17 @@ def watch(path: str, verbose: bool, output: str | None, debounce: float, no_scan
             current_mermaid = load_current_mermaid(output_file)
 
             # Invoke the graph synchronously
-            result = graph.invoke(
-                {
-                    "file_path": str(event.file_path),
-                    "file_content": content,
-                    "diff": event.diff,
-                    "current_mermaid": current_mermaid,
-                    "retry_count": 0,
-                }
-            )
+            graph_input = {
+                "file_path": str(event.file_path),
+                "file_content": content,
+                "diff": diff_for_analysis(diff_text, event.diff),
+                "current_mermaid": current_mermaid,
+                "retry_count": 0,
+                "change_event": event_type,
+            }
+            if analysis is not None:
+                graph_input["analysis_result"] = analysis
+            result = graph.invoke(graph_input)
 
             # Generate AI description based on actual diff
             if diff_text and diff_text != "Minor changes":
@@ -855,7 +927,7 @@ def watch(path: str, verbose: bool, output: str | None, debounce: float, no_scan
                     console.print(f"[dim]   Analysis: {ar.reasoning}[/dim]")
 
             # Regenerate dashboard
-            if dashboard:
+            if dashboard and refresh_dashboard:
                 regenerate_dashboard(path, output_file, dashboard_file)
                 console.print(f"[dim]   Dashboard updated[/dim]")
 
@@ -865,9 +937,77 @@ def watch(path: str, verbose: bool, output: str | None, debounce: float, no_scan
                 import traceback
                 traceback.print_exc()
 
-    def on_file_change(event: FileChangeEvent):
-        """Callback for file changes."""
-        process_change(event)
+    def prefetch_analyses(events: list[FileChangeEvent]) -> dict:
+        """Run the Analyst concurrently for every changed file in a batch.
+
+        The diagram itself is still updated one file at a time, but the
+        independent analysis LLM calls overlap.
+        """
+        states = []
+        for event in events:
+            if event.event_type == "deleted" or not event.file_path.exists():
+                continue
+            try:
+                content = read_code_file(event.file_path)
+            except OSError:
+                continue
+            old_content = file_cache.get(str(event.file_path.resolve()), "")
+            diff_text = compute_diff(old_content, content)["text"] if old_content else ""
+            states.append({
+                "file_path": str(event.file_path),
+                "file_content": content,
+                "diff": diff_for_analysis(diff_text, event.diff),
+            })
+
+        if len(states) < 2:
+            return {}
+
+        try:
+            results = asyncio.run(analyze_batch(states))
+        except Exception as e:
+            console.print(f"[dim]Batch analysis failed: {e}[/dim]")
+            return {}
+        return {state["file_path"]: r for state, r in zip(states, results)}
+
+    def prefetch_descriptions(events: list[FileChangeEvent]):
+        """Describe every modified file in a batch with batched LLM calls.
+
+        The tracker keeps the descriptions and uses them when each change
+        is tracked, instead of one LLM round-trip per file.
+        """
+        if not change_tracker:
+            return
+        changes = []
+        for event in events:
+            if event.event_type == "deleted" or not event.file_path.exists():
+                continue
+            file_key = str(event.file_path.resolve())
+            old_content = file_cache.get(file_key, "")
+            if not old_content:
+                continue
+            try:
+                content = read_code_file(event.file_path)
+            except OSError:
+                continue
+            diff_data = compute_diff(old_content, content)
+            changes.append((file_key, diff_data["lines"], diff_data["stats"]))
+        change_tracker.prefetch_descriptions(changes)
+
+    def on_file_change(events: list[FileChangeEvent]):
+        """Callback for a debounced batch of file changes."""
+        analyses = prefetch_analyses(events)
+        prefetch_descriptions(events)
+        for event in events:
+            process_change(
+                event,
+                refresh_dashboard=False,
+                analysis=analyses.get(str(event.file_path)),
+            )
+
+        # Regenerate dashboard once per batch
+        if dashboard:
+            regenerate_dashboard(path, output_file, dashboard_file)
+            console.print("[dim]   Dashboard updated[/dim]")
 
     # Setup graceful shutdown
     watcher = None
@@ -967,14 +1107,21 @@ def init(output: str):
     default=True,
     help="Run security scan (default: enabled)",
 )
-def scan(path: str, output: str, docs: bool, security: bool):
+@click.option(
+    "--batch",
+    is_flag=True,
+    help="Generate docs with the Gemini Batch API (half price, can take hours)",
+)
+def scan(path: str, output: str, docs: bool, security: bool, batch: bool):
     """Scan an existing project and generate architecture diagram.
     
     This generates:
     - LIVE_ARCHITECTURE.md (diagram + summary)
     - UMBRA_KNOWLEDGE.md (full project brain for LLMs)
     """
-    from umbra.agents.orchestrator import build_graph
+    from umbra.agents.orchestrator import get_graph
+    
+    setup_logging()
     
     # Check for API key
     if not os.getenv("GOOGLE_API_KEY"):
@@ -994,8 +1141,8 @@ def scan(path: str, output: str, docs: bool, security: bool):
     )
     
     # Build graph and run initial scan (which generates everything)
-    graph = build_graph()
-    do_initial_scan(path, output, graph, enable_docs=docs, enable_security=security)
+    graph = get_graph()
+    do_initial_scan(path, output, graph, enable_docs=docs, enable_security=security, use_batch_api=batch)
     
     console.print(f"\n[green]Scan complete![/green]")
 
@@ -141,8 +141,8 @@ class UmbraRequestHandler(BaseHTTPRequestHandler):
     
     def ask_question(self, question: str) -> str:
         """Ask a question about the project using LLM."""
-        from langchain_google_genai import ChatGoogleGenerativeAI
         from langchain_core.messages import HumanMessage, SystemMessage
+        from umbra.utils.llm import get_llm
         
         api_key = os.getenv("GOOGLE_API_KEY")
         if not api_key:
@@ -185,11 +185,7 @@ You have analyzed this project and have access to:
 
 Answer the user's question about this codebase:"""
         
-        llm = ChatGoogleGenerativeAI(
-            model="models/gemini-flash-latest",
-            google_api_key=api_key,
-            temperature=0.3
-        )
+        llm = get_llm("models/gemini-flash-latest", 0.3, google_api_key=api_key)
         
         messages = [
             SystemMessage(content=system_prompt),
@@ -0,0 +1,35 @@
+"""
+Shared LLM client helpers.
+
+Building a ChatGoogleGenerativeAI client sets up credentials and an HTTP
+session, so clients are cached and reused across calls.
+"""
+
+from functools import lru_cache
+
+from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
+
+
+@lru_cache(maxsize=8)
+def get_llm(
+    model: str,
+    temperature: float,
+    google_api_key: str | None = None,
+    max_tokens: int | None = None,
+    n: int = 1,
+) -> ChatGoogleGenerativeAI:
+    """Get a cached chat model client for the given settings."""
+    kwargs = {"model": model, "temperature": temperature}
+    if google_api_key is not None:
+        kwargs["google_api_key"] = google_api_key
+    if max_tokens is not None:
+        kwargs["max_tokens"] = max_tokens
+    if n != 1:
+        kwargs["n"] = n
+    return ChatGoogleGenerativeAI(**kwargs)
+
+
+@lru_cache(maxsize=2)
+def get_embeddings(model: str = "models/text-embedding-004") -> GoogleGenerativeAIEmbeddings:
+    """Get a cached embeddings client."""
+    return GoogleGenerativeAIEmbeddings(model=model)
@@ -14,6 +14,18 @@ from rich.console import Console
 
 console = Console()
 
+_DIRECTIVE_RE = re.compile(r"^(graph|flowchart)\s+(TD|TB|LR|RL|BT)")
+_SUBGRAPH_RE = re.compile(r"^[^\S\n]*subgraph", re.MULTILINE)
+# 'end' alone on its line closes a subgraph (not part of other words)
+_END_RE = re.compile(r"^[^\S\n]*end[^\S\n]*$", re.MULTILINE)
+_SHORT_ARROW_RE = re.compile(r"\w+->\w+")
+_EMPTY_SUBGRAPH_RE = re.compile(r"subgraph\s+.*?\n\s*end", re.DOTALL)
+
+# Markup that could execute script when the diagram is rendered
+_DANGEROUS_RE = re.compile(
+    r"<script|<iframe|javascript:|data:text/html|onclick|onerror|onload", re.IGNORECASE
+)
+
 
 @dataclass
 class ValidationResult:
@@ -37,49 +49,46 @@ def validate_mermaid(mermaid: str) -> ValidationResult:
         errors.append("Empty diagram")
         return ValidationResult(is_valid=False, errors=errors)
 
-    lines = mermaid.strip().split("\n")
-
     # Rule 1: Must start with graph/flowchart directive
-    first_line = lines[0].strip()
-    if not re.match(r"^(graph|flowchart)\s+(TD|TB|LR|RL|BT)", first_line):
+    first_line = mermaid.strip().partition("\n")[0].strip()
+    if not _DIRECTIVE_RE.match(first_line):
         errors.append(
             f"Diagram must start with 'graph TD' or similar directive, got: {first_line[:50]}"
         )
 
     # Rule 2: Balanced subgraphs
-    subgraph_count = sum(1 for line in lines if line.strip().startswith("subgraph"))
-    # Count 'end' that closes subgraphs (not part of other words)
-    end_count = sum(1 for line in lines if re.match(r"^\s*end\s*$", line))
+    subgraph_count = len(_SUBGRAPH_RE.findall(mermaid))
+    end_count = len(_END_RE.findall(mermaid))
 
     if subgraph_count != end_count:
         errors.append(
             f"Unbalanced subgraphs: {subgraph_count} 'subgraph' vs {end_count} 'end'"
         )
 
-    # Rule 3: No dangerous content
-    dangerous_patterns = ["<script", "javascript:", "onclick", "onerror"]
-    for pattern in dangerous_patterns:
-        if pattern.lower() in mermaid.lower():
-            errors.append(f"Potentially dangerous content detected: {pattern}")
+    # Rule 3: No dangerous content (single scan, one error per distinct pattern)
+    found = dict.fromkeys(m.group().lower() for m in _DANGEROUS_RE.finditer(mermaid))
+    for pattern in found:
+        errors.append(f"Potentially dangerous content detected: {pattern}")
 
     # Rule 4: Check for balanced brackets
-    if mermaid.count("[") != mermaid.count("]"):
+    open_square, close_square = mermaid.count("["), mermaid.count("]")
+    if open_square != close_square:
         errors.append(
-            f"Unbalanced square brackets: {mermaid.count('[')} '[' vs {mermaid.count(']')} ']'"
+            f"Unbalanced square brackets: {open_square} '[' vs {close_square} ']'"
         )
 
-    if mermaid.count("(") != mermaid.count(")"):
+    open_paren, close_paren = mermaid.count("("), mermaid.count(")")
+    if open_paren != close_paren:
         errors.append(
-            f"Unbalanced parentheses: {mermaid.count('(')} '(' vs {mermaid.count(')')} ')'"
+            f"Unbalanced parentheses: {open_paren} '(' vs {close_paren} ')'"
         )
 
     # Rule 5: Check for common syntax issues (warnings)
-    if re.search(r"\w+->\w+", mermaid):
+    if _SHORT_ARROW_RE.search(mermaid):
         warnings.append("Found '->' instead of '-->'. Consider using '-->' for arrows.")
 
     # Rule 6: Check for empty subgraphs (warning, not error)
-    subgraph_pattern = re.compile(r"subgraph\s+.*?\n\s*end", re.DOTALL)
-    for match in subgraph_pattern.finditer(mermaid):
+    for match in _EMPTY_SUBGRAPH_RE.finditer(mermaid):
         content = match.group()
         # Check if there's any content between subgraph and end
         inner = content.split("\n")[1:-1]
@@ -104,7 +113,6 @@ def validator_node(state: dict[str, Any]) -> dict[str, Any]:
 
     if not updated:
         return {
-            **state,
             "is_valid_mermaid": False,
             "validation_error": "No diagram to validate",
         }
@@ -119,14 +127,12 @@ def validator_node(state: dict[str, Any]) -> dict[str, Any]:
         error_msg = "; ".join(result.errors)
         console.print(f"[red]   FAILED: Validation failed: {error_msg}[/red]")
         return {
-            **state,
             "is_valid_mermaid": False,
             "validation_error": error_msg,
         }
 
     console.print("[dim]   -> Validation passed[/dim]")
     return {
-        **state,
         "is_valid_mermaid": True,
         "validation_error": None,
     }
@@ -4,9 +4,12 @@ File system watcher with debouncing for Python files.
 This module provides a robust file watcher that:
 - Monitors only .py files
 - Debounces rapid saves
+- Delivers each burst of changes as a single de-duplicated batch
 - Runs in a separate thread (non-blocking)
 """
 
+import os
+import re
 import threading
 import time
 from dataclasses import dataclass
@@ -36,6 +39,8 @@ class DebouncedHandler(FileSystemEventHandler):
     Watchdog handler with debouncing logic.
 
     Collects events and only triggers callback after a quiet period.
+    Repeated events for the same file collapse into one entry, and the
+    whole burst is passed to the callback in a single call.
     """
 
     # Patterns to ignore
@@ -52,11 +57,16 @@ class DebouncedHandler(FileSystemEventHandler):
     }
 
     # Extensions to watch (Python + JavaScript/TypeScript)
-    WATCH_EXTENSIONS = {".py", ".js", ".jsx", ".ts", ".tsx"}
+    WATCH_EXTENSIONS = frozenset({".py", ".js", ".jsx", ".ts", ".tsx"})
+
+    # Single alternation matching any ignored directory as a whole path component
+    _IGNORE_RE = re.compile(
+        r"(?:^|/)(?:" + "|".join(map(re.escape, sorted(IGNORE_PATTERNS))) + r")(?:/|$)"
+    )
 
     def __init__(
         self,
-        callback: Callable[[FileChangeEvent], None],
+        callback: Callable[[list[FileChangeEvent]], None],
         debounce_seconds: float = 2.0,
     ):
         super().__init__()
@@ -68,19 +78,16 @@ class DebouncedHandler(FileSystemEventHandler):
 
     def _should_ignore(self, path: str) -> bool:
         """Check if the path should be ignored."""
-        path_obj = Path(path)
+        path = os.fspath(path)
 
         # Check extension
-        if path_obj.suffix not in self.WATCH_EXTENSIONS:
+        if path[path.rfind("."):] not in self.WATCH_EXTENSIONS:
             return True
 
         # Check ignore patterns
-        parts = path_obj.parts
-        for pattern in self.IGNORE_PATTERNS:
-            if pattern in parts:
-                return True
-
-        return False
+        if os.sep != "/":
+            path = path.replace(os.sep, "/")
+        return self._IGNORE_RE.search(path) is not None
 
     def _schedule_callback(self):
         """Schedule the debounced callback."""
@@ -98,12 +105,13 @@ class DebouncedHandler(FileSystemEventHandler):
             self._pending_events.clear()
             self._timer = None
 
-        # Process each event
-        for event in events:
-            try:
-                self.callback(event)
-            except Exception as e:
-                console.print(f"[red]Error in callback: {e}[/red]")
+        if not events:
+            return
+
+        try:
+            self.callback(events)
+        except Exception as e:
+            console.print(f"[red]Error in callback: {e}[/red]")
 
     def _handle_event(
         self, event_type: Literal["created", "modified", "deleted"], src_path: str
@@ -132,7 +140,16 @@ class DebouncedHandler(FileSystemEventHandler):
         )
 
         with self._lock:
-            # Store/update the pending event for this file
+            # Store/update the pending event for this file. A file created in
+            # this window is still new to downstream consumers even if it was
+            # modified afterwards.
+            previous = self._pending_events.get(src_path)
+            if (
+                previous is not None
+                and previous.event_type == "created"
+                and event_type == "modified"
+            ):
+                change_event.event_type = "created"
             self._pending_events[src_path] = change_event
 
         self._schedule_callback()
@@ -167,7 +184,7 @@ class UmbraWatcher:
     def __init__(
         self,
         path: str | Path,
-        callback: Callable[[FileChangeEvent], None],
+        callback: Callable[[list[FileChangeEvent]], None],
         debounce_seconds: float = 2.0,
     ):
         self.path = Path(path).resolve()
@@ -211,7 +228,7 @@ class UmbraWatcher:
 
 def start_watching(
     path: str | Path,
-    callback: Callable[[FileChangeEvent], None],
+    callback: Callable[[list[FileChangeEvent]], None],
     debounce_seconds: float = 2.0,
 ) -> UmbraWatcher:
     """
@@ -219,7 +236,7 @@ def start_watching(
 
     Args:
         path: Directory to watch (recursive)
-        callback: Function called on each debounced change
+        callback: Function called with each debounced batch of changes
         debounce_seconds: Delay before triggering callback
 
     Returns:
@@ -236,8 +253,9 @@ def start_watching(
 
 if __name__ == "__main__":
     # Simple test
-    def test_callback(event: FileChangeEvent):
-        console.print(f"[green]Event:[/green] {event.event_type} - {event.file_path}")
+    def test_callback(events: list[FileChangeEvent]):
+        for event in events:
+            console.print(f"[green]Event:[/green] {event.event_type} - {event.file_path}")
 
     watcher = start_watching(".", test_callback, debounce_seconds=1.0)
 